@@ -0,0 +1,108 @@
+"""Benchmark ICS.convert on a synthetic feed with 2,000 events.
+
+Compares the current implementation with the previous one which compiled the
+title template and applied regex/split_at for every single event, and the
+window-bounded event reader with icalevents on feeds spanning several years.
+
+Usage: python benchmarks/bench_ics.py [--events N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sys
+import timeit
+
+import jinja2
+from icalevents import icalevents
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.ICS import ICS  # isort:skip # noqa: E402
+from waste_collection_schedule.service.ICSEvents import (
+    read_events,
+)  # isort:skip # noqa: E402
+from synthetic import create_ics  # isort:skip # noqa: E402
+
+
+class LegacyICS(ICS):
+    """Per-event template compilation and title post-processing."""
+
+    def _render_title(self, event):
+        environment = jinja2.Environment()
+        return environment.from_string(self._title_template).render(date=event)
+
+    def _convert_title(self, entry_title):
+        if self._regex is not None:
+            match = self._regex.match(entry_title)
+            if match:
+                entry_title = match.group(1)
+        if self._split_at is not None:
+            return tuple(
+                t.strip().title() for t in re.split(self._split_at, entry_title)
+            )
+        return (entry_title,)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = create_ics(args.events)
+    cases = {
+        "default template": {},
+        "regex + split_at": {"regex": r"Abfuhr: (.*)", "split_at": " / "},
+        "custom template": {"title_template": "{{date.summary|upper}}"},
+    }
+
+    print(f"ICS.convert, {args.events} events, best of {args.repeat}")
+    for name, kwargs in cases.items():
+        legacy = LegacyICS(**kwargs)
+        current = ICS(**kwargs)
+        assert legacy.convert(data) == current.convert(data)
+        t_legacy = min(
+            timeit.repeat(lambda: legacy.convert(data), number=1, repeat=args.repeat)
+        )
+        t_current = min(
+            timeit.repeat(lambda: current.convert(data), number=1, repeat=args.repeat)
+        )
+        print(
+            f"  {name:18} legacy {t_legacy * 1000:8.1f} ms"
+            f"  current {t_current * 1000:8.1f} ms  ({t_legacy / t_current:.1f}x)"
+        )
+
+    print(
+        f"\nevents within one year, {args.events} events per year, best of {args.repeat}"
+    )
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    end = start + datetime.timedelta(days=365)
+    for years in (1, 5, 10):
+        content = create_ics(args.events * years, years).encode()
+        t_legacy = min(
+            timeit.repeat(
+                lambda: icalevents.events(start=start, end=end, string_content=content),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        t_current = min(
+            timeit.repeat(
+                lambda: read_events(content, start, end),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(
+            f"  {years:2} year feed         icalevents {t_legacy * 1000:8.1f} ms"
+            f"  read_events {t_current * 1000:8.1f} ms  ({t_legacy / t_current:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Benchmark the core pipeline on synthetic schedules.
+
+Covers the post-processing of fetched entries in SourceShell.fetch (strip,
+filter, customize, day offset), CollectionAggregator.get_upcoming and
+get_upcoming_group_by_day over N sources with M types over Y years, the
+ScheduleSensor update for every DetailsFormat and ICS.convert on a large
+feed. Reports operations per second and the peak memory of one operation.
+
+Store the results of a run with --save-baseline and compare later runs (on
+the same machine and with the same parameters) with --baseline. The script
+exits with status 1 if a stage got slower than the given threshold.
+
+baseline.json is a reference run with the default parameters, saved with the
+Python version and platform it was measured on. Absolute numbers differ
+between machines, save a baseline of your own before comparing changes.
+
+Usage: python benchmarks/bench_pipeline.py [--sources N] [--types M] [--years Y]
+       [--ics-events N] [--stage NAME] [--save-baseline FILE] [--baseline FILE]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+import types
+from typing import Any, Callable
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import CollectionAggregator  # isort:skip # noqa: E402
+from waste_collection_schedule.service.ICS import ICS  # isort:skip # noqa: E402
+from synthetic import TYPES, create_ics, create_shells  # isort:skip # noqa: E402
+
+# the sensor platform needs Home Assistant, its stages are skipped without
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+try:
+    from custom_components.waste_collection_schedule.sensor import (  # isort:skip # noqa: E402
+        DetailsFormat,
+        ScheduleSensor,
+    )
+except ImportError:
+    DetailsFormat = None  # type: ignore[assignment,misc]
+
+
+def create_sensor(aggregator, details_format) -> Any:
+    """Create a sensor outside of Home Assistant, it is never added to hass."""
+    hass = types.SimpleNamespace(data={})
+    api = types.SimpleNamespace(separator=", ", _day_switch_time=datetime.time(10))
+    return ScheduleSensor(
+        hass=hass,  # type: ignore[arg-type]
+        api=api,  # type: ignore[arg-type]
+        coordinator=None,
+        name=f"bench {details_format.value}",
+        aggregator=aggregator,
+        details_format=details_format,
+        count=10,
+        leadtime=None,
+        collection_types=None,
+        value_template=None,
+        date_template=None,
+        add_days_to=True,
+        event_index=None,
+    )
+
+
+def create_stages(args) -> dict[str, Callable[[], Any]]:
+    shells = create_shells(args.sources, args.types, args.years, day_offset=1)
+    aggregator = CollectionAggregator(shells)
+    shell = shells[0]
+
+    def fetch():
+        # force the full post-processing, an unchanged fetch skips it
+        shell._fingerprint = None
+        shell.fetch()
+
+    stages: dict[str, Callable[[], Any]] = {
+        "SourceShell.fetch": fetch,
+        "aggregator index": lambda: CollectionAggregator(shells)._update_index(),
+        "get_upcoming": lambda: aggregator.get_upcoming(count=10),
+        "get_upcoming types": lambda: aggregator.get_upcoming(
+            count=10, include_types=[TYPES[1]]
+        ),
+        "get_upcoming_group_by_day": lambda: aggregator.get_upcoming_group_by_day(
+            count=10
+        ),
+        "group_by_day leadtime": lambda: aggregator.get_upcoming_group_by_day(
+            leadtime=30
+        ),
+    }
+
+    if DetailsFormat is not None:
+        for details_format in DetailsFormat:
+            sensor = create_sensor(aggregator, details_format)
+            stages[f"sensor {details_format.value}"] = sensor._update_sensor
+
+    ics = ICS(regex=r"Abfuhr: (.*)", split_at=" / ")
+    data = create_ics(args.ics_events, args.years)
+    stages["ICS.convert"] = lambda: ics.convert(data)
+    return stages
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Return operations per second (best of repeat) and peak memory in bytes."""
+    fn()  # warm up caches
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    best = min([elapsed] + timer.repeat(number=number, repeat=repeat - 1))
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ops": number / best, "peak": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=5)
+    parser.add_argument("--types", type=int, default=6)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--ics-events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stage", action="append", help="Run only the given stage(s)")
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown reported as regression (default 0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    params = {
+        "sources": args.sources,
+        "types": args.types,
+        "years": args.years,
+        "ics_events": args.ics_events,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print(f"warning: baseline was created with {baseline.get('params')}")
+
+    stages = create_stages(args)
+    if DetailsFormat is None:
+        print("Home Assistant not installed, skipping sensor stages")
+    if args.stage:
+        stages = {k: v for k, v in stages.items() if k in args.stage}
+
+    print(
+        f"{args.sources} sources x {args.types} types x {args.years} years,",
+        f"{args.ics_events} ICS events, best of {args.repeat}\n",
+    )
+    results = {}
+    regressions = []
+    for name, fn in stages.items():
+        result = results[name] = measure(fn, args.repeat)
+        line = (
+            f"  {name:28} {result['ops']:12,.1f} ops/s"
+            f"  {result['peak'] / 1024:10,.1f} KiB peak"
+        )
+        if baseline is not None and name in baseline["results"]:
+            ratio = result["ops"] / baseline["results"][name]["ops"]
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio < 1 - args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "params": params,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark config flow start-up with the shared source catalogue.
+
+Compares the previous per-flow setup, which loaded sources.json and attached
+an args and a reconfigure step method per source to every flow, with the
+catalogue which is loaded once per process. Reports the time and the memory
+retained per flow, and the time to render and resolve the source dropdown.
+
+Usage: python benchmarks/bench_source_catalogue.py [--flows N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.SourceCatalogue import (  # isort:skip # noqa: E402
+    SourceCatalogue,
+)
+
+PACKAGE_DIR = (
+    Path(__file__).parents[1] / "custom_components" / "waste_collection_schedule"
+)
+SOURCES_FILE = PACKAGE_DIR / "sources.json"
+MANIFEST_FILE = PACKAGE_DIR / "sources_manifest.json"
+
+COUNTRY = "Germany"
+
+
+class LegacyFlow:
+    """Setup and source step as done before by every config flow."""
+
+    def setup(self):
+        with SOURCES_FILE.open(encoding="utf-8") as f:
+            self._sources = json.load(f)
+
+        async def args_method(args_input):
+            pass
+
+        async def reconfigure_method(args_input):
+            pass
+
+        for sources in self._sources.values():
+            for source in sources:
+                setattr(self, f"async_step_args_{source['id']}", args_method)
+                setattr(
+                    self, f"async_step_reconfigure_{source['id']}", reconfigure_method
+                )
+
+    def source_step(self, value):
+        sources = self._sources[COUNTRY]
+        options = [{"value": "", "label": ""}] + [
+            {
+                "value": f"{x['module']}\t{x['title']}\t{x['id']}",
+                "label": f"{x['title']} ({x['module']})",
+            }
+            for x in sources
+        ]
+        if value.split("\t")[0] in [x["module"] for x in sources]:
+            next(
+                x["default_params"]
+                for x in sources
+                if value.startswith(f"{x['module']}\t{x['title']}")
+            )
+        return options
+
+
+class CatalogueFlow:
+    """Setup and source step using the shared catalogue."""
+
+    def __init__(self, catalogue):
+        self._shared = catalogue
+
+    def setup(self):
+        self._catalogue = self._shared
+
+    def source_step(self, value):
+        options = self._catalogue.get_options(COUNTRY)
+        self._catalogue.lookup(COUNTRY, value)
+        return options
+
+
+def measure_flows(create, flows: int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = timeit.default_timer()
+    instances = []
+    for _ in range(flows):
+        flow = create()
+        flow.setup()
+        instances.append(flow)
+    elapsed = timeit.default_timer() - started
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return elapsed / flows, retained / flows, instances
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flows", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    load = min(
+        timeit.repeat(
+            lambda: SourceCatalogue.load(SOURCES_FILE, MANIFEST_FILE),
+            number=1,
+            repeat=5,
+        )
+    )
+    tracemalloc.start()
+    catalogue = SourceCatalogue.load(SOURCES_FILE, MANIFEST_FILE)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"catalogue: {len(catalogue)} sources, loaded once in {load * 1000:.1f} ms,",
+        f"{size / 1024:.1f} KiB",
+    )
+
+    print(f"\nflow setup ({args.flows} concurrent flows)")
+    for name, create in (
+        ("legacy", LegacyFlow),
+        ("catalogue", lambda: CatalogueFlow(catalogue)),
+    ):
+        seconds, retained, flows = measure_flows(create, args.flows)
+        print(
+            f"  {name:10} {seconds * 1000:8.3f} ms/flow",
+            f"{retained / 1024:10.1f} KiB/flow",
+        )
+
+    value = catalogue.get_options(COUNTRY)[-1]["value"]
+    print(f"\nsource step ({COUNTRY}, {len(catalogue.get_country(COUNTRY))} sources)")
+    for name, flow in (
+        ("legacy", LegacyFlow()),
+        ("catalogue", CatalogueFlow(catalogue)),
+    ):
+        flow.setup()
+        seconds = min(
+            timeit.repeat(
+                lambda: flow.source_step(value), number=10, repeat=args.repeat
+            )
+        )
+        print(f"  {name:10} {seconds / 10 * 1000:8.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
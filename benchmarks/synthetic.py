@@ -0,0 +1,130 @@
+"""Synthetic schedules for the benchmarks.
+
+Schedules are generated deterministically (like
+service/generate_ukbcd_json.py, but with a fixed seed): every collection type
+is collected on a fixed weekday every 1, 2 or 4 weeks, starting half of the
+covered years in the past, with a few dates moved by a holiday shift.
+"""
+
+import datetime
+import os
+import random
+import sys
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    Customize,
+    SourceShell,
+)
+
+TYPES = [
+    "Restmüll",
+    "Biomüll",
+    "Papier",
+    "Gelber Sack",
+    "Grünschnitt",
+    "Glas",
+    "Sperrmüll",
+    "Schadstoffmobil",
+    "Weihnachtsbaum",
+    "Elektroschrott",
+]
+
+SUMMARIES = ["Restmüll", "Biomüll", "Papier / Gelber Sack", "Grünschnitt"]
+
+
+def type_name(index: int) -> str:
+    if index < len(TYPES):
+        return TYPES[index]
+    return f"{TYPES[index % len(TYPES)]} {index // len(TYPES)}"
+
+
+def create_collections(
+    types: int, years: int, seed: int = 0, today: datetime.date | None = None
+) -> list[Collection]:
+    """Return the (unsorted) entries of one source."""
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    start = today - datetime.timedelta(days=365 * years // 2)
+    end = start + datetime.timedelta(days=365 * years)
+    entries = []
+    for t in range(types):
+        name = type_name(t)
+        interval = datetime.timedelta(weeks=rng.choice((1, 2, 2, 4)))
+        d = start + datetime.timedelta(days=rng.randrange(7))
+        while d < end:
+            shift = 1 if rng.random() < 0.03 else 0
+            entries.append(Collection(d + datetime.timedelta(days=shift), name))
+            d += interval
+    return entries
+
+
+class SyntheticSource:
+    """Source returning new entries on every fetch, like a real source."""
+
+    def __init__(self, types: int, years: int, seed: int = 0):
+        self._schedule = [
+            (e.date, e.type) for e in create_collections(types, years, seed)
+        ]
+
+    def fetch(self) -> list[Collection]:
+        return [Collection(d, t) for d, t in self._schedule]
+
+
+def create_customize(types: int) -> dict[str, Customize]:
+    """Customize every second type, hide every fifth."""
+    customize = {}
+    for t in range(0, types, 2):
+        name = type_name(t)
+        customize[name] = Customize(
+            waste_type=name,
+            alias=f"{name} (alias)" if t % 4 == 0 else None,
+            show=t % 5 != 0,
+            icon="mdi:trash-can",
+        )
+    return customize
+
+
+def create_shells(
+    sources: int, types: int, years: int, day_offset: int = 0
+) -> list[SourceShell]:
+    """Return fetched shells of N sources with M types over Y years each."""
+    shells = []
+    for i in range(sources):
+        shell = SourceShell(
+            source=SyntheticSource(types, years, seed=i),
+            customize=create_customize(types),
+            title=f"Synthetic {i}",
+            description="synthetic schedule",
+            url=None,
+            calendar_title=None,
+            unique_id=f"synthetic_{i}",
+            day_offset=day_offset,
+            network=False,
+        )
+        shell.fetch()
+        shells.append(shell)
+    return shells
+
+
+def create_ics(events: int, years: int = 1) -> str:
+    """Return an ICS feed with events evenly spread over the given years."""
+    start = datetime.date.today() - datetime.timedelta(days=365 * (years - 1) // 2)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//EN"]
+    for i in range(events):
+        d = start + datetime.timedelta(days=i * 365 * years // events)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:bench-{i}",
+            f"DTSTAMP:{start:%Y%m%d}T000000Z",
+            f"DTSTART;VALUE=DATE:{d:%Y%m%d}",
+            f"SUMMARY:Abfuhr: {SUMMARIES[i % len(SUMMARIES)]}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
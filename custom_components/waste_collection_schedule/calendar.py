@@ -79,9 +79,8 @@ class WasteCollectionCalendar(CalendarEntity):
     @property
     def event(self):
         """Return next collection event."""
-        collections = self._aggregator.get_upcoming(
+        collections = self._aggregator.view(include_today=True).get_upcoming(
             count=1,
-            include_today=True,
             include_types=self._include_types,
             exclude_types=self._exclude_types,
         )
@@ -97,8 +96,7 @@ class WasteCollectionCalendar(CalendarEntity):
         """Return all events within specified time span."""
         events: list[CalendarEvent] = []
 
-        for collection in self._aggregator.get_upcoming(
-            include_today=True,
+        for collection in self._aggregator.view(include_today=True).get_upcoming(
             include_types=self._include_types,
             exclude_types=self._exclude_types,
         ):
@@ -126,13 +124,21 @@ def create_calendar_entries(
 ) -> list[WasteCollectionCalendar]:
     entities: list[WasteCollectionCalendar] = []
     for shell in shells:
+        # one aggregator per source, shared by the calendars (and sensors) of the source
+        if coordinator is not None:
+            aggregator = coordinator.aggregator
+        elif api is not None:
+            aggregator = api.get_aggregator([shell])
+        else:
+            aggregator = CollectionAggregator([shell])
+
         dedicated_calendar_types = shell.get_dedicated_calendar_types()
         for type in dedicated_calendar_types:
             entities.append(
                 WasteCollectionCalendar(
                     api=api,
                     coordinator=coordinator,
-                    aggregator=CollectionAggregator([shell]),
+                    aggregator=aggregator,
                     name=shell.get_calendar_title_for_type(type),
                     include_types={shell.get_collection_type_name(type)},
                     unique_id=calc_unique_calendar_id(shell, type),
@@ -143,7 +149,7 @@ def create_calendar_entries(
             WasteCollectionCalendar(
                 api=api,
                 coordinator=coordinator,
-                aggregator=CollectionAggregator([shell]),
+                aggregator=aggregator,
                 name=shell.calendar_title,
                 exclude_types={
                     shell.get_collection_type_name(type)
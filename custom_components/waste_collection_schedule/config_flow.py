@@ -5,7 +5,7 @@ import logging
 import types
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Literal, Tuple, TypedDict, Union, cast, get_origin
+from typing import Any, Literal, Tuple, Union, cast, get_origin
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -17,6 +17,7 @@ from homeassistant.config_entries import (
 )
 from homeassistant.const import CONF_NAME, CONF_VALUE_TEMPLATE
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     DurationSelector,
     DurationSelectorConfig,
@@ -41,10 +42,18 @@ from waste_collection_schedule.exceptions import (
     SourceArgumentRequired,
     SourceArgumentSuggestionsExceptionBase,
 )
+from waste_collection_schedule.service.SourceCatalogue import (
+    SourceCatalogue,
+    get_source_catalogue,
+    load_source_catalogue,
+)
+from waste_collection_schedule.service.SourceManifest import SourceDescription
 
 from .const import (
     CONF_ADD_DAYS_TO,
     CONF_ALIAS,
+    CONF_CACHE_MAX_AGE,
+    CONF_CACHE_MAX_AGE_DEFAULT,
     CONF_COLLECTION_TYPES,
     CONF_COUNT,
     CONF_COUNTRY_NAME,
@@ -61,6 +70,8 @@ from .const import (
     CONF_FETCH_TIME_DEFAULT,
     CONF_ICON,
     CONF_LEADTIME,
+    CONF_MAX_FETCH_INTERVAL,
+    CONF_MAX_FETCH_INTERVAL_DEFAULT,
     CONF_PICTURE,
     CONF_RANDOM_FETCH_TIME_OFFSET,
     CONF_RANDOM_FETCH_TIME_OFFSET_DEFAULT,
@@ -79,6 +90,12 @@ from .const import (
 )
 from .init_ui import WCSCoordinator
 from .sensor import DetailsFormat
+from .validation_cache import get_validation_cache
+from .waste_collection_schedule.service.CollectionCacheStore import (
+    get_collection_cache_store,
+)
+from .waste_collection_schedule.shell_registry import get_shell_registry
+from .waste_collection_schedule.source_shell import calc_unique_source_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -283,13 +300,6 @@ EXAMPLE_DATE_TEMPLATES = {
 }
 
 
-class SourceDict(TypedDict):
-    title: str
-    module: str
-    default_params: dict[str, Any]
-    id: str
-
-
 class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     """Config flow."""
 
@@ -299,39 +309,38 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
     _source: str | None = None
 
     _options: dict = {}
-    _sources: dict[str, list[SourceDict]] = {}
+    _catalogue: SourceCatalogue
     _error_suggestions: dict[str, list[Any]]
 
-    # Get source list from JSON
-    def _get_source_list(self) -> dict[str, list[SourceDict]]:
-        p = Path(__file__).with_name("sources.json")
-        with p.open(encoding="utf-8") as json_file:
-            return json.load(json_file)
+    def __getattr__(self, name: str) -> Any:
+        # the step ids contain the source id, resolve them here instead of
+        # attaching two methods per source to every flow
+        catalogue = get_source_catalogue()
+        if catalogue is not None:
+            for prefix, method in (
+                ("async_step_args_", self.async_step_args),
+                ("async_step_reconfigure_", self.async_step_reconfigure),
+            ):
+                if name.startswith(prefix) and catalogue.has_id(
+                    name.removeprefix(prefix)
+                ):
+                    return method
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
 
     async def _async_setup_sources(self) -> None:
-        if len(self._sources) > 0:
+        if hasattr(self, "_catalogue"):
             return
 
-        self._sources = await self.hass.async_add_executor_job(self._get_source_list)
-
-        async def args_method(args_input):
-            return await self.async_step_args(args_input)
-
-        async def reconfigure_method(args_input):
-            return await self.async_step_reconfigure(args_input)
-
-        for sources in self._sources.values():
-            for source in sources:
-                setattr(
-                    self,
-                    f"async_step_args_{source['id']}",
-                    args_method,
-                )
-                setattr(
-                    self,
-                    f"async_step_reconfigure_{source['id']}",
-                    reconfigure_method,
-                )
+        # Get source list and arguments from JSON, loaded once for all flows
+        self._catalogue = get_source_catalogue() or (
+            await self.hass.async_add_executor_job(
+                load_source_catalogue,
+                Path(__file__).with_name("sources.json"),
+                Path(__file__).with_name("sources_manifest.json"),
+            )
+        )
 
     # Step 1: User selects country
     async def async_step_user(
@@ -347,7 +356,7 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
             {
                 vol.Required(CONF_COUNTRY_NAME): SelectSelector(
                     SelectSelectorConfig(
-                        options=[""] + list(self._sources.keys()),
+                        options=[""] + self._catalogue.countries,
                         mode=SelectSelectorMode.DROPDOWN,
                         sort=True,
                     )
@@ -361,14 +370,9 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
         self, info: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         self._country = cast(str, self._country)
-        sources = self._sources[self._country]
-        sources_options = [SelectOptionDict(value="", label="")] + [
-            SelectOptionDict(
-                value=f"{x['module']}\t{x['title']}\t{x['id']}",
-                label=f"{x['title']} ({x['module']})",
-            )
-            for x in sources
-        ]
+        sources_options = cast(
+            list[SelectOptionDict], self._catalogue.get_options(self._country)
+        )
 
         SCHEMA = vol.Schema(
             {
@@ -386,26 +390,21 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
 
         errors = {}
         if info is not None:
-            if not (
-                "\t" in info[CONF_SOURCE_NAME]
-                and info[CONF_SOURCE_NAME].split("\t")[0]
-                in [x["module"] for x in sources]
-            ):
+            entry = self._catalogue.lookup(self._country, info[CONF_SOURCE_NAME])
+            if entry is None:
+                # custom value typed in, accept it if it identifies a single source
+                matches = self._catalogue.search(
+                    info[CONF_SOURCE_NAME], country=self._country
+                )
+                if len(matches) == 1:
+                    entry = matches[0]
+            if entry is None:
                 errors[CONF_SOURCE_NAME] = "invalid_source"
             else:
-                self._source = info[CONF_SOURCE_NAME].split("\t")[0]
-                self._title = info[CONF_SOURCE_NAME].split("\t")[1]
-                self._id = info[CONF_SOURCE_NAME].split("\t")[2]
-                self._extra_info_default_params = next(
-                    (
-                        x["default_params"]
-                        for x in self._sources[self._country]
-                        if info[CONF_SOURCE_NAME].startswith(
-                            f"{x['module']}\t{x['title']}"
-                        )
-                    ),
-                    {},
-                )
+                self._source = entry.module
+                self._title = entry.title
+                self._id = entry.id
+                self._extra_info_default_params = entry.default_params
                 return await self.async_step_args()
 
         return self.async_show_form(step_id="source", data_schema=SCHEMA, errors=errors)
@@ -466,7 +465,7 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
         pre_filled: dict[str, Any],
         args_input: dict[str, Any] | None,
         include_title=True,
-    ) -> Tuple[vol.Schema, types.ModuleType]:
+    ) -> Tuple[vol.Schema, SourceDescription]:
         """Get schema for source arguments.
 
         Args:
@@ -476,7 +475,7 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
             include_title (bool, optional): weather to include the title name field (only used on initial configure not on reconfigure). Defaults to True.
 
         Returns:
-            Tuple[vol.Schema, types.ModuleType]: schema, module
+            Tuple[vol.Schema, SourceDescription]: schema, source description
         """
         suggestions: dict[str, list[Any]] = {}
         if hasattr(self, "_error_suggestions"):
@@ -486,18 +485,18 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 if len(value) > 0
             }
 
-        # Import source and get arguments
-        module = await self.hass.async_add_executor_job(
-            importlib.import_module, f"waste_collection_schedule.source.{source}"
-        )
+        # Get arguments from the manifest, only import sources missing there
+        source_description = self._catalogue.get_description(source)
+        if source_description is None:
+            module = await self.__import_source(source)
+            source_description = SourceDescription.from_module(module)
 
-        args = dict(inspect.signature(module.Source.__init__).parameters)
-        del args["self"]  # Remove self
+        args = {p.name: p for p in source_description.parameters}
         # Convert schema for vol
         vol_args = {}
         title = source  # Default title Should probably be overwritten by the module
-        if hasattr(module, "TITLE") and isinstance(module.TITLE, str):
-            title = module.TITLE
+        if isinstance(source_description.title, str):
+            title = source_description.title
         if hasattr(self, "_title") and isinstance(self._title, str):
             title = self._title
 
@@ -515,9 +514,7 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 ): str,
             }
 
-        MODULE_FLOW_TYPES = (
-            module.CONFIG_FLOW_TYPES if hasattr(module, "CONFIG_FLOW_TYPES") else {}
-        )
+        MODULE_FLOW_TYPES = source_description.flow_types
 
         for arg in args:
             default = args[arg].default
@@ -612,17 +609,21 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 )
 
         schema = vol.Schema(vol_args)
-        return schema, module
+        return schema, source_description
+
+    async def __import_source(self, source: str) -> types.ModuleType:
+        return await self.hass.async_add_executor_job(
+            importlib.import_module, f"waste_collection_schedule.source.{source}"
+        )
 
     async def __validate_args_user_input(
-        self, source: str, args_input: dict[str, Any], module: types.ModuleType
+        self, source: str, args_input: dict[str, Any]
     ) -> Tuple[dict[str, str], dict[str, str], dict[str, Any]]:
         """Validate user input for source arguments.
 
         Args:
             source (str): source name
             args_input (dict[str, Any]): user input
-            module (types.ModuleType): the module of the source
 
         Returns:
             Tuple[dict, dict, dict]: errors, description_placeholders, options
@@ -630,6 +631,8 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
         errors = {}
         description_placeholders: dict[str, str] = {}
 
+        module = await self.__import_source(source)
+
         if hasattr(module, "validate_params"):
             errors.update(module.validate_params(args_input))
         options = {}
@@ -648,12 +651,20 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 self._get_source_instance, module, args_input
             )
 
-            resp: list[Collection] = await self.hass.async_add_executor_job(
-                instance.fetch
-            )
+            resp: list[Collection]
+            if inspect.iscoroutinefunction(instance.fetch):
+                set_client_session = getattr(instance, "set_client_session", None)
+                if callable(set_client_session):
+                    set_client_session(async_get_clientsession(self.hass))
+                resp = await instance.fetch()
+            else:
+                resp = await self.hass.async_add_executor_job(instance.fetch)
 
             if len(resp) == 0:
                 errors["base"] = "fetch_empty"
+            elif not errors:
+                # used by the first refresh of the entry instead of fetching again
+                get_validation_cache().set(source, args_input, resp)
             self._fetched_types = list({x.type.strip() for x in resp})
         except SourceArgumentSuggestionsExceptionBase as e:
             if not hasattr(self, "_error_suggestions"):
@@ -686,20 +697,12 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
         return module.Source(**kwargs)
 
     async def async_source_selected(self) -> None:
-        async def args_method(args_input):
-            return await self.async_step_args(args_input)
-
-        setattr(
-            self,
-            f"async_step_args_{self._id}",
-            args_method,
-        )
         return await self.async_step_args()
 
     # Step 3: User fills in source arguments
     async def async_step_args(self, args_input=None) -> ConfigFlowResult:
         self._source = cast(str, self._source)
-        schema, module = await self.__get_arg_schema(
+        schema, _ = await self.__get_arg_schema(
             self._source, self._extra_info_default_params, args_input
         )
         errors: dict[str, str] = {}
@@ -711,10 +714,10 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 errors,
                 description_placeholders,
                 options,
-            ) = await self.__validate_args_user_input(self._source, args_input, module)
+            ) = await self.__validate_args_user_input(self._source, args_input)
 
             if len(errors) > 0:
-                schema, module = await self.__get_arg_schema(
+                schema, _ = await self.__get_arg_schema(
                     self._source, self._extra_info_default_params, args_input
                 )
             else:
@@ -856,6 +859,23 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
     def async_get_options_flow(config_entry: ConfigEntry):
         return WasteCollectionOptionsFlow(config_entry)
 
+    @staticmethod
+    def _remove_cached_collections(
+        config_entry: ConfigEntry, args_input: dict[str, Any]
+    ) -> None:
+        """Remove the cached collections of the previous arguments of the source."""
+        source = config_entry.data[CONF_SOURCE_NAME]
+        unique_id = calc_unique_source_id(source, config_entry.data[CONF_SOURCE_ARGS])
+        store = get_collection_cache_store()
+        # the shell of this entry is released by the reload, identical sources of
+        # other entries (or YAML) still use the cached collections
+        if (
+            store is not None
+            and unique_id != calc_unique_source_id(source, args_input)
+            and get_shell_registry().refcount(unique_id) <= 1
+        ):
+            store.remove(unique_id)
+
     async def async_step_reconfigure(self, args_input: dict[str, Any] | None = None):
         await self._async_setup_sources()
 
@@ -866,10 +886,10 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
             return self.async_abort(reason="reconfigure_failed")
 
         source = config_entry.data["name"]
-        schema, module = await self.__get_arg_schema(
+        schema, source_description = await self.__get_arg_schema(
             source, config_entry.data["args"], args_input, include_title=False
         )
-        title = module.TITLE
+        title = source_description.title
         errors: dict[str, str] = {}
         description_placeholders: dict[str, str] = {}
         # If all args are filled in
@@ -879,8 +899,9 @@ class WasteCollectionConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call
                 errors,
                 description_placeholders,
                 options,
-            ) = await self.__validate_args_user_input(source, args_input, module)
+            ) = await self.__validate_args_user_input(source, args_input)
             if len(errors) == 0:
+                self._remove_cached_collections(config_entry, args_input)
                 data = {**config_entry.data}
                 data.update({CONF_SOURCE_NAME: source, CONF_SOURCE_ARGS: args_input})
                 return self.async_update_reload_and_abort(
@@ -973,6 +994,18 @@ class WasteCollectionOptionsFlow(OptionsFlow):
                         CONF_DAY_OFFSET, CONF_DAY_OFFSET_DEFAULT
                     ),
                 ): int,
+                vol.Optional(
+                    CONF_CACHE_MAX_AGE,
+                    default=self._entry.options.get(
+                        CONF_CACHE_MAX_AGE, CONF_CACHE_MAX_AGE_DEFAULT
+                    ),
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_MAX_FETCH_INTERVAL,
+                    default=self._entry.options.get(
+                        CONF_MAX_FETCH_INTERVAL, CONF_MAX_FETCH_INTERVAL_DEFAULT
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
                 vol.Optional(
                     "sensor_select",
                 ): SelectSelector(
@@ -5,7 +5,17 @@ from typing import Final
 # Component domain, used to store component data in hass data.
 DOMAIN: Final = "waste_collection_schedule"
 
+# sent at the day switch and at midnight to update the YAML configured sensors
 UPDATE_SENSORS_SIGNAL: Final = "wcs_update_sensors_signal"
+# sent if the entries of a source changed, suffixed with the unique id of the
+# source (shared by identical sources of YAML and config entries)
+UPDATE_SOURCE_SIGNAL: Final = "wcs_update_source_signal"
+# sent after every fetch of a source, suffixed with the unique id of the source
+UPDATE_METRICS_SIGNAL: Final = "wcs_update_metrics_signal"
+
+# directory (within the configuration directory) of the conditional HTTP request
+# cache, not in .storage which is meant for Store files only
+HTTP_CACHE_DIRECTORY: Final = "waste_collection_schedule_http_cache"
 
 CONFIG_VERSION: Final = 2
 CONFIG_MINOR_VERSION: Final = 7
@@ -23,6 +33,10 @@ CONF_SEPARATOR: Final = "separator"
 CONF_FETCH_TIME: Final = "fetch_time"
 CONF_RANDOM_FETCH_TIME_OFFSET: Final = "random_fetch_time_offset"
 CONF_DAY_SWITCH_TIME: Final = "day_switch_time"
+CONF_CACHE_MAX_AGE: Final = "cache_max_age"
+CONF_MAX_PARALLEL_FETCHES: Final = "max_parallel_fetches"
+CONF_FETCH_TIMEOUT: Final = "fetch_timeout"
+CONF_MAX_FETCH_INTERVAL: Final = "max_fetch_interval"
 
 CONF_CUSTOMIZE: Final = "customize"
 CONF_TYPE: Final = "type"
@@ -39,6 +53,10 @@ CONF_SEPARATOR_DEFAULT: Final = ", "
 CONF_FETCH_TIME_DEFAULT: Final = "01:00"
 CONF_RANDOM_FETCH_TIME_OFFSET_DEFAULT: Final = 60
 CONF_DAY_SWITCH_TIME_DEFAULT: Final = "10:00"
+CONF_CACHE_MAX_AGE_DEFAULT: Final = 24  # hours
+CONF_MAX_PARALLEL_FETCHES_DEFAULT: Final = 4
+CONF_FETCH_TIMEOUT_DEFAULT: Final = 300  # seconds
+CONF_MAX_FETCH_INTERVAL_DEFAULT: Final = 7  # days
 
 # Sensor config var names
 
@@ -0,0 +1,207 @@
+"""Fetch queue shared by all config entries and the YAML API.
+
+Many entries usually use the same few back-ends (abfall.io, jumomind, ...).
+Fetches are grouped by provider, the registrable domain of the URL declared by
+the source module (e.g. jumomind.de for all sources using the Jumomind API). Every provider has a token bucket limiting the rate of fetches and a
+limit of concurrent fetches. The daily fetches of a provider are spread evenly
+across the random fetch time window instead of randomly. Identical sources
+sharing their fetches (ShellGroup) are queued only once.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from .waste_collection_schedule import SourceShell
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# fetches per minute and provider, up to FETCH_BURST fetches are started at once
+FETCH_RATE_PER_MINUTE = 6.0
+FETCH_BURST = 2
+MAX_CONCURRENT_FETCHES_PER_PROVIDER = 2
+
+# fractional part of the golden ratio, consecutive multiples are evenly spread in [0, 1)
+_GOLDEN_RATIO = 0.6180339887498949
+
+_SECOND_LEVEL_DOMAINS = {"ac", "co", "com", "edu", "gov", "net", "org"}
+
+
+def provider_key(shell: SourceShell) -> str:
+    """Return the provider of a source, e.g. "abfall.io" for api.abfall.io.
+
+    Known before the first fetch and stable across fetches, taken from the URL
+    declared by the source module (some modules omit the scheme).
+    """
+    host = None
+    if shell.url:
+        url = shell.url if "//" in shell.url else f"//{shell.url}"
+        host = urlsplit(url).hostname
+    if not host:
+        # nothing known about the provider, don't share the limits with other sources
+        return shell.unique_id
+    labels = host.lower().rstrip(".").split(".")
+    # keep 3 labels for second level domains like co.uk or com.au
+    n = 3 if len(labels) > 2 and labels[-2] in _SECOND_LEVEL_DOMAINS else 2
+    return ".".join(labels[-n:])
+
+
+@dataclass
+class ProviderStats:
+    """Current queue depth and wait times of a provider."""
+
+    queued: int = 0
+    active: int = 0
+    fetches: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+@dataclass
+class _Provider:
+    semaphore: asyncio.Semaphore
+    tokens: float
+    updated: float
+    offset: float = field(default_factory=random.random)
+    slots: int = 0
+    stats: ProviderStats = field(default_factory=ProviderStats)
+
+
+class FetchQueue:
+    """Token bucket and concurrency limit per provider."""
+
+    def __init__(
+        self,
+        rate_per_minute: float = FETCH_RATE_PER_MINUTE,
+        burst: int = FETCH_BURST,
+        max_concurrent: int = MAX_CONCURRENT_FETCHES_PER_PROVIDER,
+    ):
+        self._rate = rate_per_minute / 60
+        self._burst = max(1, burst)
+        self._max_concurrent = max(1, max_concurrent)
+        self._providers: dict[str, _Provider] = {}
+        # unique id of a shell group -> result of the fetch of the group queued
+        # or running
+        self._groups: dict[str, asyncio.Future[Any]] = {}
+
+    def _provider(self, key: str) -> _Provider:
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = self._providers[key] = _Provider(
+                semaphore=asyncio.Semaphore(self._max_concurrent),
+                tokens=self._burst,
+                updated=time.monotonic(),
+            )
+        return provider
+
+    @property
+    def depth(self) -> int:
+        """Number of fetches waiting in the queue (of all providers)."""
+        return sum(p.stats.queued for p in self._providers.values())
+
+    def stats(self) -> dict[str, ProviderStats]:
+        return {key: p.stats for key, p in self._providers.items()}
+
+    def spread_delay(self, shell: SourceShell, window: float) -> float:
+        """Return the delay of a daily fetch within the window (in seconds).
+
+        Fetches of the same provider get evenly spread slots in the window.
+        """
+        if window <= 0:
+            return 0
+        provider = self._provider(provider_key(shell))
+        slot = (provider.offset + provider.slots * _GOLDEN_RATIO) % 1
+        provider.slots += 1
+        return slot * window
+
+    async def _acquire_token(self, provider: _Provider) -> None:
+        while True:
+            now = time.monotonic()
+            provider.tokens = min(
+                self._burst, provider.tokens + (now - provider.updated) * self._rate
+            )
+            provider.updated = now
+            if provider.tokens >= 1:
+                provider.tokens -= 1
+                return
+            await asyncio.sleep((1 - provider.tokens) / self._rate)
+
+    async def async_run(
+        self, shell: SourceShell, fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run fetch once the provider of the source allows it.
+
+        While a shell of the same group is queued or fetching, the others wait
+        for its result without taking a slot or token of the provider. They
+        get the entries of a successful fetch from the group and only queue
+        themselves if it failed.
+        """
+        group = shell.group
+        if group is None:
+            return await self._async_run(shell, fetch)
+        while (pending := self._groups.get(group.unique_id)) is not None:
+            result = await asyncio.shield(pending)
+            if result:
+                _LOGGER.debug("Fetch of %s shared by its group", shell.title)
+                return result
+        pending = asyncio.get_running_loop().create_future()
+        self._groups[group.unique_id] = pending
+        result = None
+        try:
+            result = await self._async_run(shell, fetch)
+            return result
+        finally:
+            del self._groups[group.unique_id]
+            pending.set_result(result)
+
+    async def _async_run(
+        self, shell: SourceShell, fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        key = provider_key(shell)
+        provider = self._provider(key)
+        stats = provider.stats
+        depth = stats.queued
+        stats.queued += 1
+        queued = time.monotonic()
+        started = False
+        try:
+            async with provider.semaphore:
+                await self._acquire_token(provider)
+                started = True
+                wait = time.monotonic() - queued
+                stats.queued -= 1
+                stats.active += 1
+                stats.fetches += 1
+                stats.last_wait = wait
+                stats.max_wait = max(stats.max_wait, wait)
+                shell.metrics.record_queue(wait, depth)
+                if wait >= 1:
+                    _LOGGER.debug(
+                        "Fetch of %s waited %.0f s for %s", shell.title, wait, key
+                    )
+                try:
+                    return await fetch()
+                finally:
+                    stats.active -= 1
+        finally:
+            if not started:
+                # cancelled while waiting
+                stats.queued -= 1
+
+
+# Global queue instance
+_fetch_queue: Optional[FetchQueue] = None
+
+
+def get_fetch_queue() -> FetchQueue:
+    """Get the global fetch queue instance."""
+    global _fetch_queue
+    if _fetch_queue is None:
+        _fetch_queue = FetchQueue()
+    return _fetch_queue
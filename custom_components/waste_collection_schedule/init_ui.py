@@ -11,10 +11,18 @@ from homeassistant.core import HomeAssistant
 
 from .service import get_fetch_all_service
 from .wcs_coordinator import WCSCoordinator
+from .waste_collection_schedule.service.CollectionCacheStore import (
+    get_collection_cache_store,
+    initialize_collection_cache_store,
+)
 from .waste_collection_schedule.service.DeviceKeyStore import initialize_device_key_store
 
 from . import const  # type: ignore # isort:skip # noqa: E402
 from .waste_collection_schedule import SourceShell, Customize  # type: ignore # isort:skip # noqa: E402
+from .waste_collection_schedule.shell_registry import get_shell_registry  # type: ignore # isort:skip # noqa: E402
+from .waste_collection_schedule.source_shell import calc_unique_source_id  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.service.HttpClient import get_http_client  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.service.ResolvedIdStore import initialize_resolved_id_store  # type: ignore # isort:skip # noqa: E402
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +43,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     device_store = initialize_device_key_store(hass)
     await device_store.async_load()
 
+    # Initialize and load cache of previously fetched collections
+    cache_store = initialize_collection_cache_store(hass)
+    await cache_store.async_load()
+
+    # Initialize and load provider ids resolved by sources
+    await initialize_resolved_id_store(hass).async_load()
+
+    # keep downloaded files for conditional requests across restarts
+    get_http_client().set_cache_directory(hass.config.path(const.HTTP_CACHE_DIRECTORY))
+
     customize_dicts: dict[str, dict[str, Any]] = options.get(const.CONF_CUSTOMIZE, {})
 
     customize: dict[str, Customize] = {}
@@ -72,8 +90,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         day_switch_time=cv.time(
             options.get(const.CONF_DAY_SWITCH_TIME, const.CONF_DAY_SWITCH_TIME_DEFAULT)
         ),
+        cache_max_age=options.get(
+            const.CONF_CACHE_MAX_AGE, const.CONF_CACHE_MAX_AGE_DEFAULT
+        ),
+        max_fetch_interval=options.get(
+            const.CONF_MAX_FETCH_INTERVAL, const.CONF_MAX_FETCH_INTERVAL_DEFAULT
+        ),
     )
 
+    # before the first refresh, which raises ConfigEntryNotReady if it fails and
+    # the timers of the coordinator have to be cancelled before the retry
+    entry.async_on_unload(coordinator.async_unload)
     await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(const.DOMAIN, {})[entry.entry_id] = coordinator
@@ -99,7 +126,21 @@ async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> bool
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[const.DOMAIN].pop(entry.entry_id, None)
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached collections of a deleted config entry."""
+    unique_id = calc_unique_source_id(
+        entry.data[const.CONF_SOURCE_NAME], entry.data[const.CONF_SOURCE_ARGS]
+    )
+    store = get_collection_cache_store()
+    # keep them if an identical source of another entry (or YAML) still uses them
+    if store is not None and get_shell_registry().refcount(unique_id) == 0:
+        store.remove(unique_id)
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
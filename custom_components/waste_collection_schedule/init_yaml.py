@@ -11,12 +11,17 @@ from homeassistant.helpers.discovery import async_load_platform
 
 from .service import get_fetch_all_service
 from .waste_collection_api import WasteCollectionApi
+from .waste_collection_schedule.service.CollectionCacheStore import (
+    initialize_collection_cache_store,
+)
 
 # add module directory to path
 package_dir = Path(__file__).resolve().parents[0]
 site.addsitedir(str(package_dir))
 from . import const  # type: ignore # isort:skip # noqa: E402
 from waste_collection_schedule import Customize  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.service.HttpClient import get_http_client  # type: ignore # isort:skip # noqa: E402
+from waste_collection_schedule.service.ResolvedIdStore import initialize_resolved_id_store  # type: ignore # isort:skip # noqa: E402
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +70,22 @@ CONFIG_SCHEMA = vol.Schema(
                     const.CONF_DAY_SWITCH_TIME,
                     default=const.CONF_DAY_SWITCH_TIME_DEFAULT,
                 ): cv.time,
+                vol.Optional(
+                    const.CONF_CACHE_MAX_AGE,
+                    default=const.CONF_CACHE_MAX_AGE_DEFAULT,
+                ): cv.positive_int,
+                vol.Optional(
+                    const.CONF_MAX_PARALLEL_FETCHES,
+                    default=const.CONF_MAX_PARALLEL_FETCHES_DEFAULT,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    const.CONF_FETCH_TIMEOUT,
+                    default=const.CONF_FETCH_TIMEOUT_DEFAULT,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    const.CONF_MAX_FETCH_INTERVAL,
+                    default=const.CONF_MAX_FETCH_INTERVAL_DEFAULT,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }
         )
     },
@@ -87,6 +108,10 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
             const.CONF_RANDOM_FETCH_TIME_OFFSET
         ],
         day_switch_time=config[const.DOMAIN][const.CONF_DAY_SWITCH_TIME],
+        cache_max_age=config[const.DOMAIN][const.CONF_CACHE_MAX_AGE],
+        max_parallel_fetches=config[const.DOMAIN][const.CONF_MAX_PARALLEL_FETCHES],
+        fetch_timeout=config[const.DOMAIN][const.CONF_FETCH_TIMEOUT],
+        max_fetch_interval=config[const.DOMAIN][const.CONF_MAX_FETCH_INTERVAL],
     )
 
     # create shells for source(s)
@@ -115,14 +140,25 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
             source.get(const.CONF_DAY_OFFSET, 0),
         )
 
+    # restore entries of the last fetch
+    cache_store = initialize_collection_cache_store(hass)
+    await cache_store.async_load()
+
+    # provider ids resolved by sources, skips the lookup of ids on the first fetch
+    await initialize_resolved_id_store(hass).async_load()
+
+    # keep downloaded files for conditional requests across restarts
+    get_http_client().set_cache_directory(hass.config.path(const.HTTP_CACHE_DIRECTORY))
+    api.restore_cache()
+
     # store api object
     hass.data.setdefault(const.DOMAIN, {})["YAML_CONFIG"] = api
 
     # load calendar platform
     await async_load_platform(hass, "calendar", const.DOMAIN, {"api": api}, config)
 
-    # initial fetch of all data
-    hass.add_job(api._fetch)
+    # initial fetch of all data not restored from the collection cache
+    hass.add_job(api._fetch_stale)
 
     # Register new Service fetch_data
     hass.services.async_register(
@@ -0,0 +1,93 @@
+"""Daily timers shared by all coordinators and the YAML API.
+
+Every coordinator needs a tick at its fetch time, its day switch time and at
+midnight. Instead of registering own time change listeners, which must be
+cancelled on unload, they subscribe to the scheduler. It owns one Home
+Assistant timer per distinct time of day and calls the subscribed actions of
+the live coordinators only.
+"""
+
+import datetime
+import itertools
+import logging
+from typing import Any, Callable, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DailyScheduler:
+    """One time change listener per time of day, fanned out to subscribers."""
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._ids = itertools.count()
+        self._jobs: dict[datetime.time, dict[int, HassJob]] = {}
+        self._timers: dict[datetime.time, CALLBACK_TYPE] = {}
+
+    @property
+    def timer_count(self) -> int:
+        """Number of registered Home Assistant timers."""
+        return len(self._timers)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    @callback
+    def async_track_time(
+        self, at: datetime.time, action: Callable[[datetime.datetime], Any]
+    ) -> CALLBACK_TYPE:
+        """Call action (callback or coroutine function) daily at the given time.
+
+        Returns a function to unsubscribe.
+        """
+        at = at.replace(microsecond=0, tzinfo=None)
+        jobs = self._jobs.get(at)
+        if jobs is None:
+
+            @callback
+            def tick(now: datetime.datetime) -> None:
+                self._tick(at, now)
+
+            jobs = self._jobs[at] = {}
+            self._timers[at] = async_track_time_change(
+                self._hass, tick, at.hour, at.minute, at.second
+            )
+            _LOGGER.debug("Registered daily timer at %s", at)
+        key = next(self._ids)
+        jobs[key] = HassJob(action)
+
+        @callback
+        def unsubscribe() -> None:
+            jobs.pop(key, None)
+            # jobs may already be replaced if all subscribers left before
+            if not jobs and self._jobs.get(at) is jobs:
+                del self._jobs[at]
+                self._timers.pop(at)()
+
+        return unsubscribe
+
+    @callback
+    def _tick(self, at: datetime.time, now: datetime.datetime) -> None:
+        for job in list(self._jobs.get(at, {}).values()):
+            self._hass.async_run_hass_job(job, now)
+
+
+# Global scheduler instance
+_daily_scheduler: Optional[DailyScheduler] = None
+
+
+def get_daily_scheduler() -> Optional[DailyScheduler]:
+    """Get the global scheduler instance."""
+    return _daily_scheduler
+
+
+def initialize_daily_scheduler(hass: HomeAssistant) -> DailyScheduler:
+    """Initialize the global scheduler (once per Home Assistant instance)."""
+    global _daily_scheduler
+    if _daily_scheduler is None or _daily_scheduler._hass is not hass:
+        _daily_scheduler = DailyScheduler(hass)
+    return _daily_scheduler
@@ -3,13 +3,25 @@
 import datetime
 import logging
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
+from homeassistant.components.sensor import (
+    PLATFORM_SCHEMA,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME, CONF_VALUE_TEMPLATE
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_VALUE_TEMPLATE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.template import Template
@@ -33,7 +45,8 @@ from .const import (
     UPDATE_SENSORS_SIGNAL,
 )
 from .waste_collection_api import WasteCollectionApi
-from .waste_collection_schedule import Collection, CollectionGroup
+from .waste_collection_schedule import Collection, CollectionGroup, SourceShell
+from .waste_collection_schedule.circuit_breaker import STATE_CLOSED
 from .wcs_coordinator import WCSCoordinator
 
 # fmt: on
@@ -51,6 +64,97 @@ class DetailsFormat(Enum):
     hidden = "hidden"  # hide details
 
 
+def _metrics_sensor(key: str, name: str, **kwargs) -> SensorEntityDescription:
+    # diagnostic sensors, disabled by default
+    return SensorEntityDescription(
+        key=key,
+        name=name,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        **kwargs,
+    )
+
+
+METRICS_SENSORS: list[tuple[SensorEntityDescription, Callable[[SourceShell], Any]]] = [
+    (
+        _metrics_sensor(
+            "fetch_duration",
+            "Fetch duration",
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+        ),
+        lambda shell: shell.metrics.duration,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_requests",
+            "Fetch requests",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda shell: shell.metrics.requests,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_bytes",
+            "Fetch bytes",
+            device_class=SensorDeviceClass.DATA_SIZE,
+            native_unit_of_measurement=UnitOfInformation.BYTES,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda shell: shell.metrics.bytes,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_entries",
+            "Fetched entries",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda shell: shell.metrics.entries,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_queue_wait",
+            "Fetch queue wait",
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+        ),
+        lambda shell: shell.metrics.queue_wait,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_queue_depth",
+            "Fetch queue depth",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda shell: shell.metrics.queue_depth,
+    ),
+    (
+        _metrics_sensor(
+            "last_fetch_success",
+            "Last successful fetch",
+            device_class=SensorDeviceClass.TIMESTAMP,
+        ),
+        lambda shell: shell.metrics.last_success,
+    ),
+    (
+        _metrics_sensor("last_fetch_error", "Last fetch error"),
+        lambda shell: shell.metrics.last_error,
+    ),
+    (
+        _metrics_sensor(
+            "fetch_failures",
+            "Consecutive fetch failures",
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        lambda shell: shell.breaker.failures,
+    ),
+]
+
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_NAME): cv.string,
@@ -72,7 +176,7 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
 # Config flow setup
 async def async_setup_entry(hass, config: ConfigEntry, async_add_entities):
     coordinator = hass.data[DOMAIN][config.entry_id]
-    aggregator = CollectionAggregator([coordinator.shell])
+    aggregator = coordinator.aggregator
     _LOGGER.debug("Adding sensors for %s", coordinator.shell.calendar_title)
     _LOGGER.debug("Config: %s", config)
 
@@ -115,6 +219,9 @@ async def async_setup_entry(hass, config: ConfigEntry, async_add_entities):
             )
         )
 
+    for description, value_fn in METRICS_SENSORS:
+        entities.append(FetchMetricsSensor(coordinator, description, value_fn))
+
     async_add_entities(entities, update_before_add=True)
 
 
@@ -149,7 +256,7 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
             )
         shells.append(shell)
 
-    aggregator = CollectionAggregator(shells)
+    aggregator = api.get_aggregator(shells)
 
     entities = []
 
@@ -218,16 +325,24 @@ class ScheduleSensor(SensorEntity):
             self._attr_unique_id = name
         self._attr_should_poll = False
 
-        async_dispatcher_connect(hass, UPDATE_SENSORS_SIGNAL, self._update_sensor)
-
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
 
         if self._coordinator:
+            # fetches and day switch of this entry
             self.async_on_remove(
                 self._coordinator.async_add_listener(self._update_sensor, None)
             )
+        else:
+            # day switch of all YAML sensors and changes of the sources used
+            signals = {UPDATE_SENSORS_SIGNAL} | {
+                WasteCollectionApi.update_signal(s) for s in self._aggregator.shells
+            }
+            for signal in signals:
+                self.async_on_remove(
+                    async_dispatcher_connect(self.hass, signal, self._update_sensor)
+                )
 
         self._update_sensor()
 
@@ -299,10 +414,12 @@ class ScheduleSensor(SensorEntity):
         if self._aggregator is None:
             return None
 
-        upcoming1 = self._aggregator.get_upcoming_group_by_day(
+        # memoized, shared with all other entities of this aggregator
+        view = self._aggregator.view(include_today=self._include_today)
+
+        upcoming1 = view.get_upcoming_group_by_day(
             count=1,
             include_types=self._collection_types,
-            include_today=self._include_today,
             start_index=self._event_index,
         )
 
@@ -318,11 +435,10 @@ class ScheduleSensor(SensorEntity):
 
         if self._details_format == DetailsFormat.upcoming:
             # show upcoming events list in details
-            upcoming = self._aggregator.get_upcoming_group_by_day(
+            upcoming = view.get_upcoming_group_by_day(
                 count=self._count,
                 leadtime=self._leadtime,
                 include_types=self._collection_types,
-                include_today=self._include_today,
                 start_index=self._event_index,
             )
             for collection in upcoming:
@@ -332,10 +448,9 @@ class ScheduleSensor(SensorEntity):
         elif self._details_format == DetailsFormat.appointment_types:
             # show list of collections in details
             for t in collection_types:
-                collections = self._aggregator.get_upcoming(
+                collections = view.get_upcoming(
                     count=1,
                     include_types=[t],
-                    include_today=self._include_today,
                     start_index=self._event_index,
                 )
                 date = (
@@ -345,11 +460,10 @@ class ScheduleSensor(SensorEntity):
         elif self._details_format == DetailsFormat.generic:
             # insert generic attributes into details
             attributes["types"] = collection_types
-            attributes["upcoming"] = self._aggregator.get_upcoming(
+            attributes["upcoming"] = view.get_upcoming(
                 count=self._count,
                 leadtime=self._leadtime,
                 include_types=self._collection_types,
-                include_today=self._include_today,
             )
             refreshtime = ""
             if self._aggregator.refreshtime is not None:
@@ -360,8 +474,50 @@ class ScheduleSensor(SensorEntity):
             if self._add_days_to:
                 attributes["daysTo"] = upcoming1[0].daysTo
 
+        # only shown if fetches of a source failed repeatedly
+        fetch_state = self._aggregator.fetch_state
+        if fetch_state != STATE_CLOSED:
+            attributes["fetch_state"] = fetch_state
+
         self._attr_extra_state_attributes = attributes
         self._add_refreshtime()
 
         if self.hass is not None:
             self.async_write_ha_state()
+
+
+class FetchMetricsSensor(SensorEntity):
+    """Diagnostic sensor for the fetches of a source."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: WCSCoordinator,
+        description: SensorEntityDescription,
+        value_fn: Callable[[SourceShell], Any],
+    ):
+        """Initialize the entity."""
+        self.entity_description = description
+        self._coordinator = coordinator
+        self._value_fn = value_fn
+        # per entry, several entries may use the same source (and arguments)
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = coordinator.device_info
+        self._attr_native_value = value_fn(coordinator.shell)
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._coordinator.metrics_signal, self._update_sensor
+            )
+        )
+
+    @callback
+    def _update_sensor(self):
+        """Update the state after a fetch."""
+        self._attr_native_value = self._value_fn(self._coordinator.shell)
+        self.async_write_ha_state()
@@ -0,0 +1,62 @@
+"""Entries fetched by the config flow, handed to the first refresh of the entry.
+
+The config flow fetches the source to validate the arguments. Instead of
+fetching it again seconds later in async_setup_entry, the coordinator of the
+new (or reconfigured) entry takes the validated entries from this cache.
+"""
+
+import logging
+import time
+from typing import Any, Iterable, Mapping, Optional
+
+from .waste_collection_schedule.source_shell import calc_unique_source_id
+
+_LOGGER = logging.getLogger(__name__)
+
+# the remaining steps of the config flow (customize, sensors) may take a while
+MAX_AGE = 15 * 60  # seconds
+
+
+class ValidationCache:
+    """Short-lived in-memory cache of validated entries, keyed by source and args."""
+
+    def __init__(self, max_age: float = MAX_AGE):
+        self._max_age = max_age
+        # unique source id -> (time.monotonic(), raw entries)
+        self._entries: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, (t, _) in self._entries.items() if now - t > self._max_age]
+        for key in expired:
+            del self._entries[key]
+
+    def set(
+        self,
+        source_name: str,
+        source_args: dict[str, Any],
+        entries: Iterable[Mapping[str, Any]],
+    ) -> None:
+        """Store the entries returned by the fetch of the source."""
+        now = time.monotonic()
+        self._prune(now)
+        key = calc_unique_source_id(source_name, source_args)
+        # unmodified entries in the format of the collection cache
+        self._entries[key] = (now, [dict(e) for e in entries])
+
+    def pop(self, unique_id: str) -> Optional[list[dict[str, Any]]]:
+        """Return (and remove) the entries validated recently for a source."""
+        self._prune(time.monotonic())
+        item = self._entries.pop(unique_id, None)
+        return item[1] if item is not None else None
+
+
+# Global cache instance
+_validation_cache: Optional[ValidationCache] = None
+
+
+def get_validation_cache() -> ValidationCache:
+    """Get the global validation cache instance."""
+    global _validation_cache
+    if _validation_cache is None:
+        _validation_cache = ValidationCache()
+    return _validation_cache
@@ -1,17 +1,27 @@
 # This is the class organizing the different sources when using the yaml configuration
-from datetime import time
-from random import randrange
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from functools import partial
 from typing import Any
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.dispatcher import dispatcher_send
-from homeassistant.helpers.event import (
-    async_call_later,
-    async_track_time_change,
-)
+from homeassistant.helpers.event import async_call_later
 
 from . import const
-from .waste_collection_schedule import Customize, SourceShell
+from .fetch_queue import get_fetch_queue
+from .scheduler import initialize_daily_scheduler
+from .waste_collection_schedule import CollectionAggregator, Customize, SourceShell
+from .waste_collection_schedule.service.CollectionCacheStore import (
+    get_collection_cache_store,
+)
+from .waste_collection_schedule.shell_registry import get_shell_registry
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class WasteCollectionApi:
@@ -24,42 +34,53 @@ class WasteCollectionApi:
         fetch_time: time,
         random_fetch_time_offset: int,
         day_switch_time: time,
+        cache_max_age: int = const.CONF_CACHE_MAX_AGE_DEFAULT,
+        max_parallel_fetches: int = const.CONF_MAX_PARALLEL_FETCHES_DEFAULT,
+        fetch_timeout: int = const.CONF_FETCH_TIMEOUT_DEFAULT,
+        max_fetch_interval: int = const.CONF_MAX_FETCH_INTERVAL_DEFAULT,
     ):
         self._hass = hass
         self._source_shells: list[SourceShell] = []
+        self._aggregators: dict[tuple[int, ...], CollectionAggregator] = {}
         self._separator = separator
         self._fetch_time = fetch_time
         self._random_fetch_time_offset = random_fetch_time_offset
         self._day_switch_time = day_switch_time
+        self._cache_max_age = timedelta(hours=cache_max_age)
+        self._fetch_timeout = fetch_timeout
+        self._max_fetch_interval = max_fetch_interval
+        self._retries: dict[int, CALLBACK_TYPE] = {}
+        # pending daily fetches, spread across the random offset window
+        self._pending_fetches: dict[int, CALLBACK_TYPE] = {}
 
-        # start timer to fetch date once per day
-        async_track_time_change(
-            hass,
-            self._fetch_callback,
-            self._fetch_time.hour,
-            self._fetch_time.minute,
-            self._fetch_time.second,
+        # dedicated thread pool, so that slow sources don't block other sources
+        # or the executor of Home Assistant
+        self._max_parallel_fetches = max(1, max_parallel_fetches)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_parallel_fetches,
+            thread_name_prefix="waste_collection_schedule",
         )
+        # a slot is held until the fetch finished, even after a timeout
+        self._fetch_slots = asyncio.Semaphore(self._max_parallel_fetches)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._shutdown_callback)
 
-        # start timer for day-switch time
-        if self._day_switch_time != self._fetch_time:
-            async_track_time_change(
-                hass,
-                self._update_sensors_callback,
-                self._day_switch_time.hour,
-                self._day_switch_time.minute,
-                self._day_switch_time.second,
-            )
+        # daily ticks of the shared scheduler
+        scheduler = initialize_daily_scheduler(hass)
+        self._unsubscribe = [
+            # fetch sources which are due once per day
+            scheduler.async_track_time(self._fetch_time, self._fetch_callback),
+            # day-switch time (fetches don't update the sensors if skipped or
+            # without changes)
+            scheduler.async_track_time(
+                self._day_switch_time, self._update_sensors_callback
+            ),
+        ]
 
-        # add a timer at midnight (if not already there) to update days-to
+        # midnight (if not already there) to update days-to
         midnight = time.min
-        if midnight != self._fetch_time and midnight != self._day_switch_time:
-            async_track_time_change(
-                hass,
-                self._update_sensors_callback,
-                midnight.hour,
-                midnight.minute,
-                midnight.second,
+        if midnight != self._day_switch_time:
+            self._unsubscribe.append(
+                scheduler.async_track_time(midnight, self._update_sensors_callback)
             )
 
     @property
@@ -94,33 +115,219 @@ class WasteCollectionApi:
         )
 
         if new_shell:
+            # share the fetches with identical sources of config entries
+            get_shell_registry().acquire(new_shell)
             self._source_shells.append(new_shell)
         return new_shell
 
-    def _fetch(self, *_):
+    async def _fetch(self, *_):
+        await self._fetch_shells(self._source_shells)
+
+    async def _fetch_stale(self, *_):
+        """Fetch all sources without recent enough entries in the collection cache."""
+        for shell in self._source_shells:
+            if not shell.breaker.allow_fetch():
+                # failed repeatedly before the restart, wait for the next probe
+                self._schedule_retry(shell)
+        await self._fetch_shells(
+            [
+                s
+                for s in self._source_shells
+                if s.breaker.allow_fetch() and s.is_stale(self._cache_max_age)
+            ]
+        )
+
+    async def _fetch_shells(self, shells: list[SourceShell]):
+        """Fetch the given sources concurrently, limited by max_parallel_fetches."""
+        await asyncio.gather(*(self._fetch_shell(shell) for shell in shells))
+        self._update_cache_callback()
+
+        # sources use the top-level package, import the store the same way to share the instance
+        from waste_collection_schedule.service.ResolvedIdStore import (  # type: ignore # isort:skip
+            get_resolved_id_store,
+        )
+
+        await get_resolved_id_store().async_save()
+
+    async def _fetch_shell(self, shell: SourceShell):
+        breaker_state = shell.breaker.state
+        # limited by the rate and concurrency limits of the provider
+        success = await get_fetch_queue().async_run(
+            shell, partial(self._fetch_with_timeout, shell, breaker_state)
+        )
+        if success is not None:
+            self._fetch_done(shell, breaker_state, success)
+
+    async def _fetch_with_timeout(
+        self, shell: SourceShell, breaker_state: str
+    ) -> bool | None:
+        """Fetch a source, return None if a sync fetch timed out.
+
+        The thread of a timed out sync fetch can't be cancelled. It keeps its
+        slot and its result is applied by _fetch_done whenever it finishes.
+        """
+        await self._fetch_slots.acquire()
+        if shell.is_async:
+            try:
+                return await asyncio.wait_for(
+                    shell.async_fetch(async_get_clientsession(self._hass)),
+                    self._fetch_timeout,
+                )
+            except asyncio.TimeoutError:
+                self._log_timeout(shell)
+                # async fetches are cancelled and recorded as failed
+                return False
+            finally:
+                self._fetch_slots.release()
+
+        try:
+            future = self._hass.loop.run_in_executor(self._executor, shell.fetch)
+        except BaseException:
+            # e.g. the executor is shut down, no thread holds the slot
+            self._fetch_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._fetch_slots.release())
+        try:
+            # shielded, a cancelled future would release the slot too early
+            return await asyncio.wait_for(asyncio.shield(future), self._fetch_timeout)
+        except asyncio.TimeoutError:
+            self._log_timeout(shell)
+            future.add_done_callback(
+                partial(self._late_fetch_done, shell, breaker_state)
+            )
+            return None
+
+    @callback
+    def _late_fetch_done(
+        self, shell: SourceShell, breaker_state: str, future: asyncio.Future
+    ) -> None:
+        """Apply the result of a sync fetch which finished after its timeout."""
+        if future.cancelled():
+            # executor shut down
+            return
+        _LOGGER.info("fetch for source %s finished after its timeout", shell.title)
+        self._fetch_done(shell, breaker_state, future.result())
+        self._update_cache_callback()
+
+    def _log_timeout(self, shell: SourceShell) -> None:
+        _LOGGER.error(
+            "fetch for source %s did not finish within %s seconds",
+            shell.title,
+            self._fetch_timeout,
+        )
+
+    @callback
+    def _fetch_done(self, shell: SourceShell, breaker_state: str, success: bool):
+        if success:
+            self._cancel_retry(shell)
+        else:
+            self._schedule_retry(shell)
+
+        # update the sensors of this source as soon as it is done (if the entries changed)
+        if shell.changed or shell.breaker.state != breaker_state:
+            dispatcher_send(self._hass, self.update_signal(shell))
+
+    @callback
+    def _schedule_retry(self, shell: SourceShell) -> None:
+        """Schedule the next retry (or probe while the circuit is open) after a failed fetch."""
+        next_attempt = shell.breaker.next_attempt
+        if next_attempt is None:
+            return
+        self._cancel_retry(shell)
+        delay = max(0.0, (next_attempt - datetime.now()).total_seconds())
+        _LOGGER.debug("Retrying fetch for %s in %.0f s", shell.title, delay)
+
+        @callback
+        def retry(*_):
+            self._retries.pop(id(shell), None)
+            self._hass.add_job(self._fetch_shells, [shell])
+
+        self._retries[id(shell)] = async_call_later(self._hass, delay, retry)
+
+    @callback
+    def _cancel_retry(self, shell: SourceShell) -> None:
+        if (cancel := self._retries.pop(id(shell), None)) is not None:
+            cancel()
+
+    @callback
+    def _shutdown_callback(self, _: Event):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
         for shell in self._source_shells:
-            shell.fetch()
+            get_shell_registry().release(shell)
+        for cancel in self._retries.values():
+            cancel()
+        self._retries.clear()
+        for cancel in self._pending_fetches.values():
+            cancel()
+        self._pending_fetches.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-        self._update_sensors_callback()
+    @callback
+    def restore_cache(self):
+        """Restore the entries of the last fetch of all sources from the collection cache."""
+        store = get_collection_cache_store()
+        if store is None:
+            return
+        for shell in self._source_shells:
+            if shell.refreshtime is not None:
+                # already fetched by an identical source of a config entry
+                continue
+            data = store.get(shell.unique_id)
+            if data is not None:
+                shell.restore(data)
+
+    @callback
+    def _update_cache_callback(self):
+        store = get_collection_cache_store()
+        if store is None:
+            return
+        for shell in self._source_shells:
+            data = shell.dump()
+            if data is not None:
+                store.set(shell.unique_id, data)
+        store.async_schedule_save()
 
     @property
     def shells(self):
         return self._source_shells
 
+    @staticmethod
+    def update_signal(shell: SourceShell) -> str:
+        """Dispatcher signal sent if the entries of a source changed."""
+        return f"{const.UPDATE_SOURCE_SIGNAL}_{shell.unique_id}"
+
     def get_shell(self, index: int) -> SourceShell | None:
         return self._source_shells[index] if index < len(self._source_shells) else None
 
+    def get_aggregator(self, shells: list[SourceShell]) -> CollectionAggregator:
+        """Return the aggregator for the given sources, shared by all entities using them."""
+        key = tuple(id(s) for s in shells)
+        aggregator = self._aggregators.get(key)
+        if aggregator is None:
+            aggregator = self._aggregators[key] = CollectionAggregator(shells)
+        return aggregator
+
     @callback
     def _fetch_callback(self, *_):
-        async_call_later(
-            self._hass,
-            randrange(0, 60 * self._random_fetch_time_offset),
-            self._fetch_now_callback,
-        )
+        # spread the fetches of the same provider across the random offset window
+        window = 60 * self._random_fetch_time_offset
+        for shell in self._source_shells:
+            if (cancel := self._pending_fetches.pop(id(shell), None)) is not None:
+                cancel()
+            self._pending_fetches[id(shell)] = async_call_later(
+                self._hass,
+                get_fetch_queue().spread_delay(shell, window),
+                partial(self._fetch_now_callback, shell),
+            )
 
     @callback
-    def _fetch_now_callback(self, *_):
-        self._hass.add_job(self._fetch)
+    def _fetch_now_callback(self, shell: SourceShell, *_):
+        """Fetch the source if it is due according to its fetch interval."""
+        self._pending_fetches.pop(id(shell), None)
+        if shell.breaker.allow_fetch() and shell.fetch_due(self._max_fetch_interval):
+            self._hass.add_job(self._fetch_shells, [shell])
 
     @callback
     def _update_sensors_callback(self, *_):
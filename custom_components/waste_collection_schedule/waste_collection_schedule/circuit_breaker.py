@@ -0,0 +1,105 @@
+import datetime
+import logging
+import random
+from typing import Any, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# retry failed fetches after 2, 4, 8, ... minutes (jittered)
+RETRY_DELAY = datetime.timedelta(minutes=2)
+MAX_RETRY_DELAY = datetime.timedelta(hours=1)
+
+# open the circuit after this number of consecutive failures
+FAILURE_THRESHOLD = 5
+
+# while open, probe the source after 6 hours, doubled after every failed probe
+PROBE_INTERVAL = datetime.timedelta(hours=6)
+MAX_PROBE_INTERVAL = datetime.timedelta(days=7)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def _jitter(delay: datetime.timedelta) -> datetime.timedelta:
+    # spread retries of many instances over the second half of the delay
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitBreaker:
+    """Retry and circuit breaker state of the fetches of one source.
+
+    After a failed fetch the source is retried with jittered exponential
+    backoff. After FAILURE_THRESHOLD consecutive failures the circuit opens:
+    the source is no longer fetched at fetch_time, but only probed at slowly
+    increasing intervals until a fetch succeeds again.
+    """
+
+    def __init__(self):
+        self._failures = 0
+        self._next_attempt: Optional[datetime.datetime] = None
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failed fetches."""
+        return self._failures
+
+    @property
+    def next_attempt(self) -> Optional[datetime.datetime]:
+        """Time of the next retry or probe, None if the last fetch succeeded."""
+        return self._next_attempt
+
+    @property
+    def state(self) -> str:
+        return self.get_state(datetime.datetime.now())
+
+    def get_state(self, now: datetime.datetime) -> str:
+        if self._failures < FAILURE_THRESHOLD:
+            return STATE_CLOSED
+        if self._next_attempt is not None and now < self._next_attempt:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def allow_fetch(self, now: Optional[datetime.datetime] = None) -> bool:
+        """Return False while the circuit is open."""
+        return self.get_state(now or datetime.datetime.now()) != STATE_OPEN
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._next_attempt = None
+
+    def record_failure(
+        self, now: Optional[datetime.datetime] = None
+    ) -> datetime.timedelta:
+        """Record a failed fetch, return the delay until the next attempt."""
+        self._failures += 1
+        if self._failures < FAILURE_THRESHOLD:
+            delay = min(RETRY_DELAY * 2 ** (self._failures - 1), MAX_RETRY_DELAY)
+        else:
+            probes = min(self._failures - FAILURE_THRESHOLD, 10)
+            delay = min(PROBE_INTERVAL * 2**probes, MAX_PROBE_INTERVAL)
+        delay = _jitter(delay)
+        self._next_attempt = (now or datetime.datetime.now()) + delay
+        return delay
+
+    def dump(self) -> Optional[Dict[str, Any]]:
+        """Return the state in a JSON serializable form, None if closed."""
+        if self._failures == 0 or self._next_attempt is None:
+            return None
+        return {
+            "failures": self._failures,
+            "next_attempt": self._next_attempt.isoformat(),
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        try:
+            failures = int(data["failures"])
+            next_attempt = datetime.datetime.fromisoformat(data["next_attempt"])
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning(f"invalid circuit breaker state: {e}")
+            return
+        self._failures = failures
+        self._next_attempt = next_attempt
+
+    def __repr__(self):
+        return f"CircuitBreaker{{state={self.state}, failures={self._failures}}}"
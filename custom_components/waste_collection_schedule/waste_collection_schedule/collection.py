@@ -1,45 +1,93 @@
 import datetime
-from typing import Optional
+import sys
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional
 
 
-class CollectionBase(dict):  # inherit from dict to enable JSON serialization
+class CollectionBase(Mapping):
+    """Compact collection entry.
+
+    Entries are stored in slots, the date as ordinal. For backwards
+    compatibility they behave like a read-only dict with the keys date (as
+    isoformat string), icon and picture (and type resp. types). The dict is
+    only created if needed, e.g. by Home Assistant when serializing the state
+    attributes (see as_dict).
+    """
+
+    __slots__ = ("_ordinal", "_icon", "_picture")
+
+    _KEYS: tuple[str, ...] = ("date", "icon", "picture")
+
     def __init__(
         self,
         date: datetime.date,
         icon: Optional[str] = None,
         picture: Optional[str] = None,
     ):
-        dict.__init__(self, date=date.isoformat(), icon=icon, picture=picture)
-        self._date = date  # store date also as python date object
+        self._ordinal = date.toordinal()
+        self._icon = icon
+        self._picture = picture
 
     @property
-    def date(self):
-        return self._date
+    def date(self) -> datetime.date:
+        return datetime.date.fromordinal(self._ordinal)
+
+    @property
+    def ordinal(self) -> int:
+        return self._ordinal
 
     @property
     def daysTo(self):
-        return (self._date - datetime.datetime.now().date()).days
+        return self._ordinal - datetime.datetime.now().date().toordinal()
 
     @property
     def icon(self):
-        return self["icon"]
+        return self._icon
 
     def set_icon(self, icon: str):
-        self["icon"] = icon
+        self._icon = icon
 
     @property
     def picture(self):
-        return self["picture"]
+        return self._picture
 
     def set_picture(self, picture: str):
-        self["picture"] = picture
+        self._picture = picture
 
     def set_date(self, date: datetime.date):
-        self._date = date
-        self["date"] = date.isoformat()
+        self._ordinal = date.toordinal()
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "date":
+            return self.date.isoformat()
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Mapping):
+            return self.as_dict() == dict(other)
+        return NotImplemented
+
+    # mutable like the dict it used to be
+    __hash__ = None  # type: ignore[assignment]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the JSON serializable dict representation."""
+        return {key: self[key] for key in self._KEYS}
 
 
 class Collection(CollectionBase):
+    __slots__ = ("_type",)
+
+    _KEYS = ("date", "icon", "picture", "type")
+
     def __init__(
         self,
         date: datetime.date,
@@ -48,22 +96,28 @@ class Collection(CollectionBase):
         picture: Optional[str] = None,
     ):
         CollectionBase.__init__(self, date=date, icon=icon, picture=picture)
-        self["type"] = t
+        self.set_type(t)
 
     @property
     def type(self) -> str:
-        return self["type"]
+        return self._type
 
     def set_type(self, t: str):
-        self["type"] = t
+        # the same few type names are used by thousands of entries
+        self._type = sys.intern(t) if type(t) is str else t
 
     def __repr__(self):
         return f"Collection{{date={self.date}, type={self.type}}}"
 
 
 class CollectionGroup(CollectionBase):
+    __slots__ = ("_types",)
+
+    _KEYS = ("date", "icon", "picture", "types")
+
     def __init__(self, date: datetime.date):
         CollectionBase.__init__(self, date=date)
+        self._types: list[str] = []
 
     @staticmethod
     def create(group: list[Collection]):
@@ -74,12 +128,12 @@ class CollectionGroup(CollectionBase):
             x.set_picture(group[0].picture)
         else:
             x.set_icon(f"mdi:numeric-{len(group)}-box-multiple")
-        x["types"] = list(it.type for it in group)
+        x._types = [it.type for it in group]
         return x
 
     @property
     def types(self) -> list[str]:
-        return self["types"]
+        return self._types
 
     def __repr__(self):
         return f"CollectionGroup{{date={self.date}, types={self.types}}}"
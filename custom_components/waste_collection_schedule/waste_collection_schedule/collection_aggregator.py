@@ -1,33 +1,106 @@
+import bisect
+import heapq
 import itertools
 import logging
-from datetime import datetime, timedelta
-from typing import Iterable, Sequence
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
 
 from . import CollectionGroup
+from .circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
 from .collection import Collection
 from .source_shell import SourceShell
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class _TypeIndex:
+    """Positions (in the date-sorted list of all entries) of one collection type."""
+
+    __slots__ = ("ordinals", "positions")
+
+    def __init__(self):
+        self.ordinals: list[int] = []
+        self.positions: list[int] = []
+
+
 class CollectionAggregator:
     def __init__(self, shells: Sequence[SourceShell]):
         self._shells = shells
 
+        # index of all entries, rebuilt only if the entries of a shell change
+        self._index_versions: tuple | None = None
+        self._sorted: list[Collection] = []
+        # date ordinals of the sorted entries, used for bisect
+        self._ordinals: list[int] = []
+        self._types: dict[str, _TypeIndex] = {}
+
+        # memoized views, keyed by include_today
+        self._views: dict[bool, CollectionView] = {}
+
+    def _update_index(self) -> None:
+        versions = tuple((id(s), s.version) for s in self._shells)
+        if versions == self._index_versions:
+            return
+
+        # stable sort, entries of the same day keep the order of the sources
+        entries = sorted(
+            (e for s in self._shells for e in s._entries), key=lambda e: e.ordinal
+        )
+        types: dict[str, _TypeIndex] = {}
+        for pos, e in enumerate(entries):
+            index = types.get(e.type)
+            if index is None:
+                index = types[e.type] = _TypeIndex()
+            index.ordinals.append(e.ordinal)
+            index.positions.append(pos)
+
+        self._sorted = entries
+        self._ordinals = [e.ordinal for e in entries]
+        self._types = types
+        self._index_versions = versions
+
     @property
     def _entries(self) -> list[Collection]:
-        """Merge all entries from all connected sources."""
-        return [e for s in self._shells for e in s._entries]
+        """Merge all entries from all connected sources, sorted by date."""
+        self._update_index()
+        return self._sorted
+
+    def view(self, include_today: bool = False) -> "CollectionView":
+        """Return the memoized view of the upcoming entries for the current day.
+
+        All entities reading the same aggregator share the view, which is only
+        recomputed if the entries of a shell change or the day changes.
+        """
+        self._update_index()
+        key = (self._index_versions, datetime.now().date())
+        view = self._views.get(include_today)
+        if view is None or view.key != key:
+            view = self._views[include_today] = CollectionView(self, key, include_today)
+        return view
+
+    @property
+    def shells(self) -> Sequence[SourceShell]:
+        return self._shells
 
     @property
     def refreshtime(self):
         """Simply return the timestamp of the first source."""
         return self._shells[0].refreshtime
 
+    @property
+    def fetch_state(self) -> str:
+        """Return the worst circuit breaker state of all sources."""
+        states = {s.breaker.state for s in self._shells}
+        for state in (STATE_OPEN, STATE_HALF_OPEN):
+            if state in states:
+                return state
+        return STATE_CLOSED
+
     @property
     def types(self):
         """Return set() of all collection types."""
-        return {e.type for e in self._entries}
+        self._update_index()
+        return set(self._types)
 
     def get_upcoming(
         self,
@@ -45,7 +118,6 @@ class CollectionAggregator:
         leadtime -- limits the timespan in days of returned entries (default=7, 0 = today)
         """
         return self._filter(
-            self._entries,
             count=count,
             leadtime=leadtime,
             include_types=include_types,
@@ -64,31 +136,21 @@ class CollectionAggregator:
         start_index: int | None = None,
     ) -> list[CollectionGroup]:
         """Return list of all entries, grouped by day, limited by count and/or leadtime."""
-        entries = []
-
         iterator = itertools.groupby(
-            self._filter(
-                self._entries,
+            self._iter_filtered(
                 leadtime=leadtime,
                 include_types=include_types,
                 exclude_types=exclude_types,
                 include_today=include_today,
             ),
-            lambda e: e.date,
+            lambda e: e.ordinal,
         )
 
-        for key, group in iterator:
-            entries.append(CollectionGroup.create(list(group)))
-        if start_index is not None:
-            entries = entries[start_index:]
-        if count is not None:
-            entries = entries[:count]
-
-        return entries
+        groups = (CollectionGroup.create(list(group)) for _, group in iterator)
+        return list(_slice(groups, start_index, count))
 
     def _filter(
         self,
-        entries,
         count: int | None = None,
         leadtime: int | None = None,
         include_types: Iterable[str] | None = None,
@@ -96,33 +158,158 @@ class CollectionAggregator:
         include_today: bool = False,
         start_index: int | None = None,
     ) -> list[Collection]:
-        # remove unwanted waste types from include list
-        if include_types is not None:
-            entries = list(filter(lambda e: e.type in set(include_types), entries))
-
-        # remove unwanted waste types from exclude list
-        if exclude_types is not None:
-            entries = list(filter(lambda e: e.type not in set(exclude_types), entries))
-
-        # remove expired entries
-        now = datetime.now().date()
-        if include_today:
-            entries = list(filter(lambda e: e.date >= now, entries))
-        else:
-            entries = list(filter(lambda e: e.date > now, entries))
-
-        # remove entries which are too far in the future (0 = today)
-        if leadtime is not None:
-            x = now + timedelta(days=leadtime)
-            entries = list(filter(lambda e: e.date <= x, entries))
-
-        # ensure that entries are sorted by date
-        entries.sort(key=lambda e: e.date)
-
-        # remove surplus entries
-        if start_index is not None:
-            entries = entries[start_index:]
-        if count is not None:
-            entries = entries[:count]
-
-        return entries
+        entries = self._iter_filtered(
+            leadtime=leadtime,
+            include_types=include_types,
+            exclude_types=exclude_types,
+            include_today=include_today,
+        )
+        return list(_slice(entries, start_index, count))
+
+    def _iter_filtered(
+        self,
+        leadtime: int | None = None,
+        include_types: Iterable[str] | None = None,
+        exclude_types: Iterable[str] | None = None,
+        include_today: bool = False,
+    ) -> Iterator[Collection]:
+        """Iterate over the matching entries, sorted by date."""
+        self._update_index()
+
+        # remove expired entries and entries which are too far in the future (0 = today)
+        today = datetime.now().date().toordinal()
+        first = today if include_today else today + 1
+        last = today + leadtime if leadtime is not None else None
+
+        excluded = set(exclude_types) if exclude_types is not None else set()
+
+        if include_types is None:
+            start = bisect.bisect_left(self._ordinals, first)
+            end = (
+                bisect.bisect_right(self._ordinals, last)
+                if last is not None
+                else len(self._ordinals)
+            )
+            window = (self._sorted[pos] for pos in range(start, end))
+            if not excluded:
+                return window
+            return (e for e in window if e.type not in excluded)
+
+        # merge the positions of the wanted types within the window
+        ranges = []
+        for t in set(include_types) - excluded:
+            index = self._types.get(t)
+            if index is None:
+                continue
+            start = bisect.bisect_left(index.ordinals, first)
+            end = (
+                bisect.bisect_right(index.ordinals, last)
+                if last is not None
+                else len(index.ordinals)
+            )
+            if start < end:
+                ranges.append(index.positions[start:end])
+
+        return (self._sorted[pos] for pos in heapq.merge(*ranges))
+
+
+class CollectionView:
+    """Upcoming entries of an aggregator for one day, shared by all entities.
+
+    The full results per set of include/exclude types are computed once,
+    count, leadtime and start_index are applied to the memoized lists.
+    """
+
+    def __init__(
+        self, aggregator: CollectionAggregator, key: tuple, include_today: bool
+    ):
+        self._aggregator = aggregator
+        self.key = key
+        self._include_today = include_today
+        self._upcoming: dict[tuple, tuple[list[int], list[Collection]]] = {}
+        self._groups: dict[tuple, tuple[list[int], list[CollectionGroup]]] = {}
+
+    @staticmethod
+    def _types_key(
+        include_types: Iterable[str] | None, exclude_types: Iterable[str] | None
+    ) -> tuple:
+        return (
+            frozenset(include_types) if include_types is not None else None,
+            frozenset(exclude_types) if exclude_types is not None else None,
+        )
+
+    def _all_upcoming(
+        self, include_types: Iterable[str] | None, exclude_types: Iterable[str] | None
+    ) -> tuple[list[int], list[Collection]]:
+        key = self._types_key(include_types, exclude_types)
+        result = self._upcoming.get(key)
+        if result is None:
+            entries = list(
+                self._aggregator._iter_filtered(
+                    include_types=include_types,
+                    exclude_types=exclude_types,
+                    include_today=self._include_today,
+                )
+            )
+            result = self._upcoming[key] = ([e.ordinal for e in entries], entries)
+        return result
+
+    def _all_groups(
+        self, include_types: Iterable[str] | None, exclude_types: Iterable[str] | None
+    ) -> tuple[list[int], list[CollectionGroup]]:
+        key = self._types_key(include_types, exclude_types)
+        result = self._groups.get(key)
+        if result is None:
+            _, entries = self._all_upcoming(include_types, exclude_types)
+            groups = [
+                CollectionGroup.create(list(group))
+                for _, group in itertools.groupby(entries, lambda e: e.ordinal)
+            ]
+            result = self._groups[key] = ([g.ordinal for g in groups], groups)
+        return result
+
+    def _limit(self, ordinals: list[int], items: list, leadtime: int | None) -> list:
+        if leadtime is None:
+            return items
+        last = self.key[1].toordinal() + leadtime
+        return items[: bisect.bisect_right(ordinals, last)]
+
+    def get_upcoming(
+        self,
+        count: int | None = None,
+        leadtime: int | None = None,
+        include_types: Iterable[str] | None = None,
+        exclude_types: Iterable[str] | None = None,
+        start_index: int | None = None,
+    ) -> list[Collection]:
+        """Same as CollectionAggregator.get_upcoming, include_today is given by the view."""
+        ordinals, entries = self._all_upcoming(include_types, exclude_types)
+        return list(
+            _slice(self._limit(ordinals, entries, leadtime), start_index, count)
+        )
+
+    def get_upcoming_group_by_day(
+        self,
+        count: int | None = None,
+        leadtime: int | None = None,
+        include_types: Iterable[str] | None = None,
+        exclude_types: Iterable[str] | None = None,
+        start_index: int | None = None,
+    ) -> list[CollectionGroup]:
+        """Same as CollectionAggregator.get_upcoming_group_by_day, include_today is given by the view."""
+        ordinals, groups = self._all_groups(include_types, exclude_types)
+        return list(_slice(self._limit(ordinals, groups, leadtime), start_index, count))
+
+
+def _slice(iterable: Iterable, start_index: int | None, count: int | None):
+    """Remove surplus entries."""
+    start = start_index or 0
+    if start < 0:
+        # negative indices need the whole list
+        items = list(iterable)[start_index:]
+        return items[:count] if count is not None else items
+    if count is not None and count < 0:
+        return list(iterable)[start:count]
+    return itertools.islice(
+        iterable, start, start + count if count is not None else None
+    )
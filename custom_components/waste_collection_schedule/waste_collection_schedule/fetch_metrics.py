@@ -0,0 +1,122 @@
+import datetime
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+# metrics of the fetch running in the current thread (or asyncio task), used
+# by the HTTPAdapter.send hook
+_current: ContextVar[Optional["FetchMetrics"]] = ContextVar(
+    "fetch_metrics", default=None
+)
+
+
+def _current_var() -> ContextVar[Optional["FetchMetrics"]]:
+    # sources (and so HttpClient) use the top-level package, the integration
+    # imports this module relatively; both copies must use the same variable
+    module = sys.modules.get("waste_collection_schedule.fetch_metrics")
+    return getattr(module, "_current", _current)
+
+
+_install_lock = threading.Lock()
+
+
+def install_http_hook() -> None:
+    """Count requests and received bytes of fetches in requests' HTTPAdapter.send.
+
+    Covers requests.get, own sessions of sources and the shared HttpClient
+    (including every redirect). Only requests sent while a fetch is measured
+    (see FetchMetrics.measure) are counted, requests of other threads only
+    pay a context variable lookup. Requests sent with aiohttp are not counted.
+    """
+    with _install_lock:
+        # the integration and the sources use different copies of this module,
+        # and other hooks (http_replay) may wrap this one later
+        if getattr(HTTPAdapter, "_fetch_metrics_hook", False):
+            return
+        send = HTTPAdapter.send
+
+        @functools.wraps(send)
+        def counting_send(self, request, *args, **kwargs):
+            response = send(self, request, *args, **kwargs)
+            metrics = _current_var().get()
+            if metrics is not None:
+                if kwargs.get("stream", args[0] if args else False):
+                    size = int(response.headers.get("Content-Length") or 0)
+                else:
+                    # read by requests.Session.send right after this anyway
+                    size = len(response.content or b"")
+                metrics.record_response(size, request.url)
+            return response
+
+        HTTPAdapter.send = counting_send  # type: ignore[method-assign]
+        HTTPAdapter._fetch_metrics_hook = True  # type: ignore[attr-defined]
+
+
+class FetchMetrics:
+    """Metrics of the last fetch of a source."""
+
+    __slots__ = (
+        "duration",
+        "requests",
+        "bytes",
+        "entries",
+        "host",
+        "queue_wait",
+        "queue_depth",
+        "last_success",
+        "last_error",
+    )
+
+    def __init__(self):
+        self.duration: Optional[float] = None  # seconds
+        self.requests = 0
+        self.bytes = 0
+        self.entries: Optional[int] = None
+        self.host: Optional[str] = None  # host of the first request
+        self.queue_wait: Optional[float] = None  # seconds waited for the fetch queue
+        self.queue_depth: Optional[int] = None  # fetches of the same provider ahead
+        self.last_success: Optional[datetime.datetime] = None
+        self.last_error: Optional[str] = None  # exception class name
+
+    @contextmanager
+    def measure(self) -> Iterator["FetchMetrics"]:
+        """Measure wall time, requests and bytes of the fetch run in the block."""
+        install_http_hook()
+        self.requests = 0
+        self.bytes = 0
+        self.host = None
+        current = _current_var()
+        token = current.set(self)
+        started = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.duration = time.monotonic() - started
+            current.reset(token)
+
+    def record_response(self, size: int, url: Optional[str] = None) -> None:
+        self.requests += 1
+        self.bytes += size
+        if self.host is None and url:
+            self.host = urlsplit(url).hostname
+
+    def record_queue(self, wait: float, depth: int) -> None:
+        self.queue_wait = wait
+        self.queue_depth = depth
+
+    def record_success(self, entries: int) -> None:
+        self.entries = entries
+        self.last_success = datetime.datetime.now(datetime.timezone.utc)
+
+    def record_failure(self, error: BaseException) -> None:
+        self.last_error = type(error).__name__
+
+    def __repr__(self):
+        return f"FetchMetrics{{duration={self.duration}, requests={self.requests}, bytes={self.bytes}, entries={self.entries}}}"
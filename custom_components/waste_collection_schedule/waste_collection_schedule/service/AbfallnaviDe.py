@@ -8,6 +8,7 @@ from waste_collection_schedule.exceptions import (
     SourceArgumentNotFoundWithSuggestions,
     SourceArgumentRequiredWithSuggestions,
 )
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 SERVICE_DOMAINS = [
     {
@@ -293,13 +294,27 @@ class AbfallnaviDe:
 
     def get_dates(self, city, street, house_number=None):
         """Get dates by strings only for convenience."""
+        return fetch_with_resolved_id(
+            "AbfallnaviDe",
+            {
+                "service_domain": self._service_domain,
+                "city": city,
+                "street": street,
+                "house_number": house_number,
+            },
+            lambda: self._resolve_targets(city, street, house_number),
+            self._get_dates_by_targets,
+        )
+
+    def _resolve_targets(self, city, street, house_number=None):
+        """Return list of [target, id] to retrieve the dates for."""
         # find city_id
         city_id = self.get_city_id(city)
 
         # find street_id
         street_ids = self.get_street_ids(city_id, street)
 
-        dates = []
+        targets = []
         for street_id in street_ids:
             # find house_number_id (which is optional: not all house number do have an id)
             house_number_id = self.get_house_number_id(street_id, house_number)
@@ -307,9 +322,16 @@ class AbfallnaviDe:
             # return dates for specific house number of street if house number
             # doesn't have an own id
             if house_number_id is not None:
-                dates += self.get_dates_by_house_number_id(house_number_id)
+                targets.append(["hausnummern", house_number_id])
             else:
-                dates += self.get_dates_by_street_id(street_id)
+                targets.append(["strassen", street_id])
+        return targets
+
+    def _get_dates_by_targets(self, targets):
+        waste_types = self.get_waste_types()
+        dates = []
+        for target, id in targets:
+            dates += self._get_dates(target, id, waste_types=waste_types)
         return dates
 
     def _find_in_inverted_dict(self, mydict, value):
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Client session handling for async sources.
+
+Async sources (`async def fetch`) are awaited in the event loop of Home
+Assistant and get its shared aiohttp.ClientSession injected. Outside of Home
+Assistant, e.g. in test_sources.py, a session is created for every fetch.
+
+Usage in a source:
+
+    from waste_collection_schedule.service.AsyncHttpClient import ClientSessionMixin
+
+    class Source(ClientSessionMixin):
+        async def fetch(self):
+            async with self.client_session() as session:
+                async with session.get(url, params=params) as r:
+                    r.raise_for_status()
+                    data = await r.json()
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+# used for requests without explicit timeout, like HttpClient.DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+
+
+class ClientSessionMixin:
+    """Provides the injected client session or a temporary one."""
+
+    _client_session: Optional[aiohttp.ClientSession] = None
+
+    def set_client_session(self, session: aiohttp.ClientSession) -> None:
+        """Called by SourceShell.async_fetch with the shared session."""
+        self._client_session = session
+
+    @asynccontextmanager
+    async def client_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        session = self._client_session
+        if session is not None and not session.closed:
+            # shared session, never close it
+            yield session
+            return
+        async with aiohttp.ClientSession(timeout=DEFAULT_TIMEOUT) as session:
+            yield session
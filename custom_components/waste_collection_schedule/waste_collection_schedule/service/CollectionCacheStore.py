@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import storage
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "waste_collection_schedule.collection_cache"
+
+# delay in seconds before writing to disk, collects saves of multiple sources fetched at the same time
+SAVE_DELAY = 30
+
+
+class CollectionCacheStore:
+    """Home Assistant Store-based cache of the last fetched entries per source."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the collection cache store."""
+        self._hass = hass
+        self._store = storage.Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load cached entries from storage (only once per Home Assistant run)."""
+        if self._loaded:
+            return
+        try:
+            data = await self._store.async_load()
+            if data is not None:
+                self._data = data.get("sources", {})
+            else:
+                self._data = {}
+        except Exception as e:
+            _LOGGER.error("Failed to load collection cache from storage: %s", e)
+            self._data = {}
+        self._loaded = True
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule saving the cached entries to storage."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {"sources": self._data}
+
+    def get(self, unique_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached data for a source."""
+        return self._data.get(unique_id)
+
+    @callback
+    def set(self, unique_id: str, data: Dict[str, Any]) -> None:
+        """Set cached data for a source (has to be called from the event loop)."""
+        self._data[unique_id] = data
+
+    @callback
+    def remove(self, unique_id: str) -> None:
+        """Remove cached data of a source no longer configured."""
+        if self._data.pop(unique_id, None) is not None:
+            self.async_schedule_save()
+
+
+# Global store instance
+_collection_cache_store: Optional[CollectionCacheStore] = None
+
+
+def get_collection_cache_store() -> Optional[CollectionCacheStore]:
+    """Get the global collection cache store instance."""
+    return _collection_cache_store
+
+
+def initialize_collection_cache_store(hass: HomeAssistant) -> CollectionCacheStore:
+    """Initialize the global collection cache store."""
+    global _collection_cache_store
+    if _collection_cache_store is None:
+        _collection_cache_store = CollectionCacheStore(hass)
+    return _collection_cache_store
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Conditional request cache (ETag / Last-Modified) for file downloads.
+
+The validators and the body of a response are stored. The next request for the
+same URL (and Accept / authorization headers) is sent with If-None-Match /
+If-Modified-Since and if the server answers with 304 Not Modified, the stored
+body is returned instead.
+
+With a cache directory, only the validators are kept in memory and the body is
+read from disk if needed. Entries not used for MAX_UNUSED_AGE are removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+_LOGGER = logging.getLogger(__name__)
+
+# entries (and their files) not used for this long are removed
+MAX_UNUSED_AGE = 30 * 24 * 3600  # seconds
+
+# minimum time between two prunes of the cache
+PRUNE_INTERVAL = 24 * 3600  # seconds
+
+
+class HttpCacheEntry:
+    def __init__(
+        self,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        headers: Dict[str, str],
+        body: Optional[bytes] = None,
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        # None if the body is stored on disk
+        self.body = body
+        # time.time() of the last use
+        self.used = time.time()
+
+    @property
+    def validator(self) -> str:
+        """Identifies the content of the entry, can be used to cache parsed results."""
+        return f"{self.etag}|{self.last_modified}"
+
+
+class HttpCache:
+    """Stores validators and bodies of responses, bodies on disk if a directory is given."""
+
+    # response headers kept to restore a usable response from the cache, the
+    # stored body is already decoded, so Content-Encoding must not be kept
+    KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+    # request headers which select the content of the response, part of the key
+    KEY_HEADERS = ("Accept", "Accept-Language", "Authorization", "Cookie")
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_unused_age: float = MAX_UNUSED_AGE,
+    ):
+        self._directory = Path(directory) if directory is not None else None
+        self._max_unused_age = max_unused_age
+        self._entries: Dict[str, HttpCacheEntry] = {}
+        self._lock = threading.Lock()
+        # time.time() of the last prune
+        self._pruned: Optional[float] = None
+
+    @property
+    def directory(self) -> Optional[Path]:
+        return self._directory
+
+    @classmethod
+    def key(
+        cls,
+        method: str,
+        url: str,
+        params: Any = None,
+        data: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+        auth: Any = None,
+    ) -> str:
+        headers = CaseInsensitiveDict(headers or {})
+        selected = {name: headers.get(name) for name in cls.KEY_HEADERS}
+        if auth is not None and not isinstance(auth, (tuple, list)):
+            # e.g. HTTPBasicAuth, its repr isn't stable
+            public = {
+                k: v for k, v in getattr(auth, "__dict__", {}).items() if k[0] != "_"
+            }
+            auth = [type(auth).__name__, public]
+        raw = json.dumps(
+            [method.upper(), url, params, data, selected, auth],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[HttpCacheEntry]:
+        """Return the entry (validators, without the body if stored on disk)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self._directory is not None:
+            entry = self._load(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        return entry
+
+    def get_body(self, key: str, entry: HttpCacheEntry) -> Optional[bytes]:
+        """Return the body of an entry and mark the entry as used."""
+        entry.used = time.time()
+        if entry.body is not None or self._directory is None:
+            return entry.body
+        meta_path, body_path = self._paths(key)
+        try:
+            body = body_path.read_bytes()
+            # the modification time of the meta file is the last use on disk
+            os.utime(meta_path)
+        except OSError as e:
+            _LOGGER.warning("Failed to read HTTP cache entry %s: %s", key, e)
+            return None
+        return body
+
+    def set(self, key: str, entry: HttpCacheEntry) -> None:
+        if self._directory is not None:
+            self._save(key, entry)
+            entry.body = None
+        with self._lock:
+            self._entries[key] = entry
+        if self._pruned is None or time.time() - self._pruned > PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove entries (and their files) not used for max_unused_age."""
+        now = time.time()
+        self._pruned = now
+        limit = now - self._max_unused_age
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.used < limit]:
+                del self._entries[key]
+        if self._directory is None:
+            return
+        try:
+            meta_paths = list(self._directory.glob("*.json"))
+        except OSError as e:
+            _LOGGER.warning("Failed to prune HTTP cache: %s", e)
+            return
+        for meta_path in meta_paths:
+            key = meta_path.stem
+            try:
+                if meta_path.stat().st_mtime >= limit:
+                    continue
+                with self._lock:
+                    self._entries.pop(key, None)
+                for path in self._paths(key):
+                    path.unlink(missing_ok=True)
+            except OSError as e:
+                _LOGGER.warning("Failed to remove HTTP cache entry %s: %s", key, e)
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        assert self._directory is not None
+        return self._directory / f"{key}.json", self._directory / f"{key}.body"
+
+    def _load(self, key: str) -> Optional[HttpCacheEntry]:
+        meta_path, _ = self._paths(key)
+        try:
+            with meta_path.open(encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Failed to read HTTP cache entry %s: %s", key, e)
+            return None
+        return HttpCacheEntry(
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            headers=meta.get("headers", {}),
+        )
+
+    def _save(self, key: str, entry: HttpCacheEntry) -> None:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            # write body first and replace atomically, the meta file marks a complete entry
+            tmp = body_path.with_suffix(".tmp")
+            tmp.write_bytes(entry.body)
+            os.replace(tmp, body_path)
+            with meta_path.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "etag": entry.etag,
+                        "last_modified": entry.last_modified,
+                        "headers": entry.headers,
+                    },
+                    f,
+                )
+        except OSError as e:
+            _LOGGER.warning("Failed to write HTTP cache entry %s: %s", key, e)
+
+    def request(
+        self, session: requests.Session, method: str, url: str, **kwargs
+    ) -> requests.Response:
+        """Send a conditional request.
+
+        The returned response has an additional attribute `from_cache` which is
+        True if the body was restored from the cache (server returned 304), and
+        `cache_validator` which identifies the content of the body (or None if
+        the server doesn't provide validators).
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        key = self.key(
+            method,
+            url,
+            kwargs.get("params"),
+            kwargs.get("data"),
+            {**session.headers, **headers},
+            kwargs.get("auth") or session.auth,
+        )
+        entry = self.get(key)
+
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        r = session.request(method, url, headers=headers, **kwargs)
+
+        if r.status_code == 304 and entry is not None:
+            body = self.get_body(key, entry)
+            if body is not None:
+                _LOGGER.debug("Not modified, using cached response for %s", url)
+                r.status_code = 200
+                r.reason = "OK (cached)"
+                r._content = body
+                for name, value in entry.headers.items():
+                    r.headers.setdefault(name, value)
+                r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+                r.from_cache = True  # type: ignore[attr-defined]
+                r.cache_validator = entry.validator  # type: ignore[attr-defined]
+                return r
+            # the body is gone (e.g. removed from disk), request it again
+            headers.pop("If-None-Match", None)
+            headers.pop("If-Modified-Since", None)
+            r = session.request(method, url, headers=headers, **kwargs)
+
+        r.from_cache = False  # type: ignore[attr-defined]
+        r.cache_validator = None  # type: ignore[attr-defined]
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if r.status_code == 200 and (etag or last_modified):
+            new_entry = HttpCacheEntry(
+                etag=etag,
+                last_modified=last_modified,
+                headers={
+                    name: r.headers[name]
+                    for name in self.KEEP_HEADERS
+                    if name in r.headers
+                },
+                body=r.content,
+            )
+            self.set(key, new_entry)
+            r.cache_validator = new_entry.validator  # type: ignore[attr-defined]
+        return r
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Shared HTTP client for sources.
+
+Keeps one pooled keep-alive session per host, applies a default timeout to all
+requests and limits the number of concurrent connections per host.
+
+Usage in a source:
+
+    from waste_collection_schedule.service.HttpClient import get_http_client
+
+    r = get_http_client().get(url, params=params)
+"""
+
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+from .HttpCache import HttpCache
+from .SSLError import CustomHttpAdapter, get_legacy_ssl_context
+
+_LOGGER = logging.getLogger(__name__)
+
+# (connect timeout, read timeout) in seconds, used if a request doesn't specify a timeout
+DEFAULT_TIMEOUT: Tuple[float, float] = (10, 60)
+
+# maximum number of concurrent connections per host, further requests wait for a free connection
+MAX_CONNECTIONS_PER_HOST = 4
+
+# seconds a request waits for a free connection of its host before it fails
+POOL_TIMEOUT = 60
+
+# cookies of the fetch running in the current thread (see cookie_scope)
+_cookies: ContextVar[Optional[RequestsCookieJar]] = ContextVar(
+    "http_cookies", default=None
+)
+
+
+def _cookie_var() -> ContextVar[Optional[RequestsCookieJar]]:
+    # sources use the top-level package, SourceShell is imported relatively by
+    # the integration; both copies must use the same variable
+    module = sys.modules.get("waste_collection_schedule.service.HttpClient")
+    return getattr(module, "_cookies", _cookies)
+
+
+@contextmanager
+def cookie_scope() -> Iterator[RequestsCookieJar]:
+    """Keep the cookies of all requests sent in the block in one cookie jar.
+
+    The sessions are shared between sources, so they don't keep cookies
+    themselves. SourceShell runs every fetch in its own scope: multi-step
+    scrapers get the cookies of their previous requests, but never the
+    cookies of other sources. Outside of a scope, cookies are kept for a
+    single request (including its redirects) only.
+    """
+    current = _cookie_var()
+    jar = RequestsCookieJar()
+    token = current.set(jar)
+    try:
+        yield jar
+    finally:
+        current.reset(token)
+
+
+@lru_cache(maxsize=None)
+def _pool_classes(pool_timeout: float) -> Dict[str, type]:
+    """Connection pool classes waiting at most pool_timeout for a connection.
+
+    requests doesn't pass a pool timeout to urllib3, so blocking pools would
+    wait forever for a free connection.
+    """
+
+    def bounded(pool_cls: type) -> type:
+        def _get_conn(self, timeout=None):
+            if timeout is None:
+                timeout = pool_timeout
+            return pool_cls._get_conn(self, timeout=timeout)
+
+        return type(pool_cls.__name__, (pool_cls,), {"_get_conn": _get_conn})
+
+    return {"http": bounded(HTTPConnectionPool), "https": bounded(HTTPSConnectionPool)}
+
+
+class Session(requests.Session):
+    """requests.Session which applies a default timeout to every request.
+
+    Compressed responses (gzip, deflate and br if brotli is installed) are
+    requested and decoded by requests/urllib3 by default.
+    """
+
+    def __init__(self, timeout: Any = DEFAULT_TIMEOUT):
+        super().__init__()
+        self._timeout = timeout
+
+    @property  # type: ignore[override]
+    def cookies(self) -> RequestsCookieJar:
+        """Cookie jar of the running fetch (see cookie_scope)."""
+        jar = _cookie_var().get()
+        return jar if jar is not None else RequestsCookieJar()
+
+    @cookies.setter
+    def cookies(self, value: RequestsCookieJar) -> None:
+        # set by requests.Session.__init__, the session has no cookies of its own
+        pass
+
+    def request(self, method, url, **kwargs):  # type: ignore[override]
+        kwargs.setdefault("timeout", self._timeout)
+        if _cookie_var().get() is None:
+            with cookie_scope():
+                return super().request(method, url, **kwargs)
+        return super().request(method, url, **kwargs)
+
+
+class HttpClient:
+    """Factory for pooled sessions, one per host (and TLS mode)."""
+
+    def __init__(
+        self,
+        timeout: Any = DEFAULT_TIMEOUT,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        pool_timeout: float = POOL_TIMEOUT,
+    ):
+        self._timeout = timeout
+        self._max_connections_per_host = max_connections_per_host
+        self._pool_timeout = pool_timeout
+        self._sessions: Dict[Tuple[str, bool], Session] = {}
+        self._lock = threading.Lock()
+        self._cache = HttpCache()
+
+    @property
+    def cache(self) -> HttpCache:
+        return self._cache
+
+    def set_cache_directory(self, directory: str | Path) -> None:
+        """Store conditional request cache entries in directory (in memory only by default)."""
+        if self._cache.directory != Path(directory):
+            self._cache = HttpCache(directory)
+
+    def get_session(self, host: str, legacy_ssl: bool = False) -> Session:
+        """Return the shared session for a host.
+
+        Args:
+            host: host name or complete URL
+            legacy_ssl: use legacy TLS renegotiation (see SSLError.get_legacy_session)
+        """
+        if "/" in host:
+            host = urlsplit(host).netloc
+        key = (host.lower(), legacy_ssl)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_session(legacy_ssl)
+                self._sessions[key] = session
+            return session
+
+    def _create_session(self, legacy_ssl: bool) -> Session:
+        session = Session(self._timeout)
+        if legacy_ssl:
+            https_adapter: HTTPAdapter = CustomHttpAdapter(
+                get_legacy_ssl_context(),
+                pool_maxsize=self._max_connections_per_host,
+                pool_block=True,
+            )
+        else:
+            https_adapter = HTTPAdapter(
+                pool_maxsize=self._max_connections_per_host, pool_block=True
+            )
+        http_adapter = HTTPAdapter(
+            pool_maxsize=self._max_connections_per_host, pool_block=True
+        )
+        for adapter in (https_adapter, http_adapter):
+            adapter.poolmanager.pool_classes_by_scheme = _pool_classes(
+                self._pool_timeout
+            )
+        session.mount("https://", https_adapter)
+        session.mount("http://", http_adapter)
+        return session
+
+    def request(
+        self, method: str, url: str, legacy_ssl: bool = False, **kwargs
+    ) -> requests.Response:
+        """Send a request using the shared session of the URL's host."""
+        return self.get_session(url, legacy_ssl).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_cached(
+        self, url: str, legacy_ssl: bool = False, **kwargs
+    ) -> requests.Response:
+        """Send a conditional GET request (If-None-Match / If-Modified-Since).
+
+        If the server answers with 304 Not Modified, the body of the previous
+        response is returned and `response.from_cache` is True.
+        """
+        return self._cache.request(
+            self.get_session(url, legacy_ssl), "GET", url, **kwargs
+        )
+
+    def close(self) -> None:
+        """Close all sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# Global client instance
+_http_client: Optional[HttpClient] = None
+
+
+def get_http_client() -> HttpClient:
+    """Get the global HTTP client instance."""
+    global _http_client
+    if _http_client is None:
+        _http_client = HttpClient()
+    return _http_client
+
+
+def get_session(host: str, legacy_ssl: bool = False) -> Session:
+    """Get the shared session for a host from the global HTTP client."""
+    return get_http_client().get_session(host, legacy_ssl)
@@ -1,13 +1,19 @@
 import datetime
 import logging
 import re
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import jinja2
-from icalevents import icalevents
+
+from .ICSEvents import read_events
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_TITLE_TEMPLATE = "{{date.summary}}"
+
+# matches the default template, allowing whitespace inside of the braces
+DEFAULT_TITLE_TEMPLATE_REGEX = re.compile(r"\{\{\s*date\.summary\s*\}\}")
+
 
 class ICS:
     def __init__(
@@ -15,7 +21,7 @@ class ICS:
         offset: Optional[int] = None,
         regex: Optional[str] = None,
         split_at: Optional[str] = None,
-        title_template: str = "{{date.summary}}",
+        title_template: str = DEFAULT_TITLE_TEMPLATE,
     ):
         self._offset = offset
         self._regex = None
@@ -29,7 +35,47 @@ class ICS:
 
         self._title_template = title_template
 
-    def convert(self, ics_data: str) -> List[Tuple[datetime.date, str]]:
+        # compile the template once, the default template doesn't need jinja at all
+        self._compiled_title_template: Optional[jinja2.Template] = None
+        if not DEFAULT_TITLE_TEMPLATE_REGEX.fullmatch(title_template):
+            self._compiled_title_template = jinja2.Environment().from_string(
+                title_template
+            )
+
+        # titles after applying regex and split_at, summaries repeat a lot
+        self._titles: Dict[str, Tuple[str, ...]] = {}
+
+    def _render_title(self, event: Any) -> str:
+        if self._compiled_title_template is None:
+            # same result as rendering {{date.summary}}
+            return str(event.summary)
+        return self._compiled_title_template.render(date=event)
+
+    def _convert_title(self, entry_title: str) -> Tuple[str, ...]:
+        titles = self._titles.get(entry_title)
+        if titles is not None:
+            return titles
+
+        title = entry_title
+        if self._regex is not None:
+            match = self._regex.match(title)
+            if match:
+                title = match.group(1)
+
+        if self._split_at is not None:
+            titles = tuple(t.strip().title() for t in re.split(self._split_at, title))
+        else:
+            titles = (title,)
+
+        self._titles[entry_title] = titles
+        return titles
+
+    def convert(self, ics_data: Union[str, bytes]) -> List[Tuple[datetime.date, str]]:
+        """Return (date, title) of all events within the next year.
+
+        ics_data can be passed as bytes, the encoding is taken from the byte
+        order mark (UTF-8 if there is none).
+        """
         # calculate start- and end-date for recurring events
         start_date = datetime.datetime.now().replace(
             hour=0, minute=0, second=0, microsecond=0
@@ -38,16 +84,8 @@ class ICS:
             start_date -= datetime.timedelta(days=self._offset)
         end_date = start_date + datetime.timedelta(days=365)
 
-        ics_data = re.sub(
-            r"(EXDATE;VALUE=DATE:[0-9]+)\r?\n",
-            lambda m: m.group(1) + "T010000\n",
-            ics_data,
-        )
-
-        # parse ics data
-        events: List[Any] = icalevents.events(
-            start=start_date, end=end_date, string_content=ics_data.encode()
-        )
+        # parse ics data, recurring events are expanded by icalevents
+        events: List[Any] = read_events(ics_data, start_date, end_date)
 
         entries: List[Tuple[datetime.date, str]] = []
 
@@ -65,21 +103,8 @@ class ICS:
                 if self._offset is not None:
                     dtstart += datetime.timedelta(days=self._offset)
 
-                environment = jinja2.Environment()
-                title_template = environment.from_string(self._title_template)
-                entry_title = title_template.render(date=e)
-
-                if self._regex is not None:
-                    match = self._regex.match(entry_title)
-                    if match:
-                        entry_title = match.group(1)
-
-                if self._split_at is not None:
-                    entry_title_list = re.split(self._split_at, entry_title)
-                    entries.extend(
-                        (dtstart, t.strip().title()) for t in entry_title_list
-                    )
-                else:
-                    entries.append((dtstart, entry_title))
+                entries.extend(
+                    (dtstart, t) for t in self._convert_title(self._render_title(e))
+                )
 
         return entries
@@ -0,0 +1,415 @@
+"""Window-bounded VEVENT reader working directly on the bytes of an ICS file.
+
+icalevents parses the complete file into icalendar components before it
+filters the events by date, so the effort grows with the size of the file
+instead of the requested time span. Most waste collection calendars only
+contain plain all-day events, which are read here line by line. Events outside
+of the time span are dropped without parsing them completely.
+
+Events which need recurrence handling (RRULE, RDATE, EXRULE, RECURRENCE-ID) or
+values which can't be interpreted here are collected and passed to icalevents,
+together with the time zone definitions of the calendar. The result is a list
+of icalevents Event objects, equal to the result of icalevents.events().
+"""
+
+import datetime
+import io
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from dateutil.tz import UTC
+from icalendar.prop import vDuration
+from icalevents import icalevents
+from icalevents.icalparser import Event, get_timezone
+
+_LOGGER = logging.getLogger(__name__)
+
+# used if there is no byte order mark, like requests with the encoding forced to utf-8 did
+ENCODING = "utf-8"
+
+BOMS = (
+    (b"\xef\xbb\xbf", "utf-8"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+
+# properties which require recurrence expansion
+RECURRENCE_PROPERTIES = {b"RRULE", b"RDATE", b"EXRULE", b"RECURRENCE-ID"}
+
+# icalevents has problems with EXDATE values of type DATE, make them a DATE-TIME
+EXDATE_DATE_REGEX = re.compile(rb"(EXDATE;VALUE=DATE:[0-9]+)\r?\n")
+
+DATE_TIME_REGEX = re.compile(r"(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})(Z)?)?")
+
+
+class UnsupportedValue(Exception):
+    """A value which is passed to icalevents instead."""
+
+
+def strip_bom(data: bytes) -> bytes:
+    """Remove the byte order mark, UTF-16 data is converted to UTF-8 (default encoding)."""
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            data = data[len(bom) :]
+            if encoding != "utf-8":
+                # rare, convert once to keep the reader bytes based
+                data = data.decode(encoding, errors="replace").encode("utf-8")
+            break
+    return data
+
+
+def _unfold(data: bytes) -> Iterator[bytes]:
+    """Iterate over the unfolded content lines."""
+    current: Optional[bytes] = None
+    for line in io.BytesIO(data):
+        line = line.rstrip(b"\r\n")
+        if line[:1] in (b" ", b"\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split(line: bytes) -> Tuple[bytes, bytes, bytes]:
+    """Split content line into upper case name, parameters and value."""
+    colon = line.find(b":")
+    if colon < 0:
+        return line.upper(), b"", b""
+    semicolon = line.find(b";", 0, colon)
+    if semicolon >= 0 and b'"' in line[semicolon:colon]:
+        # a quoted parameter value may contain a colon
+        quoted = False
+        for i in range(semicolon, len(line)):
+            c = line[i : i + 1]
+            if c == b'"':
+                quoted = not quoted
+            elif c == b":" and not quoted:
+                colon = i
+                break
+    if semicolon < 0:
+        return line[:colon].upper(), b"", line[colon + 1 :]
+    return line[:semicolon].upper(), line[semicolon + 1 : colon], line[colon + 1 :]
+
+
+def _param(params: bytes, name: bytes) -> Optional[str]:
+    for p in params.split(b";"):
+        key, _, value = p.partition(b"=")
+        if key.upper() == name:
+            return value.strip(b'"').decode("utf-8", errors="replace")
+    return None
+
+
+def _unescape(text: str) -> str:
+    # order matters, see RFC 5545 3.3.11
+    return (
+        text.replace("\\N", "\\n")
+        .replace("\\n", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def _parse_date_time(
+    params: bytes, value: bytes
+) -> Union[datetime.date, datetime.datetime]:
+    m = DATE_TIME_REGEX.fullmatch(value.strip().decode("ascii", errors="replace"))
+    if m is None:
+        raise UnsupportedValue(value)
+    year, month, day, hour, minute, second, utc = m.groups()
+    if hour is None:
+        return datetime.date(int(year), int(month), int(day))
+    tzinfo: Any = None
+    if utc:
+        tzinfo = UTC
+    else:
+        tzid = _param(params, b"TZID")
+        if tzid is not None:
+            tzinfo = get_timezone(tzid)
+            if tzinfo is None:
+                raise UnsupportedValue(value)
+    return datetime.datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        min(int(second), 59),
+        tzinfo=tzinfo,
+    )
+
+
+class _RawEvent:
+    """Properties of one VEVENT, values are only decoded when needed."""
+
+    __slots__ = ("lines", "properties")
+
+    def __init__(self):
+        self.lines: List[bytes] = []
+        self.properties: Dict[bytes, List[Tuple[bytes, bytes]]] = {}
+
+    def add(self, line: bytes) -> None:
+        self.lines.append(line)
+        name, params, value = _split(line)
+        self.properties.setdefault(name, []).append((params, value))
+
+    def first(self, name: bytes) -> Optional[Tuple[bytes, bytes]]:
+        values = self.properties.get(name)
+        return values[0] if values else None
+
+    def text(self, name: bytes) -> Optional[str]:
+        prop = self.first(name)
+        if prop is None:
+            return None
+        return _unescape(prop[1].decode(ENCODING, errors="replace"))
+
+    def needs_recurrence(self) -> bool:
+        return not RECURRENCE_PROPERTIES.isdisjoint(self.properties)
+
+
+def _window(start, end, event_start) -> Tuple[Any, Any]:
+    """Window in the same format as the event start, as done by icalevents."""
+    if type(event_start) is datetime.date:
+        return start.date(), end.date()
+    if event_start.tzinfo:
+        return (
+            datetime.datetime(
+                start.year,
+                start.month,
+                start.day,
+                start.hour,
+                start.minute,
+                tzinfo=event_start.tzinfo,
+            ),
+            datetime.datetime(
+                end.year,
+                end.month,
+                end.day,
+                end.hour,
+                end.minute,
+                tzinfo=event_start.tzinfo,
+            ),
+        )
+    return start.replace(second=0, microsecond=0), end.replace(second=0, microsecond=0)
+
+
+class _Reader:
+    def __init__(self, data: bytes, start: datetime.datetime, end: datetime.datetime):
+        self._data = strip_bom(data)
+        self._start = start
+        self._end = end
+        # coarse pre-filter by date, independent of time zones
+        self._first_day = (start - datetime.timedelta(days=1)).date()
+        self._last_day = (end + datetime.timedelta(days=1)).date()
+
+        self.timezones: Dict[str, None] = {}
+        self.timezone_blocks: List[bytes] = []
+        self.candidates: List[_RawEvent] = []
+        self.fallback: List[_RawEvent] = []
+        self.replaced_uids: set = set()
+
+    def read(self) -> None:
+        event: Optional[_RawEvent] = None
+        timezone: Optional[List[bytes]] = None
+        depth = 0  # nesting inside of the VEVENT (e.g. VALARM)
+
+        for line in _unfold(self._data):
+            upper = line.upper()
+            if event is not None:
+                if upper.startswith(b"BEGIN:"):
+                    depth += 1
+                    event.lines.append(line)
+                elif upper.startswith(b"END:"):
+                    event.lines.append(line)
+                    if depth == 0:
+                        self._add(event)
+                        event = None
+                    else:
+                        depth -= 1
+                elif depth == 0:
+                    event.add(line)
+                else:
+                    event.lines.append(line)
+            elif timezone is not None:
+                timezone.append(line)
+                if upper == b"END:VTIMEZONE":
+                    self.timezone_blocks.append(b"\r\n".join(timezone))
+                    timezone = None
+                elif upper.startswith(b"TZID"):
+                    _, _, tzid = _split(line)
+                    self.timezones[tzid.decode(ENCODING, errors="replace")] = None
+            elif upper == b"BEGIN:VEVENT":
+                event = _RawEvent()
+                event.lines.append(line)
+                depth = 0
+            elif upper == b"BEGIN:VTIMEZONE":
+                timezone = [line]
+            elif upper.startswith(b"X-WR-TIMEZONE"):
+                _, _, name = _split(line)
+                self.timezones[name.decode(ENCODING, errors="replace")] = None
+
+    def _add(self, event: _RawEvent) -> None:
+        if event.needs_recurrence():
+            if event.first(b"RECURRENCE-ID") is not None:
+                uid = event.first(b"UID")
+                if uid is not None:
+                    self.replaced_uids.add(uid[1])
+            elif self._ends_before_window(event):
+                return
+            self.fallback.append(event)
+            return
+
+        dtstart = event.first(b"DTSTART")
+        if dtstart is not None:
+            day = DATE_TIME_REGEX.match(dtstart[1].strip().decode("ascii", "replace"))
+            if day is not None:
+                d = datetime.date(*(int(x) for x in day.groups()[:3]))
+                # events are at most a few days long, DTEND is checked later
+                if d > self._last_day or d < self._first_day - datetime.timedelta(
+                    days=31
+                ):
+                    return
+        self.candidates.append(event)
+
+    def _ends_before_window(self, event: _RawEvent) -> bool:
+        """Return True if a recurring event ends before the window (UNTIL), without expanding it."""
+        rrule = event.first(b"RRULE")
+        if rrule is None or event.first(b"RDATE") is not None:
+            return False
+        for part in rrule[1].upper().split(b";"):
+            key, _, value = part.partition(b"=")
+            if key == b"UNTIL":
+                m = DATE_TIME_REGEX.match(value.decode("ascii", "replace"))
+                if m is not None:
+                    until = datetime.date(*(int(x) for x in m.groups()[:3]))
+                    return until < self._first_day
+        return False
+
+    def cal_tz(self) -> Any:
+        # same as icalevents: the time zone if exactly one is defined, otherwise UTC
+        if len(self.timezones) == 1:
+            return get_timezone(next(iter(self.timezones)))
+        return UTC
+
+    def create_event(self, raw: _RawEvent, cal_tz: Any) -> Optional[Event]:
+        """Create the event if it is within the window, raises UnsupportedValue."""
+        dtstart = raw.first(b"DTSTART")
+        if dtstart is None:
+            raise UnsupportedValue("DTSTART missing")
+        start = _parse_date_time(*dtstart)
+
+        dtend = raw.first(b"DTEND")
+        duration = raw.first(b"DURATION")
+        if dtend is not None:
+            end = _parse_date_time(*dtend)
+            if type(end) is not type(start):
+                raise UnsupportedValue("DTSTART and DTEND of different type")
+        elif duration is not None:
+            try:
+                end = start + vDuration.from_ical(duration[1].decode("ascii"))
+            except (ValueError, UnicodeDecodeError) as e:
+                raise UnsupportedValue(duration[1]) from e
+        else:
+            end = start
+
+        f, t = _window(self._start, self._end, start)
+        try:
+            if not (end >= f and start <= t):
+                return None
+        except TypeError as e:
+            raise UnsupportedValue("incomparable DTSTART/DTEND") from e
+
+        for params, value in raw.properties.get(b"EXDATE", []):
+            for exdate in value.split(b","):
+                if exdate.strip()[:8] == b"%04d%02d%02d" % (
+                    start.year,
+                    start.month,
+                    start.day,
+                ):
+                    return None
+
+        e = Event()
+        e.organizer = str(None)
+        e.start = start
+        e.end = end
+        e.all_day = type(start) is datetime.date
+        e.floating = type(start) is datetime.date or start.tzinfo is None
+        e.summary = raw.text(b"SUMMARY")
+        e.description = raw.text(b"DESCRIPTION")
+        e.location = raw.text(b"LOCATION")
+        e.status = raw.text(b"STATUS")
+        e.url = raw.text(b"URL")
+        uid = raw.text(b"UID")
+        if uid is not None:
+            e.uid = uid
+        categories = [
+            _unescape(c)
+            for _, value in raw.properties.get(b"CATEGORIES", [])
+            for c in re.split(r"(?<!\\),", value.decode(ENCODING, errors="replace"))
+        ]
+        if categories:
+            e.categories = categories
+        transp = raw.first(b"TRANSP")
+        e.transparent = transp is not None and transp[1].strip() == b"TRANSPARENT"
+
+        # convert to the calendar time zone, as icalevents does (non strict mode)
+        if type(e.start) is datetime.date:
+            e.start = datetime.datetime.combine(e.start, datetime.time(), tzinfo=cal_tz)
+            e.end = datetime.datetime.combine(e.end, datetime.time(), tzinfo=cal_tz)
+        elif e.start.tzinfo:
+            e.start = e.start.astimezone(cal_tz)
+            e.end = e.end.astimezone(cal_tz)
+        else:
+            e.start = e.start.replace(tzinfo=cal_tz)
+            e.end = e.end.replace(tzinfo=cal_tz)
+        return e
+
+    def fallback_content(self) -> bytes:
+        lines = [b"BEGIN:VCALENDAR", b"VERSION:2.0"]
+        lines += [b"X-WR-TIMEZONE:" + tz.encode("utf-8") for tz in self.timezones][:1]
+        lines += self.timezone_blocks
+        lines += [b"\r\n".join(e.lines) for e in self.fallback]
+        lines.append(b"END:VCALENDAR")
+        content = b"\r\n".join(lines) + b"\r\n"
+        return EXDATE_DATE_REGEX.sub(lambda m: m.group(1) + b"T010000\r\n", content)
+
+
+def read_events(
+    data: Union[bytes, str], start: datetime.datetime, end: datetime.datetime
+) -> List[Event]:
+    """Return the events between start and end (naive local datetimes)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    reader = _Reader(data, start, end)
+    reader.read()
+    cal_tz = reader.cal_tz()
+
+    events: List[Event] = []
+    for raw in reader.candidates:
+        uid = raw.first(b"UID")
+        if uid is not None and uid[1] in reader.replaced_uids:
+            # might be replaced by a modified occurrence
+            reader.fallback.append(raw)
+            continue
+        try:
+            e = reader.create_event(raw, cal_tz)
+        except UnsupportedValue as ex:
+            _LOGGER.debug("passing event to icalevents: %s", ex)
+            reader.fallback.append(raw)
+            continue
+        if e is not None:
+            events.append(e)
+
+    if reader.fallback:
+        events.extend(
+            icalevents.events(
+                start=start, end=end, string_content=reader.fallback_content()
+            )
+        )
+    return events
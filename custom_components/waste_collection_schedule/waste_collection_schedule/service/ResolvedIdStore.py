@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Cache for provider IDs resolved from user supplied names.
+
+Many sources map city/street/house number names to numeric provider IDs on
+every fetch, which requires downloading the full lists of cities, streets and
+house numbers. The resolved IDs rarely change, so they are cached (and
+persisted across restarts when running in Home Assistant) and the full
+resolution is only repeated if the calendar request with the cached ID fails.
+
+Usage in a source:
+
+    from waste_collection_schedule.service.ResolvedIdStore import (
+        fetch_with_resolved_id,
+    )
+
+    def fetch(self):
+        return fetch_with_resolved_id(
+            "my_source", self._args, self._resolve_id, self._fetch_calendar
+        )
+"""
+
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "waste_collection_schedule.resolved_ids"
+
+# delay in seconds before writing to disk, collects changes of multiple sources
+SAVE_DELAY = 30
+
+T = TypeVar("T")
+
+
+class ResolvedIdStore:
+    """Store of resolved provider IDs, persisted in a Home Assistant Store if hass is given."""
+
+    def __init__(self, hass: Optional["HomeAssistant"] = None):
+        """Initialize the resolved id store."""
+        self._hass = hass
+        self._store = None
+        if hass is not None:
+            # import here, sources have to work without Home Assistant (e.g. test_sources.py)
+            from homeassistant.helpers import storage
+
+            self._store = storage.Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+
+    @staticmethod
+    def _key(source: str, args: Dict[str, Any]) -> str:
+        return f"{source}:{json.dumps(args, sort_keys=True, default=str)}"
+
+    async def async_load(self) -> None:
+        """Load resolved ids from storage (only once per Home Assistant run)."""
+        if self._loaded or self._store is None:
+            return
+        try:
+            data = await self._store.async_load()
+            with self._lock:
+                self._data = {**(data or {}).get("resolved_ids", {}), **self._data}
+        except Exception as e:
+            _LOGGER.error("Failed to load resolved ids from storage: %s", e)
+        self._loaded = True
+
+    async def async_save(self) -> None:
+        """Schedule saving the resolved ids to storage, if anything changed."""
+        if self._store is None or not self._dirty:
+            return
+        self._dirty = False
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"resolved_ids": dict(self._data)}
+
+    def get(self, source: str, args: Dict[str, Any]) -> Any:
+        """Get the resolved id for source and arguments (sync method for worker threads)."""
+        with self._lock:
+            return self._data.get(self._key(source, args))
+
+    def put(self, source: str, args: Dict[str, Any], value: Any) -> None:
+        """Set the resolved id for source and arguments (sync method for worker threads).
+
+        The value has to be JSON serializable.
+        """
+        key = self._key(source, args)
+        with self._lock:
+            if self._data.get(key) != value:
+                self._data[key] = value
+                self._dirty = True
+
+    def remove(self, source: str, args: Dict[str, Any]) -> None:
+        """Remove the resolved id for source and arguments (sync method for worker threads)."""
+        with self._lock:
+            if self._data.pop(self._key(source, args), None) is not None:
+                self._dirty = True
+
+
+# Global store instance, in memory only until initialized by Home Assistant
+_resolved_id_store: ResolvedIdStore = ResolvedIdStore()
+
+
+def get_resolved_id_store() -> ResolvedIdStore:
+    """Get the global resolved id store instance."""
+    return _resolved_id_store
+
+
+def initialize_resolved_id_store(hass: "HomeAssistant") -> ResolvedIdStore:
+    """Initialize the global resolved id store with Home Assistant storage."""
+    global _resolved_id_store
+    if _resolved_id_store._hass is None:
+        _resolved_id_store = ResolvedIdStore(hass)
+    return _resolved_id_store
+
+
+def fetch_with_resolved_id(
+    source: str,
+    args: Dict[str, Any],
+    resolve: Callable[[], Any],
+    fetch: Callable[[Any], List[T]],
+) -> List[T]:
+    """Fetch using the cached resolved id, resolve it again only if that fails.
+
+    Args:
+        source: source name, used as part of the cache key
+        args: source arguments identifying the resolved id
+        resolve: resolves the id (e.g. by downloading city and street lists)
+        fetch: fetches the collections for a resolved id
+    """
+    store = get_resolved_id_store()
+    resolved = store.get(source, args)
+    if resolved is not None:
+        try:
+            entries = fetch(resolved)
+            if len(entries) > 0:
+                return entries
+            _LOGGER.debug("No entries for cached id of %s, resolving again", source)
+        except Exception as e:
+            _LOGGER.debug(
+                "Fetch with cached id of %s failed (%s), resolving again", source, e
+            )
+        store.remove(source, args)
+
+    resolved = resolve()
+    entries = fetch(resolved)
+    if len(entries) > 0:
+        store.put(source, args, resolved)
+    return entries
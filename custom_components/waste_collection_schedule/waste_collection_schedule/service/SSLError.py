@@ -18,10 +18,14 @@ class CustomHttpAdapter (requests.adapters.HTTPAdapter):
             block=block, ssl_context=self.ssl_context)
 
 
-def get_legacy_session():
+def get_legacy_ssl_context():
     ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
     ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
+    return ctx
+
+
+def get_legacy_session():
     session = requests.session()
-    session.mount('https://', CustomHttpAdapter(ctx))
+    session.mount('https://', CustomHttpAdapter(get_legacy_ssl_context()))
     return session
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Catalogue of all sources listed in sources.json.
+
+The catalogue is loaded once per process and shared by all config flows. It
+is partitioned per country and provides a token prefix search over the
+source titles and module names.
+"""
+
+import bisect
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .SourceManifest import SourceDescription
+
+_LOGGER = logging.getLogger(__name__)
+
+_TOKEN_REGEX = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_REGEX.findall(text.lower())
+
+
+class CatalogueEntry:
+    """A source as listed in sources.json."""
+
+    __slots__ = ("title", "module", "default_params", "id", "country")
+
+    def __init__(
+        self,
+        title: str,
+        module: str,
+        default_params: dict[str, Any],
+        id: str,
+        country: str,
+    ):
+        self.title = title
+        self.module = module
+        self.default_params = default_params
+        self.id = id
+        self.country = country
+
+    @property
+    def option_value(self) -> str:
+        """Value used in the source dropdown of the config flow."""
+        return f"{self.module}\t{self.title}\t{self.id}"
+
+    @property
+    def option_label(self) -> str:
+        return f"{self.title} ({self.module})"
+
+    def __repr__(self):
+        return f"CatalogueEntry{{id={self.id}, title={self.title}}}"
+
+
+class SourceCatalogue:
+    """Sources per country with lookup by dropdown value and search index."""
+
+    def __init__(
+        self,
+        sources: dict[str, list[dict[str, Any]]],
+        manifest: Optional[dict[str, dict[str, Any]]] = None,
+    ):
+        self._entries: list[CatalogueEntry] = []
+        self._countries: dict[str, dict[str, CatalogueEntry]] = {}
+        self._ids: set[str] = set()
+        for country, country_sources in sources.items():
+            partition = self._countries.setdefault(country, {})
+            for s in country_sources:
+                entry = CatalogueEntry(
+                    title=s["title"],
+                    module=s["module"],
+                    default_params=s.get("default_params", {}),
+                    id=s["id"],
+                    country=country,
+                )
+                self._entries.append(entry)
+                # keep the first one like the former linear scan did
+                partition.setdefault(entry.option_value, entry)
+                self._ids.add(entry.id)
+
+        # sorted (token, entry index) pairs for prefix search
+        self._tokens = sorted(
+            {
+                (token, index)
+                for index, entry in enumerate(self._entries)
+                for token in _tokenize(f"{entry.title} {entry.module}")
+            }
+        )
+
+        self._manifest = manifest or {}
+        self._descriptions: dict[str, SourceDescription] = {}
+        self._options: dict[str, list[dict[str, str]]] = {}
+
+    @staticmethod
+    def load(sources_file: Path, manifest_file: Optional[Path] = None):
+        with sources_file.open(encoding="utf-8") as f:
+            sources = json.load(f)
+        manifest = None
+        if manifest_file is not None and manifest_file.exists():
+            with manifest_file.open(encoding="utf-8") as f:
+                manifest = json.load(f)
+        return SourceCatalogue(sources, manifest)
+
+    @property
+    def countries(self) -> list[str]:
+        return list(self._countries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def has_id(self, id: str) -> bool:
+        return id in self._ids
+
+    def get_country(self, country: str) -> list[CatalogueEntry]:
+        return list(self._countries.get(country, {}).values())
+
+    def get_options(self, country: str) -> list[dict[str, str]]:
+        """Return the (cached) dropdown options of all sources of a country."""
+        options = self._options.get(country)
+        if options is None:
+            options = [{"value": "", "label": ""}] + [
+                {"value": e.option_value, "label": e.option_label}
+                for e in self._countries.get(country, {}).values()
+            ]
+            self._options[country] = options
+        return options
+
+    def lookup(self, country: str, value: str) -> Optional[CatalogueEntry]:
+        """Return the source selected in the dropdown of a country."""
+        return self._countries.get(country, {}).get(value)
+
+    def search(self, query: str, country: Optional[str] = None) -> list[CatalogueEntry]:
+        """Return sources with words of title or module starting with all query words."""
+        result: Optional[set[int]] = None
+        for token in _tokenize(query):
+            start = bisect.bisect_left(self._tokens, (token,))
+            end = bisect.bisect_left(self._tokens, (token + "\uffff",))
+            matches = {index for _, index in self._tokens[start:end]}
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        if result is None:
+            return []
+        entries = [self._entries[i] for i in sorted(result)]
+        if country is not None:
+            entries = [e for e in entries if e.country == country]
+        return entries
+
+    def get_description(self, module: str) -> Optional[SourceDescription]:
+        """Return the arguments of a source from the manifest if available."""
+        description = self._descriptions.get(module)
+        if description is None and module in self._manifest:
+            description = SourceDescription.from_manifest(self._manifest[module])
+            self._descriptions[module] = description
+        return description
+
+
+_source_catalogue: Optional[SourceCatalogue] = None
+_lock = threading.Lock()
+
+
+def get_source_catalogue() -> Optional[SourceCatalogue]:
+    """Get the source catalogue if already loaded."""
+    return _source_catalogue
+
+
+def load_source_catalogue(
+    sources_file: Path, manifest_file: Optional[Path] = None
+) -> SourceCatalogue:
+    """Load the source catalogue once, blocking (run in an executor)."""
+    global _source_catalogue
+    with _lock:
+        if _source_catalogue is None:
+            _source_catalogue = SourceCatalogue.load(sources_file, manifest_file)
+            _LOGGER.debug("Loaded %d sources", len(_source_catalogue))
+        return _source_catalogue
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Description of a source's arguments without importing the source.
+
+Importing a source can be expensive (large service maps, pdf or crypto
+libraries, ...). update_docu_links.py therefore writes the argument names,
+type annotations and defaults of all sources to a manifest next to
+sources.json, which is used by the config flow to build its forms. The
+source module itself is only imported when a fetch has to be validated.
+"""
+
+import functools
+import inspect
+import operator
+import types
+from datetime import date, datetime
+from typing import Any, Literal, Optional, Union, get_args, get_origin
+
+_NAMES: dict[str, Any] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "set": set,
+    "date": date,
+    "datetime": datetime,
+    "None": type(None),
+    "Any": Any,
+}
+_TYPES = {id(v): k for k, v in _NAMES.items()}
+
+_GENERICS = {"list": list, "dict": dict, "tuple": tuple, "set": set}
+
+_UNSUPPORTED = "?"
+
+_DEFAULT_KIND = inspect.Parameter.POSITIONAL_OR_KEYWORD.name
+
+
+class UnsupportedAnnotation:
+    """Placeholder for annotations which can not be stored in the manifest."""
+
+
+def _is_json_value(value: Any) -> bool:
+    # tuples and other containers would come back as lists, which the config
+    # flow treats differently
+    if value is None or type(value) in (str, int, float, bool):
+        return True
+    if type(value) is list:
+        return all(_is_json_value(v) for v in value)
+    if type(value) is dict:
+        return all(type(k) is str and _is_json_value(v) for k, v in value.items())
+    return False
+
+
+def encode_annotation(annotation: Any) -> Any:
+    """Encode a type annotation as JSON value."""
+    if annotation is None:
+        return "None"
+    if id(annotation) in _TYPES:
+        return _TYPES[id(annotation)]
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Literal:
+        if all(_is_json_value(a) for a in args):
+            return {"literal": list(args)}
+    elif origin is Union or origin is types.UnionType:
+        return {"union": [encode_annotation(a) for a in args]}
+    elif origin is not None and id(origin) in _TYPES:
+        return {_TYPES[id(origin)]: [encode_annotation(a) for a in args]}
+    return _UNSUPPORTED
+
+
+def decode_annotation(value: Any) -> Any:
+    """Create the type annotation from its encoded form."""
+    if isinstance(value, str):
+        return _NAMES.get(value, UnsupportedAnnotation)
+
+    ((kind, args),) = value.items()
+    if kind == "literal":
+        return Literal[tuple(args)]
+    decoded = [decode_annotation(a) for a in args]
+    if kind == "union":
+        return functools.reduce(operator.or_, decoded)
+    if kind in _GENERICS:
+        return _GENERICS[kind][tuple(decoded)] if decoded else _GENERICS[kind]
+    return UnsupportedAnnotation
+
+
+class SourceDescription:
+    """Title, arguments and config flow hints of a source."""
+
+    __slots__ = ("title", "parameters", "flow_types")
+
+    def __init__(
+        self,
+        title: Optional[str],
+        parameters: list[inspect.Parameter],
+        flow_types: Optional[dict[str, dict[str, Any]]] = None,
+    ):
+        self.title = title
+        self.parameters = parameters
+        self.flow_types = flow_types or {}
+
+    @staticmethod
+    def from_module(module: types.ModuleType) -> "SourceDescription":
+        parameters = list(inspect.signature(module.Source.__init__).parameters.values())
+        return SourceDescription(
+            title=getattr(module, "TITLE", None),
+            parameters=[p for p in parameters if p.name != "self"],
+            flow_types=getattr(module, "CONFIG_FLOW_TYPES", {}),
+        )
+
+    @staticmethod
+    def from_manifest(entry: dict[str, Any]) -> "SourceDescription":
+        parameters = []
+        for p in entry["params"]:
+            parameters.append(
+                inspect.Parameter(
+                    p["name"],
+                    getattr(inspect.Parameter, p.get("kind", _DEFAULT_KIND)),
+                    default=p.get("default", inspect.Parameter.empty),
+                    annotation=(
+                        decode_annotation(p["annotation"])
+                        if "annotation" in p
+                        else inspect.Parameter.empty
+                    ),
+                )
+            )
+        return SourceDescription(
+            title=entry.get("title"),
+            parameters=parameters,
+            flow_types=entry.get("flow_types"),
+        )
+
+    def to_manifest(self) -> Optional[dict[str, Any]]:
+        """Return the manifest entry or None if the source can't be described."""
+        params = []
+        for p in self.parameters:
+            param: dict[str, Any] = {"name": p.name}
+            if p.kind.name != _DEFAULT_KIND:
+                param["kind"] = p.kind.name
+            if p.annotation is not inspect.Parameter.empty:
+                param["annotation"] = encode_annotation(p.annotation)
+            if p.default is not inspect.Parameter.empty:
+                if not _is_json_value(p.default):
+                    return None
+                param["default"] = p.default
+            params.append(param)
+
+        if not _is_json_value(self.flow_types):
+            return None
+
+        entry: dict[str, Any] = {"title": self.title, "params": params}
+        if self.flow_types:
+            entry["flow_types"] = self.flow_types
+        return entry
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .source_shell import SourceShell
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ShellGroup:
+    """Shells of identical sources (same unique id) sharing their fetches.
+
+    Only one shell of the group fetches at a time. The fetched (unmodified)
+    entries are applied to all other shells of the group, each with its own
+    customize and day offset. A fetch waiting for the fetch of another shell
+    is skipped if that one succeeded.
+    """
+
+    def __init__(self, unique_id: str):
+        self._unique_id = unique_id
+        self._shells: List["SourceShell"] = []
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+        # time.monotonic() of the last successful fetch
+        self._fetched: Optional[float] = None
+
+    @property
+    def unique_id(self) -> str:
+        return self._unique_id
+
+    @property
+    def shells(self) -> List["SourceShell"]:
+        return list(self._shells)
+
+    def fetch(self, shell: "SourceShell", fetch: Callable[[], bool]) -> bool:
+        requested = time.monotonic()
+        with self._lock:
+            if self._fetched is not None and self._fetched >= requested:
+                _LOGGER.debug(f"using shared fetch of source {shell.title}")
+                return True
+            return self._share(shell, fetch())
+
+    async def async_fetch(
+        self, shell: "SourceShell", fetch: Callable[[], Awaitable[bool]]
+    ) -> bool:
+        requested = time.monotonic()
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._fetched is not None and self._fetched >= requested:
+                _LOGGER.debug(f"using shared fetch of source {shell.title}")
+                return True
+            return self._share(shell, await fetch())
+
+    def _share(self, shell: "SourceShell", success: bool) -> bool:
+        # failures are not shared, every shell retries on its own schedule
+        if success:
+            self._fetched = time.monotonic()
+            for peer in self.shells:
+                if peer is not shell:
+                    peer.apply_shared(shell)
+        return success
+
+
+class ShellRegistry:
+    """Reference counted groups of identical sources of all config entries and YAML."""
+
+    def __init__(self):
+        self._groups: Dict[str, ShellGroup] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shell: "SourceShell") -> ShellGroup:
+        """Add shell to the group of its unique id.
+
+        The shell gets the entries of the group immediately if another shell
+        already fetched them.
+        """
+        with self._lock:
+            group = self._groups.get(shell.unique_id)
+            if group is None:
+                group = self._groups[shell.unique_id] = ShellGroup(shell.unique_id)
+            peers = group.shells
+            group._shells.append(shell)
+        shell.set_group(group)
+        if shell.refreshtime is None:
+            fetched = [p for p in peers if p.refreshtime is not None]
+            if fetched:
+                shell.apply_shared(max(fetched, key=lambda p: p.refreshtime))
+        return group
+
+    def release(self, shell: "SourceShell") -> None:
+        """Remove shell from its group, the group is removed with its last shell."""
+        with self._lock:
+            group = self._groups.get(shell.unique_id)
+            if group is None or shell not in group._shells:
+                return
+            group._shells.remove(shell)
+            if not group._shells:
+                del self._groups[shell.unique_id]
+        shell.set_group(None)
+
+    def refcount(self, unique_id: str) -> int:
+        """Number of shells sharing the fetches of a source."""
+        with self._lock:
+            group = self._groups.get(unique_id)
+            return len(group._shells) if group else 0
+
+
+# Global registry instance
+_shell_registry: Optional[ShellRegistry] = None
+
+
+def get_shell_registry() -> ShellRegistry:
+    """Get the global shell registry instance."""
+    global _shell_registry
+    if _shell_registry is None:
+        _shell_registry = ShellRegistry()
+    return _shell_registry
@@ -5,6 +5,7 @@ import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
 from waste_collection_schedule.exceptions import SourceArgumentNotFoundWithSuggestions
 from waste_collection_schedule.service.ICS import ICS
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 TITLE = "AWIDO Online"
 DESCRIPTION = "Source for AWIDO waste collection."
@@ -328,8 +329,20 @@ class Source:
         self._street = street.lower() if street else None
         self._housenumber = None if housenumber is None else str(housenumber).lower()
         self._ics = ICS()
+        # cache key of the resolved oid, _resolve_oid may change self._street
+        self._args = {
+            "customer": self._customer,
+            "city": self._city,
+            "street": self._street,
+            "housenumber": self._housenumber,
+        }
 
     def fetch(self) -> list[Collection]:
+        return fetch_with_resolved_id(
+            "awido_de", self._args, self._resolve_oid, self._fetch_oid
+        )
+
+    def _resolve_oid(self) -> str:
         # Retrieve list of places
         r = requests.get(
             f"https://awido.cubefour.de/WebServices/Awido.Service.svc/secure/getPlaces/client={self._customer}"
@@ -412,6 +425,9 @@ class Source:
                         )
                     oid = hsnbr_to_oid[self._housenumber]
 
+        return oid
+
+    def _fetch_oid(self, oid: str) -> list[Collection]:
         try:
             return self.get_json_data(oid)
         except JSONNotSupported:
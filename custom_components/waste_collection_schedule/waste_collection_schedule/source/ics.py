@@ -5,13 +5,13 @@ from os import getcwd
 from pathlib import Path
 from typing import Literal
 
-import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
 from waste_collection_schedule.exceptions import (
     SourceArgumentException,
     SourceArgumentExceptionMultiple,
     SourceArgumentNotFoundWithSuggestions,
 )
+from waste_collection_schedule.service.HttpClient import HttpClient, get_http_client
 from waste_collection_schedule.service.ICS import ICS
 
 TITLE = "ICS"
@@ -109,6 +109,10 @@ TEST_CASES = {
 HEADERS = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 _LOGGER = logging.getLogger(__name__)
 
+# parsed results of unchanged (HTTP 304) calendars are reused for this time,
+# afterwards the calendar is parsed again to move the window of recurring events
+PARSED_RESULT_MAX_AGE = datetime.timedelta(days=7)
+
 
 PARAM_TRANSLATIONS = {
     "en": {
@@ -170,6 +174,12 @@ class Source:
         self._verify_ssl = verify_ssl
         self._headers = HEADERS
         self._headers.update(headers)
+        self._http_client = get_http_client()
+        # (url, params) -> (cache validator, parse time, parsed dates)
+        self._parsed: dict[str, tuple[str, datetime.datetime, list]] = {}
+
+    def set_http_client(self, http_client: HttpClient):
+        self._http_client = http_client
 
     def fetch(self):
         if self._url is not None:
@@ -211,11 +221,11 @@ class Source:
     def fetch_url(self, url, params=None):
         # get ics file
         if self._method == "GET":
-            r = requests.get(
+            r = self._http_client.get_cached(
                 url, params=params, headers=self._headers, verify=self._verify_ssl
             )
         elif self._method == "POST":
-            r = requests.post(
+            r = self._http_client.post(
                 url, data=params, headers=self._headers, verify=self._verify_ssl
             )
         else:
@@ -227,12 +237,24 @@ class Source:
 
         r.raise_for_status()
 
-        if r.apparent_encoding == "UTF-8-SIG":
-            r.encoding = "UTF-8-SIG"
-        else:
-            r.encoding = "utf-8"  # requests doesn't guess the encoding correctly
+        # reuse the parsed result if the calendar didn't change
+        key = f"{url}{params}"
+        validator = getattr(r, "cache_validator", None)
+        now = datetime.datetime.now()
+        if getattr(r, "from_cache", False) and key in self._parsed:
+            parsed_validator, parsed_time, dates = self._parsed[key]
+            if (
+                parsed_validator == validator
+                and now - parsed_time < PARSED_RESULT_MAX_AGE
+            ):
+                _LOGGER.debug("ICS file not modified, reusing parsed result")
+                return self._to_collections(dates)
 
-        return self._convert(r.text)
+        # parsed as bytes, the encoding is taken from the byte order mark (UTF-8 by default)
+        dates = self._ics.convert(r.content)
+        if validator is not None:
+            self._parsed[key] = (validator, now, dates)
+        return self._to_collections(dates)
 
     def fetch_file(self, file: str):
         try:
@@ -247,8 +269,9 @@ class Source:
         return self._convert(text)
 
     def _convert(self, data):
-        dates = self._ics.convert(data)
+        return self._to_collections(self._ics.convert(data))
 
+    def _to_collections(self, dates):
         entries = []
         for d in dates:
             entries.append(Collection(d[0], d[1]))
@@ -7,6 +7,7 @@ from waste_collection_schedule.exceptions import (
     SourceArgumentExceptionMultiple,
     SourceArgumentNotFoundWithSuggestions,
 )
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 TITLE = "Impact Apps"
 DESCRIPTION = (
@@ -512,23 +513,41 @@ class Source:
             self.location_finder = LocationFinder(self.api_url)
 
     def fetch(self) -> List[Collection]:
-        start_date = date.today()
-        end_date = start_date + timedelta(365)
-
         session = requests.Session()
         session.headers.update(HEADERS)
 
-        if not self.property_id:
-            suburb_id = self.location_finder.find_suburb_id(session, self.suburb)
-            street_id = self.location_finder.find_street_id(
-                session, suburb_id, self.street_name
-            )
-            self.property_id = self.location_finder.find_property_id(
-                session, street_id, self.street_number, self.street_name, self.suburb
-            )
+        if self.property_id:
+            return self._fetch_property(session, self.property_id)
+
+        return fetch_with_resolved_id(
+            "impactapps_com_au",
+            {
+                "api_url": self.api_url,
+                "suburb": self.suburb,
+                "street_name": self.street_name,
+                "street_number": self.street_number,
+            },
+            lambda: self._resolve_property_id(session),
+            lambda property_id: self._fetch_property(session, property_id),
+        )
+
+    def _resolve_property_id(self, session: requests.Session) -> int:
+        suburb_id = self.location_finder.find_suburb_id(session, self.suburb)
+        street_id = self.location_finder.find_street_id(
+            session, suburb_id, self.street_name
+        )
+        return self.location_finder.find_property_id(
+            session, street_id, self.street_number, self.street_name, self.suburb
+        )
+
+    def _fetch_property(
+        self, session: requests.Session, property_id: int
+    ) -> List[Collection]:
+        start_date = date.today()
+        end_date = start_date + timedelta(365)
 
         # Retrieve the collection events for the property
-        url = f"{self.api_url}/api/v1/properties/{self.property_id}.json"
+        url = f"{self.api_url}/api/v1/properties/{property_id}.json"
         response = session.get(
             url, params={"start": start_date.isoformat(), "end": end_date.isoformat()}
         )
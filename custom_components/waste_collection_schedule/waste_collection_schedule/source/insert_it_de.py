@@ -10,6 +10,7 @@ from waste_collection_schedule.exceptions import (
 )
 from waste_collection_schedule.service.ICS import ICS
 from waste_collection_schedule.service.InsertITDe import SERVICE_MAP
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 TITLE = "Insert IT Apps"
 DESCRIPTION = "Source for Apps by Insert IT"
@@ -162,20 +163,31 @@ class Source:
         )
 
     def fetch(self):
-        if not (self._uselocation):
-            street_id = self.get_street_id()
-            self._location = self.get_location_id(street_id)
+        if self._uselocation:
+            return self._fetch_location(self._location)
+
+        return fetch_with_resolved_id(
+            "insert_it_de",
+            {
+                "municipality": self._municipality,
+                "street": self._street,
+                "hnr": self._hnr,
+            },
+            lambda: self.get_location_id(self.get_street_id()),
+            self._fetch_location,
+        )
 
+    def _fetch_location(self, location_id):
         now = datetime.now()
 
-        entries = self.fetch_year(now.year)
+        entries = self.fetch_year(now.year, location_id)
         if now.month == 12:
-            entries += self.fetch_year(now.year + 1)
+            entries += self.fetch_year(now.year + 1, location_id)
         return entries
 
-    def fetch_year(self, year):
+    def fetch_year(self, year, location_id):
         s = requests.Session()
-        params = {"bmsLocationId": self._location, "year": year}
+        params = {"bmsLocationId": location_id, "year": year}
 
         r = s.get(f"{self._api_url}/Main/Calender", params=params)
         r.raise_for_status()
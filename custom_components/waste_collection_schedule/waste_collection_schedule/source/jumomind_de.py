@@ -9,6 +9,7 @@ from waste_collection_schedule.exceptions import (
     SourceArgumentNotFound,
     SourceArgumentNotFoundWithSuggestions,
 )
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 TITLE = "Jumomind"
 DESCRIPTION = "Source for Jumomind.de waste collection."
@@ -267,82 +268,101 @@ class Source:
     def fetch(self):
         session = requests.Session()
 
-        city_id = self._city_id
-        area_id = self._area_id
-
-        if city_id is None and self._city is None:
+        if self._city_id is None and self._city is None:
             raise SourceArgumentExceptionMultiple(
                 ["city", "city_id"], "City or city id is required"
             )
-        if city_id is not None and self._city is not None:
+        if self._city_id is not None and self._city is not None:
             raise SourceArgumentExceptionMultiple(
                 ["city", "city_id"], "City OR city id is required. Do not use both"
             )
 
+        if self._city_id is not None:
+            if self._area_id is None:
+                raise SourceArgumentException(
+                    "area_id",
+                    "Area id is required when using city_id. Remove city id when using city (and street) name",
+                )
+            # ids given by the user, nothing to resolve
+            return self._fetch_ids(session, [self._city_id, self._area_id])
+
+        return fetch_with_resolved_id(
+            "jumomind_de",
+            {
+                "service_id": self._service_id,
+                "city": self._city,
+                "street": self._street,
+                "house_number": self._house_number,
+            },
+            lambda: self._resolve_ids(session),
+            lambda ids: self._fetch_ids(session, ids),
+        )
+
+    def _resolve_ids(self, session: requests.Session) -> list:
+        """Resolve city and street name to [city_id, area_id]."""
+        city_id = None
+        area_id = None
+
         r = session.get(self._api_url, params={"r": "cities_web"})
         r.raise_for_status()
 
         cities = r.json()
 
-        if city_id is not None:
-            if area_id is None:
-                raise SourceArgumentException(
-                    "area_id",
-                    "Area id is required when using city_id. Remove city id when using city (and street) name",
-                )
-        else:
-            has_streets = True
-            for city in cities:
+        has_streets = True
+        for city in cities:
+            if (
+                city["name"].lower().strip() == self._city
+                or city["_name"].lower().strip() == self._city
+            ):
+                city_id = city["id"]
+                area_id = city["area_id"]
+                has_streets = city["has_streets"]
+                break
+
+        if city_id is None:
+            raise SourceArgumentNotFoundWithSuggestions(
+                "city", self._city, [c["name"] for c in cities]
+            )
+
+        if has_streets:
+            r = session.get(self._api_url, params={"r": "streets", "city_id": city_id})
+            r.raise_for_status()
+            streets = r.json()
+
+            street_found = False
+            for street in streets:
                 if (
-                    city["name"].lower().strip() == self._city
-                    or city["_name"].lower().strip() == self._city
+                    street["name"].lower().strip() == self._street
+                    or street["_name"].lower().strip() == self._street
                 ):
-                    city_id = city["id"]
-                    area_id = city["area_id"]
-                    has_streets = city["has_streets"]
+                    street_found = True
+                    area_id = street["area_id"]
+                    if "houseNumbers" in street:
+                        for house_number in street["houseNumbers"]:
+                            if (
+                                house_number[0].lower().strip().lstrip("0")
+                                == self._house_number
+                            ):
+                                area_id = house_number[1]
+                                break
                     break
-
-            if city_id is None:
+            if not street_found:
+                streets_suggestions = {s.get("name") for s in streets}
+                streets_suggestions.update({s.get("_name") for s in streets})
+                streets_suggestions -= {None}
                 raise SourceArgumentNotFoundWithSuggestions(
-                    "city", self._city, [c["name"] for c in cities]
+                    "street", self._street, streets_suggestions
                 )
-
-            if has_streets:
-                r = session.get(
-                    self._api_url, params={"r": "streets", "city_id": city_id}
+        else:
+            if self._street is not None:
+                LOGGER.warning(
+                    "City does not need street name please remove it, continuing anyway"
                 )
-                r.raise_for_status()
-                streets = r.json()
-
-                street_found = False
-                for street in streets:
-                    if (
-                        street["name"].lower().strip() == self._street
-                        or street["_name"].lower().strip() == self._street
-                    ):
-                        street_found = True
-                        area_id = street["area_id"]
-                        if "houseNumbers" in street:
-                            for house_number in street["houseNumbers"]:
-                                if (
-                                    house_number[0].lower().strip().lstrip("0")
-                                    == self._house_number
-                                ):
-                                    area_id = house_number[1]
-                                    break
-                        break
-                if not street_found:
-                    streets_suggestions = {s.get("name") for s in streets}
-                    streets_suggestions.update({s.get("_name") for s in streets})
-                    streets_suggestions -= {None}
-                    raise SourceArgumentNotFoundWithSuggestions(
-                        "street", self._street, streets_suggestions
-                    )
-            else:
-                if self._street is not None:
-                    LOGGER.warning(
-                        "City does not need street name please remove it, continuing anyway"
-                    )
+
+        return [city_id, area_id]
+
+    def _fetch_ids(self, session: requests.Session, ids: list) -> list[Collection]:
+        city_id, area_id = ids
 
         # get names for bins
 
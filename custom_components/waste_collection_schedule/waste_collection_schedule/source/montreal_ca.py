@@ -2,8 +2,8 @@ import logging
 import re
 from datetime import datetime
 
-import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
+from waste_collection_schedule.service.HttpClient import get_http_client
 
 # Currently, Montreal does not offer an iCal/Webcal subscription method.
 # The GeoJSON file provides sector-specific details.
@@ -325,7 +325,8 @@ class Source:
     def get_data_by_source(self, source_type, url):
         # Get waste collection zone by longitude and latitude
 
-        r = requests.get(url, timeout=60)
+        # the GeoJSON files are large and rarely change, use a conditional request
+        r = get_http_client().get_cached(url, timeout=60)
         r.raise_for_status()
 
         schedule = r.json()
@@ -4,6 +4,7 @@ from typing import TypedDict
 import requests
 from waste_collection_schedule import Collection  # type: ignore[attr-defined]
 from waste_collection_schedule.exceptions import SourceArgumentNotFoundWithSuggestions
+from waste_collection_schedule.service.ResolvedIdStore import fetch_with_resolved_id
 
 TITLE = "SISMS.pl / BLISKO"
 DESCRIPTION = "Source for SISMS.pl / BLISKO."
@@ -340,6 +341,20 @@ class Source:
         )
 
     def fetch(self) -> list[Collection]:
+        return fetch_with_resolved_id(
+            "sims_pl",
+            {
+                "owner_id": self._owner_id,
+                "town": self._town,
+                "street": self._street,
+                "street_address": self._street_address,
+                "town_address": self._town_address,
+            },
+            self._resolve_address_id,
+            self._fetch_address_id,
+        )
+
+    def _resolve_address_id(self) -> str:
         towns = self.get_towns()
         town_id: str | None = None
         for town in towns["data"]:
@@ -395,6 +410,9 @@ class Source:
                     ],
                 )
 
+        return address_id
+
+    def _fetch_address_id(self, address_id: str) -> list[Collection]:
         bins = self.get_bins(address_id)
 
         bins_map = {b["id"]: b["name"] for b in bins["data"]}
@@ -10,6 +10,7 @@ from waste_collection_schedule import Collection  # type: ignore[attr-defined]
 TITLE = "Static Source"
 DESCRIPTION = "Source for static waste collection schedules."
 URL = None
+NETWORK = False  # entries are computed, fetch only if they run out
 TEST_CASES = {
     "Dates only": {"type": "Dates only", "dates": ["2022-01-01", "2022-02-28"]},
     "Same date twice": {"type": "Dates only", "dates": ["2022-01-01", "2022-01-01"]},
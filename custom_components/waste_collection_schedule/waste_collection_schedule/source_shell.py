@@ -1,17 +1,40 @@
+import asyncio
 import datetime
 import importlib
+import inspect
 import logging
 import traceback
-from typing import Dict, Iterable, List, Optional, Protocol
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol
 
+from .circuit_breaker import CircuitBreaker
 from .collection import Collection
+from .fetch_metrics import FetchMetrics
+from .service.HttpClient import cookie_scope
+
+if TYPE_CHECKING:
+    from .shell_registry import ShellGroup
 
 _LOGGER = logging.getLogger(__name__)
 
+# fetch daily if the fetched entries end within this number of days
+SHORT_HORIZON_DAYS = 28
+
+# the fetch interval doubles with every fetch without changes, up to 2^5 days
+MAX_BACKOFF_EXPONENT = 5
+
 
 class Fetchable(Protocol):
-    def fetch(self) -> list[Collection]:
-        ...
+    def fetch(self) -> list[Collection]: ...
+
+
+class AsyncFetchable(Protocol):
+    """Source fetching in the event loop, e.g. with aiohttp.
+
+    The shared aiohttp.ClientSession of Home Assistant is injected if the
+    source implements set_client_session (see service/AsyncHttpClient.py).
+    """
+
+    async def fetch(self) -> list[Collection]: ...
 
 
 class SourceModule(Protocol):
@@ -19,7 +42,11 @@ class SourceModule(Protocol):
     DESCRIPTION: str
     URL: str
 
-    Source: Fetchable
+    # optional hints for the fetch schedule:
+    # NETWORK: bool, False if the entries are computed without network access
+    # MIN_REFRESH_INTERVAL: datetime.timedelta, entries don't change more often
+
+    Source: Fetchable | AsyncFetchable
 
 
 class Customize:
@@ -103,7 +130,7 @@ def apply_day_offset(entry: Collection, day_offset: int) -> Collection:
 class SourceShell:
     def __init__(
         self,
-        source: Fetchable,
+        source: Fetchable | AsyncFetchable,
         customize: Dict[str, Customize],
         title: str,
         description: str,
@@ -111,6 +138,8 @@ class SourceShell:
         calendar_title: Optional[str],
         unique_id: str,
         day_offset: int,
+        network: bool = True,
+        min_refresh_interval: Optional[datetime.timedelta] = None,
     ):
         self._source = source
         self._customize = customize
@@ -121,12 +150,47 @@ class SourceShell:
         self._unique_id = unique_id
         self._refreshtime: datetime.datetime | None = None
         self._entries: List[Collection] = []
+        self._raw_entries: List[Dict[str, Any]] = []
         self._day_offset = day_offset
+        # incremented whenever _entries is replaced, allows consumers to cache derived data
+        self._version = 0
+        # fingerprint of the raw entries, used to detect fetches without changes
+        self._fingerprint: Optional[int] = None
+        self._changed = False
+        # used to adapt the fetch interval
+        self._network = network
+        self._min_refresh_interval = min_refresh_interval
+        self._last_ordinal: Optional[int] = None
+        self._unchanged_fetches = 0
+        self._breaker = CircuitBreaker()
+        self._metrics = FetchMetrics()
+        self._is_async = inspect.iscoroutinefunction(source.fetch)
+        # identical sources of other config entries, see ShellRegistry
+        self._group: Optional["ShellGroup"] = None
 
     @property
     def refreshtime(self):
         return self._refreshtime
 
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def changed(self) -> bool:
+        """Return True if the last fetch returned different entries than the one before."""
+        return self._changed
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Retry and circuit breaker state of the fetches."""
+        return self._breaker
+
+    @property
+    def metrics(self) -> FetchMetrics:
+        """Duration, requests, bytes and entries of the last fetch."""
+        return self._metrics
+
     @property
     def title(self):
         return self._title
@@ -151,33 +215,222 @@ class SourceShell:
     def day_offset(self):
         return self._day_offset
 
-    def fetch(self) -> None:
-        """Fetch data from source."""
+    @property
+    def group(self) -> Optional["ShellGroup"]:
+        """Shells of identical sources sharing the fetches of this one."""
+        return self._group
+
+    def set_group(self, group: Optional["ShellGroup"]) -> None:
+        self._group = group
+
+    @property
+    def is_async(self) -> bool:
+        """True if the source has to be fetched in the event loop (async_fetch)."""
+        return self._is_async
+
+    def fetch(self) -> bool:
+        """Fetch data from source, return True on success.
+
+        Async sources are run in a new event loop, without the shared client
+        session. Must not be called from the event loop.
+        """
+        if self._is_async:
+            return asyncio.run(self.async_fetch())
+        if self._group is not None:
+            return self._group.fetch(self, self._fetch)
+        return self._fetch()
+
+    def _fetch(self) -> bool:
         try:
-            # fetch returns a list of Collection's
-            entries: Iterable[Collection] = self._source.fetch()
-        except Exception:
+            with self._metrics.measure(), cookie_scope():
+                # fetch returns a list of Collection's
+                entries: List[Collection] = list(self._source.fetch())  # type: ignore[arg-type]
+        except Exception as e:
             _LOGGER.error(
                 f"fetch failed for source {self._title}:\n{traceback.format_exc()}"
             )
-            return
+            self._record_failure(e)
+            return False
+        return self._update_entries(entries)
+
+    async def async_fetch(self, session: Any = None) -> bool:
+        """Fetch data from an async source, return True on success.
+
+        session is the aiohttp.ClientSession handed to sources implementing
+        set_client_session.
+        """
+        if not self._is_async:
+            raise TypeError(f"source {self._title} is not async, use fetch()")
+        set_client_session = getattr(self._source, "set_client_session", None)
+        if session is not None and callable(set_client_session):
+            set_client_session(session)
+        if self._group is not None:
+            return await self._group.async_fetch(self, self._async_fetch)
+        return await self._async_fetch()
+
+    async def _async_fetch(self) -> bool:
+        try:
+            with self._metrics.measure():
+                entries: List[Collection] = list(await self._source.fetch())  # type: ignore[misc]
+        except asyncio.CancelledError:
+            # timeout (or shutdown), unlike threads the fetch is really aborted
+            _LOGGER.error(f"fetch cancelled for source {self._title}")
+            self._record_failure(TimeoutError("fetch cancelled"))
+            raise
+        except Exception as e:
+            _LOGGER.error(
+                f"fetch failed for source {self._title}:\n{traceback.format_exc()}"
+            )
+            self._record_failure(e)
+            return False
+        return self._update_entries(entries)
+
+    def _record_failure(self, error: BaseException) -> None:
+        self._changed = False
+        self._breaker.record_failure()
+        self._metrics.record_failure(error)
+
+    def _update_entries(self, entries: List[Collection]) -> bool:
+        """Post-process the entries of a successful fetch."""
         self._refreshtime = datetime.datetime.now()
+        self._breaker.record_success()
+        self._metrics.record_success(len(entries))
 
         # strip whitespaces
         for e in entries:
             e.set_type(e.type.strip())
 
+        # skip filter, customize and all downstream updates if nothing changed
+        fingerprint = _fingerprint(entries)
+        self._changed = fingerprint != self._fingerprint
+        if not self._changed:
+            _LOGGER.debug(f"fetch for source {self._title} returned no changes")
+            self._unchanged_fetches += 1
+            return True
+        self._fingerprint = fingerprint
+        self._unchanged_fetches = 0
+        self._last_ordinal = _last_ordinal(entries)
+
+        # keep an unmodified copy for the collection cache, customize modifies the entries
+        self._raw_entries = [dict(e) for e in entries]
+
+        self._entries = self._process_entries(entries)
+        self._version += 1
+        return True
+
+    def _process_entries(self, entries: List[Collection]) -> List[Collection]:
+        """Apply filter, customize and day offset to the fetched entries."""
         # filter hidden entries
-        entries = filter(lambda x: filter_function(x, self._customize), entries)
+        result = filter(lambda x: filter_function(x, self._customize), entries)
 
         # customize fetched entries
-        entries = map(lambda x: customize_function(x, self._customize), entries)
+        result = map(lambda x: customize_function(x, self._customize), result)
 
         # apply day offset
         if self._day_offset != 0:
-            entries = map(lambda x: apply_day_offset(x, self._day_offset), entries)
+            result = map(lambda x: apply_day_offset(x, self._day_offset), result)
+
+        return list(result)
+
+    def dump(self) -> Optional[Dict[str, Any]]:
+        """Return the last fetched (unmodified) entries and the circuit breaker state in a JSON serializable form."""
+        data: Dict[str, Any] = {}
+        if (breaker := self._breaker.dump()) is not None:
+            data["breaker"] = breaker
+        if self._refreshtime is not None:
+            data["refreshtime"] = self._refreshtime.isoformat()
+            data["unchanged_fetches"] = self._unchanged_fetches
+            data["entries"] = self._raw_entries
+        return data or None
+
+    def restore(self, data: Dict[str, Any]) -> bool:
+        """Restore data previously returned by dump(), return True if entries were restored."""
+        if "breaker" in data:
+            self._breaker.restore(data["breaker"])
+        if "refreshtime" not in data:
+            return False
+        try:
+            refreshtime = datetime.datetime.fromisoformat(data["refreshtime"])
+            unchanged_fetches = int(data.get("unchanged_fetches", 0))
+            entries = _entries_from_raw(data["entries"])
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning(f"invalid cached data for source {self._title}: {e}")
+            return False
+
+        self._refreshtime = refreshtime
+        self._raw_entries = data["entries"]
+        self._fingerprint = _fingerprint(entries)
+        self._unchanged_fetches = unchanged_fetches
+        self._last_ordinal = _last_ordinal(entries)
+        self._entries = self._process_entries(entries)
+        self._version += 1
+        return True
 
-        self._entries = list(entries)
+    def seed(self, raw_entries: List[Dict[str, Any]]) -> bool:
+        """Apply entries fetched outside of the shell (in the format of dump()).
+
+        Used for the entries fetched by the config flow to validate the source
+        arguments, they count as a successful fetch.
+        """
+        return self._update_entries(_entries_from_raw(raw_entries))
+
+    def apply_shared(self, shell: "SourceShell") -> None:
+        """Apply the last entries fetched by an identical source (see ShellRegistry)."""
+        entries = _entries_from_raw(shell._raw_entries)
+        self._refreshtime = shell._refreshtime
+        self._unchanged_fetches = shell._unchanged_fetches
+        self._breaker.record_success()
+        self._metrics.record_success(len(entries))
+        self._changed = shell._fingerprint != self._fingerprint
+        if not self._changed:
+            return
+        self._fingerprint = shell._fingerprint
+        self._last_ordinal = shell._last_ordinal
+        self._raw_entries = shell._raw_entries
+        self._entries = self._process_entries(entries)
+        self._version += 1
+
+    def is_stale(self, max_age: datetime.timedelta) -> bool:
+        """Return True if the entries have never been fetched or are older than max_age."""
+        return (
+            self._refreshtime is None
+            or datetime.datetime.now() - self._refreshtime > max_age
+        )
+
+    def fetch_interval(
+        self, max_interval: int, today: Optional[datetime.date] = None
+    ) -> int:
+        """Return the number of days after which the entries should be fetched again.
+
+        Fetch daily if the entries end soon or changed recently, otherwise back off
+        up to max_interval days.
+        """
+        if self._last_ordinal is None:
+            return 1
+        horizon = self._last_ordinal - (today or datetime.date.today()).toordinal()
+        if horizon <= SHORT_HORIZON_DAYS:
+            return 1
+
+        if self._network:
+            interval = 2 ** min(self._unchanged_fetches, MAX_BACKOFF_EXPONENT)
+        else:
+            # computed locally, only the horizon matters
+            interval = max_interval
+        # leave room for a few more fetches before the entries run out
+        interval = min(interval, horizon // 4)
+        if self._min_refresh_interval is not None:
+            interval = max(interval, self._min_refresh_interval.days)
+        return max(1, min(interval, max_interval))
+
+    def fetch_due(
+        self, max_interval: int, today: Optional[datetime.date] = None
+    ) -> bool:
+        """Return True if the entries should be fetched (again) today."""
+        if self._refreshtime is None:
+            return True
+        today = today or datetime.date.today()
+        age = (today - self._refreshtime.date()).days
+        return age >= self.fetch_interval(max_interval, today)
 
     def get_dedicated_calendar_types(self) -> set[str]:
         """Return set of waste types with a dedicated calendar."""
@@ -229,7 +482,15 @@ class SourceShell:
             return None
 
         # create source
-        source: Fetchable = source_module.Source(**source_args)  # type: ignore
+        source: Fetchable | AsyncFetchable = source_module.Source(**source_args)  # type: ignore
+
+        # sources adopting the shared HTTP client get it injected, import it the
+        # same way as the sources do to get the same instance
+        set_http_client = getattr(source, "set_http_client", None)
+        if callable(set_http_client):
+            from waste_collection_schedule.service.HttpClient import get_http_client
+
+            set_http_client(get_http_client())
 
         # create source shell
         g = SourceShell(
@@ -241,10 +502,33 @@ class SourceShell:
             calendar_title=calendar_title,
             unique_id=calc_unique_source_id(source_name, source_args),
             day_offset=day_offset,
+            network=getattr(source_module, "NETWORK", True),
+            min_refresh_interval=getattr(source_module, "MIN_REFRESH_INTERVAL", None),
         )
 
         return g
 
 
+def _entries_from_raw(raw_entries: List[Dict[str, Any]]) -> List[Collection]:
+    return [
+        Collection(
+            date=datetime.date.fromisoformat(e["date"]),
+            t=e["type"],
+            icon=e.get("icon"),
+            picture=e.get("picture"),
+        )
+        for e in raw_entries
+    ]
+
+
+def _fingerprint(entries: List[Collection]) -> int:
+    """Return a hash of the fetched entries (valid within the running process)."""
+    return hash(tuple((e.ordinal, e.type, e.icon, e.picture) for e in entries))
+
+
+def _last_ordinal(entries: List[Collection]) -> Optional[int]:
+    return max((e.ordinal for e in entries), default=None)
+
+
 def calc_unique_source_id(source_name: str, source_args) -> str:
     return source_name + str(sorted(source_args.items()))
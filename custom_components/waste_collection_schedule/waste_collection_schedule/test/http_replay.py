@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Record and replay the HTTP traffic of source test cases.
+
+While recording, every request sent by requests (directly or via the shared
+HttpClient) is stored together with its response and the time the test case
+was run. Replaying serves the stored responses instead of sending requests
+and freezes "now" to the recorded time, so that the parsing code of a source
+can be tested without network and gives the same result on every run.
+
+Limitations: only traffic through requests is captured, time.time() is not
+frozen and date/datetime classes imported by a module before
+install_frozen_clock() was called keep returning the real time.
+"""
+
+import base64
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# response headers which don't apply to the stored (decoded) body
+DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# the cassette recording or replaying and the traffic counted in the current thread
+_local = threading.local()
+_original_send = None
+_install_lock = threading.Lock()
+
+_RealDate = datetime.date
+_RealDatetime = datetime.datetime
+
+
+def _digest(body: Any) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode()
+    elif not isinstance(body, bytes):
+        # streamed (file like or generator) bodies can't be compared
+        return None
+    return hashlib.sha1(body).hexdigest()
+
+
+def _path(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+def _send(self, request, **kwargs):
+    cassette: Optional[Cassette] = getattr(_local, "cassette", None)
+    if cassette is not None and cassette.replaying:
+        response = cassette.play(self, request)
+    else:
+        response = _original_send(self, request, **kwargs)  # type: ignore[misc]
+        if cassette is not None:
+            cassette.append(request, response)
+    traffic: Optional[Traffic] = getattr(_local, "traffic", None)
+    if traffic is not None:
+        traffic.record(response, kwargs.get("stream", False))
+    return response
+
+
+def install_http_hook() -> None:
+    """Route all requests sent by requests' HTTPAdapter through the cassette.
+
+    The hook sits below requests.Session.send, so redirects are recorded (and
+    counted) as separate requests.
+    """
+    global _original_send
+    with _install_lock:
+        if _original_send is None:
+            _original_send = HTTPAdapter.send
+            HTTPAdapter.send = _send  # type: ignore[method-assign]
+
+
+class Traffic:
+    """Requests and received bytes of a test case, counted by the HTTP hook."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+    def record(self, response: requests.Response, stream: bool) -> None:
+        self.requests += 1
+        if stream:
+            self.bytes += int(response.headers.get("Content-Length") or 0)
+        else:
+            self.bytes += len(response.content or b"")
+
+
+@contextmanager
+def count_traffic() -> Iterator[Traffic]:
+    """Count the requests sent in the block, live, recorded or replayed."""
+    install_http_hook()
+    traffic = Traffic()
+    previous = getattr(_local, "traffic", None)
+    _local.traffic = traffic
+    try:
+        yield traffic
+    finally:
+        _local.traffic = previous
+
+
+class FrozenDate(_RealDate):
+    @classmethod
+    def today(cls):
+        now = getattr(_local, "now", None)
+        if now is None:
+            return super().today()
+        return cls(now.year, now.month, now.day)
+
+
+class FrozenDatetime(_RealDatetime):
+    @classmethod
+    def now(cls, tz=None):
+        now = getattr(_local, "now", None)
+        if now is None:
+            return super().now(tz)
+        if tz is None:
+            # wall time of the recording, independent of the local time zone
+            return cls.combine(now.date(), now.time())
+        return cls.combine(now.date(), now.timetz()).astimezone(tz)
+
+    @classmethod
+    def today(cls):
+        return cls.now()
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def install_frozen_clock() -> None:
+    """Replace datetime.date and datetime.datetime by freezable subclasses.
+
+    Must be called before the sources are imported, because most of them
+    import the classes by name. The clock only stands still inside
+    Cassette.replay().
+    """
+    datetime.date = FrozenDate  # type: ignore[misc]
+    datetime.datetime = FrozenDatetime  # type: ignore[misc]
+
+
+class Cassette:
+    """Requests and responses of one test case."""
+
+    def __init__(
+        self,
+        now: Optional[_RealDatetime] = None,
+        interactions: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.now = now
+        self.interactions = interactions or []
+        self.replaying = False
+        self._used: set[int] = set()
+
+    @contextmanager
+    def record(self) -> Iterator["Cassette"]:
+        install_http_hook()
+        self.now = _RealDatetime.now().astimezone()
+        self.interactions = []
+        previous = getattr(_local, "cassette", None)
+        _local.cassette = self
+        try:
+            yield self
+        finally:
+            _local.cassette = previous
+
+    @contextmanager
+    def replay(self) -> Iterator["Cassette"]:
+        install_http_hook()
+        self.replaying = True
+        self._used = set()
+        previous = getattr(_local, "cassette", None), getattr(_local, "now", None)
+        _local.cassette = self
+        _local.now = self.now
+        try:
+            yield self
+        finally:
+            _local.cassette, _local.now = previous
+            self.replaying = False
+
+    def append(self, request: requests.PreparedRequest, response) -> None:
+        content = response.content or b""
+        try:
+            body: Dict[str, str] = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(content).decode("ascii")}
+        self.interactions.append(
+            {
+                "method": request.method,
+                "url": request.url,
+                "body": _digest(request.body),
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": [
+                    [name, value]
+                    for name, value in response.raw.headers.items()
+                    if name.lower() not in DROP_HEADERS
+                ],
+                **body,
+            }
+        )
+
+    def find(self, request: requests.PreparedRequest) -> Optional[int]:
+        """Return the index of the recorded interaction matching a request.
+
+        Prefers an unused interaction with identical method, url and body.
+        Falls back to the next unused one with the same method and path,
+        because some sources add timestamps or random tokens to the query.
+        """
+        digest = _digest(request.body)
+        fallback = None
+        for index, i in enumerate(self.interactions):
+            if index in self._used or i["method"] != request.method:
+                continue
+            if i["url"] == request.url and i["body"] == digest:
+                return index
+            if fallback is None and _path(i["url"]) == _path(request.url or ""):
+                fallback = index
+        return fallback
+
+    def play(self, adapter: HTTPAdapter, request: requests.PreparedRequest):
+        index = self.find(request)
+        if index is None:
+            raise requests.ConnectionError(
+                f"no recorded response for {request.method} {request.url}",
+                request=request,
+            )
+        self._used.add(index)
+        i = self.interactions[index]
+        if "base64" in i:
+            content = base64.b64decode(i["base64"])
+        else:
+            content = i["text"].encode("utf-8")
+        raw = urllib3.HTTPResponse(
+            body=io.BytesIO(content),
+            headers=urllib3.HTTPHeaderDict(i["headers"]),
+            status=i["status"],
+            reason=i["reason"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return adapter.build_response(request, raw)
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "now": self.now.isoformat() if self.now is not None else None,
+            "interactions": self.interactions,
+        }
+
+    @staticmethod
+    def restore(data: Dict[str, Any]) -> "Cassette":
+        now = data.get("now")
+        return Cassette(
+            now=_RealDatetime.fromisoformat(now) if now else None,
+            interactions=data.get("interactions", []),
+        )
+
+
+class FixtureStore:
+    """Cassettes stored as gzipped JSON files, one per test case."""
+
+    def __init__(self, directory: str | Path):
+        self._directory = Path(directory)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def path(self, source: str, name: str) -> Path:
+        # keep file names readable, the hash keeps them unique
+        slug = re.sub(r"\W+", "_", name).strip("_")[:40]
+        digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+        return self._directory / source / f"{slug}_{digest}.json.gz"
+
+    def load(self, source: str, name: str) -> Optional[Cassette]:
+        try:
+            with gzip.open(self.path(source, name), "rt", encoding="utf-8") as f:
+                return Cassette.restore(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, source: str, name: str, cassette: Cassette) -> None:
+        path = self.path(source, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(cassette.dump(), f, ensure_ascii=False)
@@ -1,17 +1,34 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
 import datetime
 import importlib
+import inspect
+import json
 import re
+import signal
 import site
+import threading
+import time
 import traceback
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import yaml
 
 SECRET_FILENAME = Path(__file__).resolve().parent / "secrets.yaml"
 SECRET_REGEX = re.compile(r"!secret\s(\w+)")
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
 
 
 def main():
@@ -45,6 +62,48 @@ def main():
     parser.add_argument(
         "-y", "--yaml", action="append", help="Test given .yaml file for ICS source"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of test cases run in parallel worker processes",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=1,
+        help="Maximum number of test cases run in parallel against the same host",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Abort a test case after this number of seconds",
+    )
+    parser.add_argument("--report", help="Write a JSON report to the given file")
+    parser.add_argument("--junit", help="Write a JUnit XML report to the given file")
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Print the K slowest test cases",
+    )
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument(
+        "--record",
+        nargs="?",
+        const=str(FIXTURE_DIR),
+        metavar="DIR",
+        help="Record the HTTP requests and responses of every test case",
+    )
+    replay_group.add_argument(
+        "--replay",
+        nargs="?",
+        const=str(FIXTURE_DIR),
+        metavar="DIR",
+        help="Serve recorded responses instead of sending requests and freeze the current time to the time of the recording",
+    )
     args = parser.parse_args()
 
     # read secrets.yaml
@@ -60,10 +119,41 @@ def main():
         pass
 
     package_dir = Path(__file__).resolve().parents[2]
-    source_dir = package_dir / "waste_collection_schedule" / "source"
 
     # add module directory to path
-    site.addsitedir(str(package_dir))
+    init_worker(str(package_dir), args.replay is not None)
+
+    cases = collect_cases(args, secrets, package_dir)
+
+    started = time.monotonic()
+    results = []
+    if args.jobs > 1:
+        for result in run_parallel(cases, args, package_dir):
+            print_result(result, prefix=f"{result['source']}: ")
+            results.append(result)
+    else:
+        current = None
+        for case in cases:
+            if case["title"] != current:
+                current = case["title"]
+                print(current)
+            result = run_case(case, args)
+            print_result(result)
+            results.append(result)
+    duration = time.monotonic() - started
+
+    if args.slowest > 0:
+        print_slowest(results, args.slowest)
+    if args.report:
+        write_report(args.report, results, duration, args)
+    if args.junit:
+        write_junit(args.junit, results, duration)
+
+
+def collect_cases(args, secrets, package_dir):
+    """Return all test cases to run in the order of the serial output."""
+    source_dir = package_dir / "waste_collection_schedule" / "source"
+    cases = []
 
     # find all source files for testing
     if args.source is not None:
@@ -81,7 +171,6 @@ def main():
 
     for f in sorted(source_files):
         # iterate through all *.py files in waste_collection_schedule/source
-        print(f"Testing source {f} ...")
         module = importlib.import_module(f"waste_collection_schedule.source.{f}")
 
         # get all names within module
@@ -98,7 +187,16 @@ def main():
             # replace secrets in arguments
             replace_secret(secrets, tc)
 
-            test_fetch(module, name, tc, args)
+            cases.append(
+                {
+                    "title": f"Testing source {f} ...",
+                    "source": f,
+                    "module": f,
+                    "name": name,
+                    "args": tc,
+                    "host": get_host(tc, module.URL, f),
+                }
+            )
 
     # find all ICS yaml files for testing
     ics_yaml_dir = Path(__file__).resolve().parents[4] / "doc" / "ics" / "yaml"
@@ -116,63 +214,295 @@ def main():
         yaml_files = []
 
     # run through all .yaml files for ICS source
-    module = importlib.import_module("waste_collection_schedule.source.ics")
     for f in sorted(yaml_files):
-        print(f"Testing ICS {f.stem}")
         with open(f) as stream:
             # read yaml file
             data = yaml.safe_load(stream)
 
             # run through all test-cases
             for name, tc in data["test_cases"].items():
-                test_fetch(module, name, tc, args)
+                cases.append(
+                    {
+                        "title": f"Testing ICS {f.stem}",
+                        "source": f"ics/{f.stem}",
+                        "module": "ics",
+                        "name": name,
+                        "args": tc,
+                        "host": get_host(tc, data.get("url"), f.stem),
+                    }
+                )
+
+    return cases
+
+
+def get_host(tc, url, default):
+    """Return the host a test case is most likely fetching from.
+
+    Used to limit the number of parallel requests to a single server. The
+    url argument of a test case wins over the URL of the source, which is
+    often just the homepage of the service provider.
+    """
+    for value in (tc.get("url"), url):
+        if isinstance(value, str):
+            host = urlsplit(value).hostname
+            if host:
+                return host.removeprefix("www.")
+    return default
+
+
+def init_worker(package_dir, replay):
+    site.addsitedir(package_dir)
+    if replay:
+        from waste_collection_schedule.test.http_replay import install_frozen_clock
+
+        # before importing the sources, which import date and datetime by name
+        install_frozen_clock()
+
+
+def run_parallel(cases, args, package_dir):
+    """Run test cases in worker processes, yield results as they finish.
+
+    At most args.per_host test cases of the same host are running at the same
+    time, the remaining ones are deferred until a slot is free.
+    """
+    pending = deque(cases)
+    running = {}
+    hosts = Counter()
+    with ProcessPoolExecutor(
+        max_workers=args.jobs,
+        initializer=init_worker,
+        initargs=(str(package_dir), args.replay is not None),
+    ) as executor:
+        while pending or running:
+            for _ in range(len(pending)):
+                if len(running) >= args.jobs:
+                    break
+                case = pending.popleft()
+                if hosts[case["host"]] >= args.per_host:
+                    pending.append(case)
+                    continue
+                hosts[case["host"]] += 1
+                running[executor.submit(run_case, case, args)] = case
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                case = running.pop(future)
+                hosts[case["host"]] -= 1
+                try:
+                    yield future.result()
+                except Exception as exc:
+                    # worker died, e.g. killed by the OOM killer
+                    result = new_result(case)
+                    result["status"] = STATUS_ERROR
+                    result["error"] = f"{type(exc).__name__}: {exc}"
+                    result["output"].append(
+                        f"  {case['name']} {bcolors.FAIL}failed{bcolors.ENDC}: {exc}"
+                    )
+                    yield result
 
 
-def test_fetch(module, name, tc, args):
-    # create source
+@contextmanager
+def timeout(seconds):
+    """Raise TimeoutError if the block takes longer than the given seconds.
+
+    Uses SIGALRM, therefore only effective in the main thread on platforms
+    supporting it. Test cases run in the main thread of the worker processes.
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def handler(signum, frame):
+        raise TimeoutError(f"test case did not finish within {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
     try:
-        source = module.Source(**tc)
-        result = source.fetch()
-        if args.double:
-            result2 = source.fetch()
-            if result != result2:
-                print(
-                    f"{bcolors.FAIL}  ERROR: source.fetch() does not return the same result on second call"
-                )
-                for collection in result:
-                    try:
-                        idx = result2.index(collection)
-                        result2.pop(idx)
-                    except ValueError:
-                        print(f"  {collection} not in second result")
-                for collection in result2:
-                    print(f"  {collection} not in first result")
-                print(bcolors.ENDC, end="")
-
-        count = len(result)
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def new_result(case):
+    return {
+        "source": case["source"],
+        "name": case["name"],
+        "host": case["host"],
+        "status": None,
+        "duration": None,
+        "requests": 0,
+        "bytes": 0,
+        "entries": None,
+        "error": None,
+        "output": [],
+    }
+
+
+def run_case(case, args):
+    """Run a test case and return its result including the lines to print."""
+    from waste_collection_schedule.fetch_metrics import FetchMetrics
+    from waste_collection_schedule.test.http_replay import (
+        Cassette,
+        FixtureStore,
+        count_traffic,
+    )
+
+    name = case["name"]
+    result = new_result(case)
+    output = result["output"]
+    metrics = FetchMetrics()
+    traffic = None
+    try:
+        module = importlib.import_module(
+            f"waste_collection_schedule.source.{case['module']}"
+        )
+        cassette = None
+        if args.record:
+            cassette = Cassette()
+            http = cassette.record()
+        elif args.replay:
+            cassette = FixtureStore(args.replay).load(case["source"], name)
+            if cassette is None:
+                raise FileNotFoundError(f"no recording found in {args.replay}")
+            http = cassette.replay()
+        else:
+            http = nullcontext()
+        with timeout(args.timeout), http, count_traffic() as traffic, metrics.measure():
+            # create source
+            source = module.Source(**case["args"])
+            entries = fetch(source)
+            if args.double:
+                entries2 = fetch(source)
+        if args.record:
+            FixtureStore(args.record).save(case["source"], name, cassette)
+        if args.double and entries != entries2:
+            output.append(
+                f"{bcolors.FAIL}  ERROR: source.fetch() does not return the same result on second call"
+            )
+            for collection in entries:
+                try:
+                    idx = entries2.index(collection)
+                    entries2.pop(idx)
+                except ValueError:
+                    output.append(f"  {collection} not in second result")
+            for collection in entries2:
+                output.append(f"  {collection} not in first result")
+            output[-1] += bcolors.ENDC
+
+        count = len(entries)
+        result["entries"] = count
         if count > 0:
-            print(f"  found {bcolors.OKGREEN}{count}{bcolors.ENDC} entries for {name}")
+            result["status"] = STATUS_OK
+            output.append(
+                f"  found {bcolors.OKGREEN}{count}{bcolors.ENDC} entries for {name}"
+            )
         else:
-            print(f"  found {bcolors.WARNING}0{bcolors.ENDC} entries for {name}")
+            result["status"] = STATUS_EMPTY
+            output.append(
+                f"  found {bcolors.WARNING}0{bcolors.ENDC} entries for {name}"
+            )
 
         # test if source is returning the correct date format
-        if len(list(filter(lambda x: type(x.date) is not datetime.date, result))) > 0:
-            print(
+        if len(list(filter(lambda x: type(x.date) is not datetime.date, entries))) > 0:
+            result["status"] = STATUS_INVALID
+            result["error"] = "invalid date format"
+            output.append(
                 f"{bcolors.FAIL}  ERROR: source returns invalid date format (datetime.datetime instead of datetime.date?){bcolors.ENDC}"
             )
 
         if args.list:
-            result = sorted(result, key=lambda x: x.date) if args.sorted else result
-            for x in result:
+            entries = sorted(entries, key=lambda x: x.date) if args.sorted else entries
+            for x in entries:
                 icon_str = f" [{x.icon}]" if args.icon else ""
                 weekday_str = x.date.strftime("%a ") if args.weekday else ""
-                print(f"    {x.date.isoformat()} {weekday_str}: {x.type}{icon_str}")
+                output.append(
+                    f"    {x.date.isoformat()} {weekday_str}: {x.type}{icon_str}"
+                )
     except KeyboardInterrupt:
         exit()
     except Exception as exc:
-        print(f"  {name} {bcolors.FAIL}failed{bcolors.ENDC}: {exc}")
+        result["status"] = STATUS_ERROR
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        output.append(f"  {name} {bcolors.FAIL}failed{bcolors.ENDC}: {exc}")
         if args.traceback:
-            print(indent(traceback.format_exc(), 4))
+            output.append(indent(traceback.format_exc(), 4))
+
+    result["duration"] = metrics.duration
+    if traffic is not None:
+        result["requests"] = traffic.requests
+        result["bytes"] = traffic.bytes
+    return result
+
+
+def fetch(source):
+    if inspect.iscoroutinefunction(source.fetch):
+        # async source, without the session shared by Home Assistant
+        return asyncio.run(source.fetch())
+    return source.fetch()
+
+
+def print_result(result, prefix=""):
+    for line in result["output"]:
+        print(f"{prefix}{line}")
+
+
+def print_slowest(results, count):
+    timed = [r for r in results if r["duration"] is not None]
+    print(f"\nSlowest {min(count, len(timed))} test cases:")
+    for r in sorted(timed, key=lambda r: r["duration"], reverse=True)[:count]:
+        entries = "-" if r["entries"] is None else r["entries"]
+        print(
+            f"  {r['duration']:8.2f} s {r['requests']:4} requests {entries:>5} entries  {r['source']}: {r['name']} [{r['status']}]"
+        )
+
+
+def write_report(filename, results, duration, args):
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "duration": duration,
+        "jobs": args.jobs,
+        "summary": dict(Counter(r["status"] for r in results)),
+        "cases": [{k: v for k, v in r.items() if k != "output"} for r in results],
+    }
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit(filename, results, duration):
+    suite = ET.Element(
+        "testsuite",
+        name="test_sources",
+        tests=str(len(results)),
+        failures=str(
+            sum(r["status"] in (STATUS_EMPTY, STATUS_INVALID) for r in results)
+        ),
+        errors=str(sum(r["status"] == STATUS_ERROR for r in results)),
+        time=f"{duration:.3f}",
+    )
+    for r in results:
+        testcase = ET.SubElement(
+            suite,
+            "testcase",
+            classname=r["source"],
+            name=str(r["name"]),
+            time=f"{r['duration'] or 0:.3f}",
+        )
+        if r["status"] == STATUS_ERROR:
+            ET.SubElement(testcase, "error", message=r["error"])
+        elif r["status"] == STATUS_EMPTY:
+            ET.SubElement(testcase, "failure", message="no entries found")
+        elif r["status"] == STATUS_INVALID:
+            ET.SubElement(testcase, "failure", message=r["error"])
+        properties = ET.SubElement(testcase, "properties")
+        for key in ("requests", "bytes", "entries"):
+            ET.SubElement(properties, "property", name=key, value=str(r[key]))
+    ET.indent(suite)
+    ET.ElementTree(suite).write(filename, encoding="utf-8", xml_declaration=True)
 
 
 def replace_secret(secrets, d):
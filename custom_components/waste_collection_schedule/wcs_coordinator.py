@@ -1,25 +1,38 @@
 import datetime
 import logging
-from random import randrange
 from typing import Any
 
 import homeassistant.util.dt as dt_util
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
-from homeassistant.helpers.dispatcher import dispatcher_send
-from homeassistant.helpers.event import (
-    async_call_later,
-    async_track_time_change,
-)
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, dispatcher_send
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from . import const
+from .fetch_queue import get_fetch_queue
+from .scheduler import initialize_daily_scheduler
+from .validation_cache import get_validation_cache
 from .waste_collection_schedule import CollectionAggregator, SourceShell
+from .waste_collection_schedule.service.CollectionCacheStore import (
+    get_collection_cache_store,
+)
 from .waste_collection_schedule.service.DeviceKeyStore import get_device_key_store
+from .waste_collection_schedule.shell_registry import get_shell_registry
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _get_resolved_id_store():
+    # sources use the top-level package, import the store the same way to share the instance
+    from waste_collection_schedule.service.ResolvedIdStore import (  # type: ignore # isort:skip
+        get_resolved_id_store,
+    )
+
+    return get_resolved_id_store()
+
+
 class WCSCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Class to manage fetching data from waste collection service provider."""
 
@@ -36,6 +49,8 @@ class WCSCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         fetch_time: str | datetime.time,
         random_fetch_time_offset: int,
         day_switch_time: str | datetime.time,
+        cache_max_age: int = const.CONF_CACHE_MAX_AGE_DEFAULT,
+        max_fetch_interval: int = const.CONF_MAX_FETCH_INTERVAL_DEFAULT,
     ):
         self._hass = hass
         self._shell = source_shell
@@ -59,48 +74,115 @@ class WCSCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if not day_switch_time_new:
             raise ValueError(f"Invalid day_switch_time: {day_switch_time}")
         self._day_switch_time = day_switch_time_new
+        self._cache_max_age = datetime.timedelta(hours=cache_max_age)
+        self._max_fetch_interval = max_fetch_interval
+        self._retry_cancel: CALLBACK_TYPE | None = None
+        self._fetch_cancel: CALLBACK_TYPE | None = None
 
         super().__init__(hass, _LOGGER, name=const.DOMAIN)
 
-        # start timer to fetch date once per day
-        self._fetch_tracker = async_track_time_change(
-            hass,
-            self._fetch_callback,
-            self._fetch_time.hour,
-            self._fetch_time.minute,
-            self._fetch_time.second,
-        )
+        # share the fetches with identical sources of other entries (and YAML)
+        get_shell_registry().acquire(source_shell)
 
-        # start timer for day-switch time
-        if self._day_switch_time != self._fetch_time:
-            async_track_time_change(  # TODO: cancel on unload
-                hass,
-                self._update_sensors_callback,
-                self._day_switch_time.hour,
-                self._day_switch_time.minute,
-                self._day_switch_time.second,
-            )
+        # daily ticks of the shared scheduler, unsubscribed in async_unload
+        scheduler = initialize_daily_scheduler(hass)
+        self._unsubscribe = [
+            # check once per day if a fetch is due
+            scheduler.async_track_time(self._fetch_time, self._fetch_callback),
+            # day-switch time (fetches don't update the sensors if skipped or
+            # without changes)
+            scheduler.async_track_time(
+                self._day_switch_time, self._update_sensors_callback
+            ),
+            # entries changed, fetched by this or an identical source
+            async_dispatcher_connect(
+                hass, self.update_signal, self._update_sensors_callback
+            ),
+        ]
 
-        # add a timer at midnight (if not already there) to update days-to
+        # midnight (if not already there) to update days-to
         midnight = datetime.time.min
-        if midnight != self._fetch_time and midnight != self._day_switch_time:
-            async_track_time_change(  # TODO: cancel on unload
-                hass,
-                self._update_sensors_callback,
-                midnight.hour,
-                midnight.minute,
-                midnight.second,
+        if midnight != self._day_switch_time:
+            self._unsubscribe.append(
+                scheduler.async_track_time(midnight, self._update_sensors_callback)
             )
 
+    @callback
+    def async_unload(self) -> None:
+        """Cancel all timers, called when the config entry is unloaded."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        get_shell_registry().release(self.shell)
+        self._cancel_retry()
+        self._cancel_fetch()
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Update data via library."""
-        await self._fetch_now()
+        restored = self._restore_cache()
+        if not self.shell.breaker.allow_fetch():
+            # failed repeatedly before the restart, wait for the next probe
+            self._schedule_retry()
+        elif restored:
+            if self.shell.is_stale(self._cache_max_age):
+                # show cached entries immediately and refresh them in the background
+                self._hass.async_create_task(self._fetch_now())
+        else:
+            await self._fetch_now()
         return {}
 
+    @callback
+    def _restore_cache(self) -> bool:
+        """Restore the entries of the last fetch from the collection cache."""
+        if self.shell.refreshtime is not None:
+            # already fetched by an identical source of another entry
+            return True
+        validated = get_validation_cache().pop(self.shell.unique_id)
+        if validated is not None:
+            # fetched seconds ago by the config flow, don't fetch again
+            _LOGGER.debug("Using entries validated for %s", self.shell.title)
+            self.shell.seed(validated)
+            self._save_cache()
+            return True
+        store = get_collection_cache_store()
+        if store is None:
+            return False
+        data = store.get(self.shell.unique_id)
+        if data is None:
+            return False
+        _LOGGER.debug("Restoring cached entries for %s", self.shell.title)
+        return self.shell.restore(data)
+
+    @callback
+    def _save_cache(self) -> None:
+        """Save fetched entries and the circuit breaker state to the collection cache."""
+        cache_store = get_collection_cache_store()
+        if cache_store and (data := self.shell.dump()):
+            cache_store.set(self.shell.unique_id, data)
+            cache_store.async_schedule_save()
+
+    @property
+    def aggregator(self) -> CollectionAggregator:
+        return self._aggregator
+
     @property
     def shell(self):
         return self._shell
 
+    @property
+    def update_signal(self) -> str:
+        """Dispatcher signal sent if the entries of the source changed.
+
+        Same signal as WasteCollectionApi.update_signal, so that all consumers
+        of identical sources are updated.
+        """
+        return f"{const.UPDATE_SOURCE_SIGNAL}_{self.shell.unique_id}"
+
+    @property
+    def metrics_signal(self) -> str:
+        """Dispatcher signal sent after every fetch, used by the diagnostic sensors."""
+        return f"{const.UPDATE_METRICS_SIGNAL}_{self.shell.unique_id}"
+
     @property
     def separator(self):
         return self._separator
@@ -121,23 +203,88 @@ class WCSCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
     @callback
     async def _fetch_callback(self, *_):
-        async_call_later(
+        if not self.shell.breaker.allow_fetch():
+            _LOGGER.debug("Skipping fetch for %s, circuit is open", self.shell.title)
+            return
+        if not self.shell.fetch_due(self._max_fetch_interval):
+            _LOGGER.debug("Skipping fetch for %s, entries are recent", self.shell.title)
+            return
+        # spread the fetches of the same provider across the random offset window
+        self._cancel_fetch()
+        self._fetch_cancel = async_call_later(
             self._hass,
-            randrange(0, 60 * self._random_fetch_time_offset),
-            self._fetch_now,
+            get_fetch_queue().spread_delay(
+                self.shell, 60 * self._random_fetch_time_offset
+            ),
+            self._fetch_later_callback,
         )
 
+    @callback
+    def _cancel_fetch(self) -> None:
+        if self._fetch_cancel is not None:
+            self._fetch_cancel()
+            self._fetch_cancel = None
+
+    async def _fetch_later_callback(self, *_):
+        self._fetch_cancel = None
+        await self._fetch_now()
+
     @callback
     async def _update_sensors_callback(self, *_):
-        dispatcher_send(self._hass, const.UPDATE_SENSORS_SIGNAL)
+        # only the entities of this entry
+        self.async_update_listeners()
+
+    @callback
+    def _schedule_retry(self) -> None:
+        """Schedule the next retry (or probe while the circuit is open) after a failed fetch."""
+        next_attempt = self.shell.breaker.next_attempt
+        if next_attempt is None:
+            return
+        self._cancel_retry()
+        delay = max(0.0, (next_attempt - datetime.datetime.now()).total_seconds())
+        _LOGGER.debug("Retrying fetch for %s in %.0f s", self.shell.title, delay)
+        self._retry_cancel = async_call_later(self._hass, delay, self._retry_callback)
+
+    @callback
+    def _cancel_retry(self) -> None:
+        if self._retry_cancel is not None:
+            self._retry_cancel()
+            self._retry_cancel = None
+
+    async def _retry_callback(self, *_):
+        self._retry_cancel = None
+        await self._fetch_now()
+
+    async def _fetch_shell(self) -> bool:
+        if self.shell.is_async:
+            # awaited in the event loop, doesn't block an executor thread
+            return await self.shell.async_fetch(async_get_clientsession(self._hass))
+        return await self._hass.async_add_executor_job(self.shell.fetch)
 
     async def _fetch_now(self, *_):
         if self.shell:
-            await self._hass.async_add_executor_job(self.shell.fetch)
-            
+            breaker_state = self.shell.breaker.state
+            # limited by the rate and concurrency limits of the provider
+            success = await get_fetch_queue().async_run(self.shell, self._fetch_shell)
+            if success:
+                self._cancel_retry()
+            else:
+                self._schedule_retry()
+
+            self._save_cache()
+
+            dispatcher_send(self._hass, self.metrics_signal)
+
             # Save device keys to storage after fetch
             device_store = get_device_key_store()
             if device_store:
                 await device_store.async_save()
 
-        await self._update_sensors_callback()
+            await _get_resolved_id_store().async_save()
+
+            if not self.shell.changed and self.shell.breaker.state == breaker_state:
+                # same entries as before, nothing to update
+                return
+
+            # updates this and all other entries of the same source
+            dispatcher_send(self._hass, self.update_signal)
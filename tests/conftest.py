@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# status, headers and body of a response of the local test server
+Response = tuple[int, dict[str, str], bytes]
+Respond = Callable[[BaseHTTPRequestHandler, bytes], Response]
+
+
+class StubSource:
+    """Source returning fixed entries (or the result of a callable).
+
+    Set fail to raise like an unreachable provider, clear proceed to block
+    fetch() until it is set again.
+    """
+
+    def __init__(self, entries: Any = (), delay: float = 0):
+        self.entries = entries
+        self.delay = delay
+        self.fail = False
+        self.fetches = 0
+        self.started = threading.Event()
+        self.started_at: float | None = None
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def fetch(self):
+        self.fetches += 1
+        self.started_at = time.monotonic()
+        self.started.set()
+        self.proceed.wait(5)
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("503")
+        return list(self.entries() if callable(self.entries) else self.entries)
+
+
+@pytest.fixture
+def make_source() -> type[StubSource]:
+    return StubSource
+
+
+@pytest.fixture
+def make_shell(request) -> Callable[..., Any]:
+    """Factory of source shells, arguments default to a plain test source.
+
+    Library tests import waste_collection_schedule from the integration
+    directory, Home Assistant tests through custom_components. The shell is
+    created with the SourceShell of the test module, if it imports one.
+    """
+    shell_class = getattr(request.module, "SourceShell", None)
+    if shell_class is None:
+        from custom_components.waste_collection_schedule.waste_collection_schedule import (
+            SourceShell as shell_class,
+        )
+
+    def make_shell(source=None, unique_id: str = "test", **kwargs):
+        kwargs = {
+            "customize": {},
+            "title": unique_id,
+            "description": "",
+            "url": None,
+            "calendar_title": None,
+            "day_offset": 0,
+            **kwargs,
+        }
+        return shell_class(
+            source=StubSource() if source is None else source,
+            unique_id=unique_id,
+            **kwargs,
+        )
+
+    return make_shell
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "LocalServer"
+
+    def _respond(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, headers, body = self.server.respond(self, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class LocalServer(ThreadingHTTPServer):
+    """HTTP server on localhost answering requests with respond()."""
+
+    def __init__(self, respond: Respond):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.respond = respond
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+@pytest.fixture
+def serve() -> Iterator[Callable[[Respond], LocalServer]]:
+    """Factory of local HTTP servers, stopped after the test."""
+    servers: list[LocalServer] = []
+
+    def serve(respond: Respond) -> LocalServer:
+        servers.append(LocalServer(respond))
+        return servers[-1]
+
+    yield serve
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def server_url(serve) -> str:
+    """URL of a local HTTP server answering every request with 100 bytes."""
+    return serve(lambda request, body: (200, {}, b"x" * 100)).url + "/"
@@ -0,0 +1,61 @@
+import os
+import sys
+from datetime import date
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    CollectionGroup,
+)
+
+
+def test_collection_behaves_like_dict():
+    c = Collection(date(2024, 1, 2), "Bio", "mdi:leaf")
+
+    assert c["date"] == "2024-01-02"
+    assert c["type"] == "Bio"
+    assert c["icon"] == "mdi:leaf"
+    assert c["picture"] is None
+    assert dict(c) == {
+        "date": "2024-01-02",
+        "icon": "mdi:leaf",
+        "picture": None,
+        "type": "Bio",
+    }
+    assert c == dict(c)
+    assert c == Collection(date(2024, 1, 2), "Bio", icon="mdi:leaf")
+    assert c != Collection(date(2024, 1, 3), "Bio", icon="mdi:leaf")
+
+
+def test_collection_setters():
+    c = Collection(date(2024, 1, 2), "Bio")
+    c.set_date(date(2024, 2, 1))
+    c.set_type("Paper")
+    c.set_icon("mdi:package-variant")
+
+    assert c.date == date(2024, 2, 1)
+    assert c.as_dict() == {
+        "date": "2024-02-01",
+        "icon": "mdi:package-variant",
+        "picture": None,
+        "type": "Paper",
+    }
+
+
+def test_collection_group():
+    group = CollectionGroup.create(
+        [Collection(date(2024, 1, 2), "Bio"), Collection(date(2024, 1, 2), "Paper")]
+    )
+
+    assert group.date == date(2024, 1, 2)
+    assert group["types"] == ["Bio", "Paper"]
+    assert group.as_dict() == {
+        "date": "2024-01-02",
+        "icon": "mdi:numeric-2-box-multiple",
+        "picture": None,
+        "types": ["Bio", "Paper"],
+    }
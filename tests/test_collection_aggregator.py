@@ -0,0 +1,182 @@
+import os
+import sys
+from datetime import date, timedelta
+from functools import partial
+
+import pytest
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    CollectionAggregator,
+    SourceShell,
+)
+
+TYPES = ["Bio", "Paper", "Rest", "Glass"]
+
+
+def _collections(offset: int) -> list[Collection]:
+    today = date.today()
+    return [
+        Collection(today + timedelta(days=d), TYPES[(d + offset) % 4])
+        # unsorted, including past entries and days with several collections
+        for d in list(range(400, -30, -3)) + list(range(-10, 100, 7))
+    ]
+
+
+@pytest.fixture
+def fetched_shell(make_shell, make_source):
+    def fetched_shell(offset: int) -> SourceShell:
+        shell = make_shell(
+            make_source(partial(_collections, offset)), unique_id=f"test{offset}"
+        )
+        assert shell.fetch()
+        return shell
+
+    return fetched_shell
+
+
+def _reference(
+    entries, count, leadtime, include_types, exclude_types, include_today, start_index
+):
+    """The filter as implemented by scanning and sorting all entries."""
+    now = date.today()
+    if include_types is not None:
+        entries = [e for e in entries if e.type in set(include_types)]
+    if exclude_types is not None:
+        entries = [e for e in entries if e.type not in set(exclude_types)]
+    if include_today:
+        entries = [e for e in entries if e.date >= now]
+    else:
+        entries = [e for e in entries if e.date > now]
+    if leadtime is not None:
+        entries = [e for e in entries if e.date <= now + timedelta(days=leadtime)]
+    entries.sort(key=lambda e: e.date)
+    if start_index is not None:
+        entries = entries[start_index:]
+    if count is not None:
+        entries = entries[:count]
+    return entries
+
+
+@pytest.mark.parametrize("count", [None, 1, 5])
+@pytest.mark.parametrize("leadtime", [None, 0, 30])
+@pytest.mark.parametrize(
+    "include_types,exclude_types",
+    [
+        (None, None),
+        (["Bio", "Rest", "Unknown"], None),
+        (None, ["Paper"]),
+        (["Bio", "Paper"], ["Paper"]),
+    ],
+)
+@pytest.mark.parametrize("include_today", [False, True])
+@pytest.mark.parametrize("start_index", [None, 2])
+def test_get_upcoming_matches_full_scan(
+    count,
+    leadtime,
+    include_types,
+    exclude_types,
+    include_today,
+    start_index,
+    fetched_shell,
+):
+    shells = [fetched_shell(0), fetched_shell(1)]
+    aggregator = CollectionAggregator(shells)
+    all_entries = [e for s in shells for e in s._entries]
+
+    assert aggregator.get_upcoming(
+        count=count,
+        leadtime=leadtime,
+        include_types=include_types,
+        exclude_types=exclude_types,
+        include_today=include_today,
+        start_index=start_index,
+    ) == _reference(
+        all_entries,
+        count,
+        leadtime,
+        include_types,
+        exclude_types,
+        include_today,
+        start_index,
+    )
+
+    groups = aggregator.get_upcoming_group_by_day(
+        count=count,
+        leadtime=leadtime,
+        include_types=include_types,
+        exclude_types=exclude_types,
+        include_today=include_today,
+        start_index=start_index,
+    )
+    expected = _reference(
+        all_entries, None, leadtime, include_types, exclude_types, include_today, None
+    )
+    days = sorted({e.date for e in expected})[start_index or 0 :]
+    if count is not None:
+        days = days[:count]
+    assert [g.date for g in groups] == days
+    for g in groups:
+        assert g.types == [e.type for e in expected if e.date == g.date]
+
+
+def test_index_is_rebuilt_on_new_entries(fetched_shell, make_source):
+    shell = fetched_shell(0)
+    aggregator = CollectionAggregator([shell])
+    assert aggregator.types == set(TYPES)
+
+    shell._source = make_source([Collection(date.today() + timedelta(days=1), "New")])
+    assert shell.fetch()
+    assert aggregator.types == {"New"}
+    assert [e.type for e in aggregator.get_upcoming()] == ["New"]
+
+
+@pytest.mark.parametrize("include_today", [False, True])
+def test_view_is_shared_and_matches_aggregator(
+    include_today, fetched_shell, make_source
+):
+    shell = fetched_shell(0)
+    aggregator = CollectionAggregator([shell])
+    view = aggregator.view(include_today)
+    assert aggregator.view(include_today) is view
+
+    for kwargs in [
+        {},
+        {"count": 3, "leadtime": 30},
+        {"include_types": ["Bio"], "start_index": 1, "count": 1},
+        {"exclude_types": ["Paper"], "leadtime": 0},
+    ]:
+        assert view.get_upcoming(**kwargs) == aggregator.get_upcoming(
+            include_today=include_today, **kwargs
+        )
+        assert view.get_upcoming_group_by_day(
+            **kwargs
+        ) == aggregator.get_upcoming_group_by_day(include_today=include_today, **kwargs)
+
+    # an unchanged fetch keeps the view, new entries invalidate it
+    assert shell.fetch()
+    assert aggregator.view(include_today) is view
+    shell._source = make_source(partial(_collections, 1))
+    assert shell.fetch()
+    assert aggregator.view(include_today) is not view
+
+
+def test_unchanged_fetch_keeps_index(fetched_shell, make_source):
+    shell = fetched_shell(0)
+    version = shell.version
+    refreshtime = shell.refreshtime
+
+    assert shell.fetch()
+    assert not shell.changed
+    assert shell.version == version
+    assert shell.refreshtime > refreshtime
+
+    shell._source = make_source(partial(_collections, 1))
+    assert shell.fetch()
+    assert shell.changed
+    assert shell.version == version + 1
@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    Customize,
+    SourceShell,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule.service.CollectionCacheStore import (  # isort:skip # noqa: E402
+    CollectionCacheStore,
+)
+
+DAY = datetime.date(2030, 1, 7)
+
+
+ENTRIES = [Collection(DAY, "Bio "), Collection(DAY, "Papier")]
+CUSTOMIZE = {"Bio": Customize("Bio", alias="Organic")}
+
+
+def _entries(shell: SourceShell) -> list[tuple[datetime.date, str]]:
+    return [(e.date, e.type) for e in shell._entries]
+
+
+def test_round_trip_and_restore(tmp_path: Path, make_shell, make_source):
+    fetched = make_shell(
+        make_source(ENTRIES), "example", customize=CUSTOMIZE, day_offset=1
+    )
+    assert fetched.fetch()
+
+    async def save():
+        hass = HomeAssistant(str(tmp_path))
+        store = CollectionCacheStore(hass)
+        await store.async_load()
+        store.set(fetched.unique_id, fetched.dump())
+        store.set("removed", fetched.dump())
+        store.remove("removed")
+        # written immediately instead of after SAVE_DELAY
+        await store._store.async_save(store._data_to_save())
+        await hass.async_stop(force=True)
+
+    async def load():
+        hass = HomeAssistant(str(tmp_path))
+        store = CollectionCacheStore(hass)
+        await store.async_load()
+        try:
+            assert store.get("removed") is None
+            return store.get(fetched.unique_id)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(save())
+    data = asyncio.run(load())
+    assert data is not None
+
+    # a new shell (e.g. after a restart) gets the entries without fetching
+    source = make_source(ENTRIES)
+    restored = make_shell(source, "example", customize=CUSTOMIZE, day_offset=1)
+    assert restored.restore(data)
+    assert source.fetches == 0
+    assert restored.refreshtime == fetched.refreshtime
+    assert _entries(restored) == _entries(fetched)
+    assert _entries(restored) == [
+        (DAY + datetime.timedelta(days=1), "Organic"),
+        (DAY + datetime.timedelta(days=1), "Papier"),
+    ]
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.fetch_queue import (  # isort:skip # noqa: E402
+    FetchQueue,
+    provider_key,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule.shell_registry import (  # isort:skip # noqa: E402
+    ShellRegistry,
+)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://www.abfall.io", "abfall.io"),
+        ("https://api.abfall.io/?key=1", "abfall.io"),
+        ("https://WWW.Example.co.uk/", "example.co.uk"),
+        ("https://bsr.de", "bsr.de"),
+        ("rctcbc.gov.uk", "rctcbc.gov.uk"),
+        (None, "test"),
+    ],
+)
+def test_provider_key(url, expected, make_shell):
+    assert provider_key(make_shell(url=url)) == expected
+
+
+def test_provider_key_is_stable(make_shell):
+    shell = make_shell(url="https://www.jumomind.de")
+    shell.metrics.record_response(10, "https://muenchen.jumomind.com/mmapp/api.php")
+    # known before the first fetch, the requested hosts don't change it
+    assert provider_key(shell) == "jumomind.de"
+
+
+def test_spread_delay(make_shell):
+    queue = FetchQueue()
+    shells = [make_shell(unique_id=str(i), url="https://abfall.io") for i in range(10)]
+    delays = sorted(queue.spread_delay(s, 3600) for s in shells)
+    assert all(0 <= d < 3600 for d in delays)
+    # evenly spread, no two fetches closer than a fraction of the even spacing
+    assert min(b - a for a, b in zip(delays, delays[1:])) > 3600 / 10 / 3
+    assert queue.spread_delay(make_shell(url="https://bsr.de"), 0) == 0
+
+
+def test_concurrency_and_rate_limit(make_shell):
+    async def main():
+        queue = FetchQueue(rate_per_minute=600, burst=2, max_concurrent=1)
+        starts = {}
+        running = {"a": 0, "b": 0}
+
+        async def fetch(name):
+            starts[name] = time.monotonic()
+            running[name[0]] += 1
+            assert running[name[0]] == 1
+            await asyncio.sleep(0.01)
+            running[name[0]] -= 1
+            return name
+
+        shells = [
+            make_shell(unique_id=f"a{i}", url="https://abfall.io") for i in range(4)
+        ]
+        other = make_shell(unique_id="b", url="https://bsr.de")
+        started = time.monotonic()
+        tasks = [
+            asyncio.create_task(queue.async_run(s, lambda s=s: fetch(s.unique_id)))
+            for s in shells
+        ]
+        await asyncio.sleep(0)
+        assert queue.depth == 3  # the first one is running
+        # other providers are not limited by abfall.io
+        assert await queue.async_run(other, lambda: fetch("b")) == "b"
+        assert starts["b"] - started < 0.05
+
+        assert await asyncio.gather(*tasks) == ["a0", "a1", "a2", "a3"]
+        assert queue.depth == 0
+        # burst of 2, then one fetch per 0.1 s
+        assert starts["a3"] - started >= 0.18
+        stats = queue.stats()["abfall.io"]
+        assert stats.fetches == 4
+        assert stats.active == 0
+        assert stats.max_wait >= 0.18
+        assert shells[3].metrics.queue_depth == 2  # a1 and a2 waited ahead of a3
+        assert shells[3].metrics.queue_wait == stats.last_wait
+
+    asyncio.run(main())
+
+
+def test_cancel_while_queued(make_shell):
+    async def main():
+        queue = FetchQueue(max_concurrent=1)
+        shell = make_shell(url="https://abfall.io")
+        blocker = asyncio.Event()
+
+        first = asyncio.create_task(queue.async_run(shell, blocker.wait))
+        second = asyncio.create_task(queue.async_run(shell, blocker.wait))
+        await asyncio.sleep(0)
+        assert queue.depth == 1
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        assert queue.depth == 0
+        blocker.set()
+        await first
+        assert queue.stats()["abfall.io"].active == 0
+
+    asyncio.run(main())
+
+
+def test_group_is_queued_once(make_shell):
+    async def main():
+        queue = FetchQueue(max_concurrent=1)
+        registry = ShellRegistry()
+        shells = [make_shell(url="https://abfall.io") for _ in range(3)]
+        for shell in shells:
+            registry.acquire(shell)
+        results = iter([False, True])
+        fetched = []
+
+        async def fetch(shell):
+            fetched.append(shell)
+            await asyncio.sleep(0.01)
+            return next(results)
+
+        tasks = [
+            asyncio.create_task(queue.async_run(s, lambda s=s: fetch(s)))
+            for s in shells
+        ]
+        await asyncio.sleep(0)
+        # the others wait for the group, not in the queue of the provider
+        assert queue.depth == 0
+        # failures are not shared, the next shell fetches on its own and its
+        # successful fetch is shared with the last one
+        assert await asyncio.gather(*tasks) == [False, True, True]
+        assert fetched == shells[:2]
+        assert queue.stats()["abfall.io"].fetches == 2
+
+    asyncio.run(main())
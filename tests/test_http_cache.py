@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from requests.auth import HTTPBasicAuth
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.HttpCache import (  # isort:skip # noqa: E402
+    HttpCache,
+    HttpCacheEntry,
+)
+from waste_collection_schedule.service.HttpClient import (  # isort:skip # noqa: E402
+    HttpClient,
+)
+
+URL = "https://example.com/calendar.ics"
+ETAG = '"v1"'
+BODY = b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+
+class _Calendar:
+    """Calendar with an ETag, counting the full (not 304) responses."""
+
+    def __init__(self) -> None:
+        self.full_responses = 0
+
+    def __call__(self, request, body: bytes) -> tuple[int, dict[str, str], bytes]:
+        if request.headers.get("If-None-Match") == ETAG:
+            return 304, {"ETag": ETAG}, b""
+        self.full_responses += 1
+        headers = {"Content-Type": "text/calendar; charset=utf-8", "ETag": ETAG}
+        return 200, headers, BODY
+
+
+@pytest.fixture
+def calendar() -> _Calendar:
+    return _Calendar()
+
+
+@pytest.fixture
+def server_url(serve, calendar: _Calendar) -> str:
+    return serve(calendar).url + "/calendar.ics"
+
+
+def test_not_modified_replays_cached_body(server_url: str, calendar: _Calendar) -> None:
+    client = HttpClient()
+
+    r1 = client.get_cached(server_url)
+    assert r1.status_code == 200
+    assert r1.from_cache is False
+    assert r1.content == BODY
+
+    r2 = client.get_cached(server_url)
+    assert r2.status_code == 200
+    assert r2.from_cache is True
+    assert r2.content == BODY
+    assert r2.text == BODY.decode()
+    assert r2.cache_validator == r1.cache_validator
+    assert calendar.full_responses == 1
+
+
+def test_cache_survives_restart_on_disk(
+    server_url: str, calendar: _Calendar, tmp_path: Path
+) -> None:
+    client = HttpClient()
+    client.set_cache_directory(tmp_path)
+    assert client.get_cached(server_url).from_cache is False
+
+    # a new client (e.g. after a restart) uses the entries stored on disk
+    client = HttpClient()
+    client.set_cache_directory(tmp_path)
+    r = client.get_cached(server_url)
+    assert r.from_cache is True
+    assert r.content == BODY
+    assert calendar.full_responses == 1
+
+
+def test_bodies_are_read_from_disk(
+    server_url: str, calendar: _Calendar, tmp_path: Path
+) -> None:
+    client = HttpClient()
+    client.set_cache_directory(tmp_path)
+    client.get_cached(server_url)
+    # only the validators are kept in memory
+    assert all(e.body is None for e in client.cache._entries.values())
+    assert client.get_cached(server_url).content == BODY
+
+    # a body removed from disk is requested again
+    for path in tmp_path.glob("*.body"):
+        path.unlink()
+    r = client.get_cached(server_url)
+    assert r.from_cache is False
+    assert r.content == BODY
+    assert calendar.full_responses == 2
+
+
+def test_unused_entries_are_pruned(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path, max_unused_age=60)
+    cache.set("old", HttpCacheEntry(ETAG, None, {}, BODY))
+    cache.set("new", HttpCacheEntry(ETAG, None, {}, BODY))
+    assert len(list(tmp_path.iterdir())) == 4
+
+    old = time.time() - 120
+    cache._entries["old"].used = old
+    os.utime(tmp_path / "old.json", (old, old))
+    cache.prune()
+    assert list(cache._entries) == ["new"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.body", "new.json"]
+
+
+def test_key_includes_content_selecting_headers() -> None:
+    key = HttpCache.key("GET", URL)
+    assert HttpCache.key("get", URL, headers={"User-Agent": "test"}) == key
+    assert HttpCache.key("GET", URL, headers={"Accept": "text/calendar"}) != key
+    assert HttpCache.key("GET", URL, headers={"authorization": "Bearer 1"}) != key
+    assert HttpCache.key(
+        "GET", URL, headers={"Authorization": "Bearer 1"}
+    ) != HttpCache.key("GET", URL, headers={"Authorization": "Bearer 2"})
+    assert HttpCache.key("GET", URL, auth=("user", "1")) != key
+    # stable across instances of an auth class
+    assert HttpCache.key("GET", URL, auth=HTTPBasicAuth("user", "1")) == (
+        HttpCache.key("GET", URL, auth=HTTPBasicAuth("user", "1"))
+    )
+    assert HttpCache.key("GET", URL, auth=HTTPBasicAuth("user", "1")) != (
+        HttpCache.key("GET", URL, auth=HTTPBasicAuth("user", "2"))
+    )
+
+
+def test_responses_are_cached_per_accept_header(
+    server_url: str, calendar: _Calendar
+) -> None:
+    client = HttpClient()
+    client.get_cached(server_url)
+    r = client.get_cached(server_url, headers={"Accept": "application/json"})
+    assert r.from_cache is False
+    r = client.get_cached(server_url, headers={"Accept": "application/json"})
+    assert r.from_cache is True
+    assert calendar.full_responses == 2
+
+    # headers of the session are part of the key
+    session = client.get_session(server_url)
+    session.headers["Accept"] = "application/json"
+    try:
+        assert client.get_cached(server_url).from_cache is True
+    finally:
+        session.headers["Accept"] = "*/*"
+    assert calendar.full_responses == 2
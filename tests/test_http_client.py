@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+from urllib3.exceptions import EmptyPoolError
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.HttpClient import (  # isort:skip # noqa: E402
+    HttpClient,
+    cookie_scope,
+)
+
+
+def _echo_cookies(request, body: bytes) -> tuple[int, dict[str, str], bytes]:
+    headers = {"Set-Cookie": "session=42; Path=/"} if request.path == "/login" else {}
+    return 200, headers, (request.headers.get("Cookie") or "").encode()
+
+
+@pytest.fixture
+def server_url(serve) -> str:
+    return serve(_echo_cookies).url
+
+
+def test_cookies_are_kept_per_scope(server_url: str) -> None:
+    client = HttpClient()
+
+    with cookie_scope() as jar:
+        client.get(f"{server_url}/login")
+        assert client.get(f"{server_url}/data").text == "session=42"
+        assert jar.get("session") == "42"
+
+    # another fetch (or a request outside of a fetch) uses the same session,
+    # but doesn't get the cookies
+    with cookie_scope():
+        assert client.get(f"{server_url}/data").text == ""
+    client.get(f"{server_url}/login")
+    assert client.get(f"{server_url}/data").text == ""
+
+
+def test_wait_for_free_connection_is_bounded(server_url: str) -> None:
+    client = HttpClient(max_connections_per_host=1, pool_timeout=0.1)
+
+    # a streamed response keeps its connection until it is closed
+    r = client.get(f"{server_url}/data", stream=True)
+    with pytest.raises(EmptyPoolError):
+        client.get(f"{server_url}/data")
+    r.close()
+    assert client.get(f"{server_url}/data").status_code == 200
@@ -0,0 +1,130 @@
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.test.http_replay import (  # isort:skip # noqa: E402
+    Cassette,
+    FixtureStore,
+    FrozenDate,
+    FrozenDatetime,
+    count_traffic,
+)
+
+BODY = "Bio 2024-01-03\nPapier 2024-01-10\n".encode("utf-8")
+
+
+def _respond(request, body: bytes) -> tuple[int, dict[str, str], bytes]:
+    if request.path.startswith("/old"):
+        return 302, {"Location": "/calendar"}, b""
+    if request.command == "POST":
+        return 200, {}, body + b"!"
+    headers = {"Content-Type": "text/plain; charset=utf-8", "Set-Cookie": "session=1"}
+    return 200, headers, BODY
+
+
+def _fetch(url):
+    with requests.Session() as session:
+        text = session.get(f"{url}/old", params={"_": "1"}, timeout=5).text
+        echo = session.post(f"{url}/echo", data={"street": "Main"}, timeout=5)
+        return text, echo.content, echo.status_code
+
+
+def test_record_and_replay(tmp_path: Path, serve):
+    server = serve(_respond)
+    url = server.url
+    cassette = Cassette()
+    with cassette.record():
+        recorded = _fetch(url)
+    server.stop()
+
+    # redirect and target are stored separately
+    assert [i["status"] for i in cassette.interactions] == [302, 200, 200]
+    store = FixtureStore(tmp_path)
+    store.save("test", "Main Street", cassette)
+    assert store.path("test", "Main Street").exists()
+
+    # the server is gone, responses are served from the store
+    cassette = store.load("test", "Main Street")
+    assert cassette is not None
+    with cassette.replay():
+        assert _fetch(url) == recorded
+    assert recorded[0] == BODY.decode()
+
+    # requests outside of a replay are sent, but nobody is listening anymore
+    with pytest.raises(requests.ConnectionError):
+        requests.get(url, timeout=5)
+
+    assert store.load("test", "unknown") is None
+
+
+def test_count_traffic(serve):
+    # 302 without body, calendar and echo ("street=Main!")
+    expected = (3, len(BODY) + 12)
+    server = serve(_respond)
+    url = server.url
+    with count_traffic() as live:
+        _fetch(url)
+    cassette = Cassette()
+    with cassette.record(), count_traffic() as recorded:
+        _fetch(url)
+    server.stop()
+
+    with cassette.replay(), count_traffic() as replayed:
+        _fetch(url)
+    assert (live.requests, live.bytes) == expected
+    assert (recorded.requests, recorded.bytes) == expected
+    assert (replayed.requests, replayed.bytes) == expected
+
+    # nothing is counted outside of the block
+    with pytest.raises(requests.ConnectionError):
+        requests.get(url, timeout=5)
+    assert live.requests == 3
+
+
+def test_replay_unknown_request():
+    cassette = Cassette(now=datetime.datetime.now().astimezone())
+    with cassette.replay():
+        with pytest.raises(requests.ConnectionError, match="no recorded response"):
+            requests.get("http://127.0.0.1:1/calendar", timeout=5)
+
+
+def test_replay_matches_path_if_query_differs():
+    cassette = Cassette(
+        interactions=[
+            {
+                "method": "GET",
+                "url": "http://example.com/a?ts=1",
+                "body": None,
+                "status": 200,
+                "reason": "OK",
+                "headers": [],
+                "text": "first",
+            },
+        ]
+    )
+    with cassette.replay():
+        assert requests.get("http://example.com/a?ts=2", timeout=5).text == "first"
+
+
+def test_frozen_clock():
+    now = datetime.datetime(
+        2024, 1, 2, 23, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=1))
+    )
+    cassette = Cassette(now=now)
+    with cassette.replay():
+        assert FrozenDatetime.now() == datetime.datetime(2024, 1, 2, 23, 30)
+        assert FrozenDate.today() == datetime.date(2024, 1, 2)
+        assert FrozenDatetime.utcnow() == datetime.datetime(2024, 1, 2, 22, 30)
+        assert FrozenDatetime.now(datetime.timezone.utc) == now
+
+    # the clock is only frozen during replay
+    assert FrozenDate.today() == datetime.date.today()
@@ -0,0 +1,106 @@
+import datetime
+import os
+import re
+import sys
+
+import jinja2
+import pytest
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.ICS import ICS  # isort:skip # noqa: E402
+from waste_collection_schedule.service.ICSEvents import (  # isort:skip # noqa: E402
+    read_events,
+)
+
+SUMMARIES = [
+    "Bio",
+    "Restmüll, Papier",
+    "Abfuhr: gelbe tonne / papier",
+    "Bio",
+    "Abfuhr: Bio / restmüll",
+    "  Glas  ",
+    None,
+    "Restmüll, Papier",
+]
+
+
+def _calendar() -> str:
+    today = datetime.date.today()
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for i, summary in enumerate(SUMMARIES):
+        day = today + datetime.timedelta(days=7 * i + 1)
+        lines += ["BEGIN:VEVENT", f"UID:{i}", f"DTSTART;VALUE=DATE:{day:%Y%m%d}"]
+        if summary is not None:
+            lines.append(f"SUMMARY:{summary.replace(',', chr(92) + ',')}")
+        lines += [f"LOCATION:Street {i}", "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def _per_event_titles(ics: ICS, ics_data: str) -> list[tuple[datetime.date, str]]:
+    """Titles as rendered before the template was compiled once per ICS."""
+    start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    entries = []
+    for e in read_events(ics_data, start, start + datetime.timedelta(days=365)):
+        dtstart = e.start.date() if isinstance(e.start, datetime.datetime) else e.start
+        environment = jinja2.Environment()
+        title_template = environment.from_string(ics._title_template)
+        entry_title = title_template.render(date=e)
+
+        if ics._regex is not None:
+            match = ics._regex.match(entry_title)
+            if match:
+                entry_title = match.group(1)
+
+        if ics._split_at is not None:
+            entry_title_list = re.split(ics._split_at, entry_title)
+            entries.extend((dtstart, t.strip().title()) for t in entry_title_list)
+        else:
+            entries.append((dtstart, entry_title))
+    return entries
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"title_template": "{{ date.summary }}"},
+        {"title_template": "{{date.summary}} ({{date.location}})"},
+        {"title_template": "{{date.summary|upper}}", "split_at": ", "},
+        {"regex": r"Abfuhr: (.*)"},
+        {"regex": r"Abfuhr: (.*)", "split_at": " / "},
+    ],
+    ids=["default", "whitespace", "custom", "filter", "regex", "regex and split"],
+)
+def test_titles_match_per_event_rendering(kwargs):
+    ics = ICS(**kwargs)
+    ics_data = _calendar()
+    expected = _per_event_titles(ics, ics_data)
+    assert len(expected) >= len(SUMMARIES)
+
+    assert ics.convert(ics_data) == expected
+    # the memoized titles give the same result
+    assert ics.convert(ics_data) == expected
+
+
+def test_default_template_skips_jinja():
+    assert ICS()._compiled_title_template is None
+    assert ICS(title_template="{{  date.summary}}")._compiled_title_template is None
+
+    custom = ICS(title_template="{{date.location}}")
+    assert isinstance(custom._compiled_title_template, jinja2.Template)
+
+
+def test_titles_are_memoized_per_summary():
+    ics = ICS(regex=r"Abfuhr: (.*)", split_at=" / ")
+    ics.convert(_calendar())
+
+    # one entry per distinct rendered title
+    assert len(ics._titles) == len(SUMMARIES) - 2
+    assert ics._titles["Abfuhr: gelbe tonne / papier"] == ("Gelbe Tonne", "Papier")
+    assert ics._titles["Bio"] == ("Bio",)
+    assert ics._convert_title("Bio") is ics._titles["Bio"]
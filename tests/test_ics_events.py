@@ -0,0 +1,106 @@
+import datetime
+import os
+import sys
+
+import pytest
+from icalevents import icalevents
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.ICSEvents import (  # isort:skip # noqa: E402
+    read_events,
+)
+
+START = datetime.datetime(2024, 3, 10)
+END = START + datetime.timedelta(days=365)
+
+
+def _calendar(*events: list[str], header: str = "") -> bytes:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    if header:
+        lines.append(header)
+    for event in events:
+        lines += ["BEGIN:VEVENT", *event, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def _key(e):
+    return (e.start, e.end, e.summary, e.description, e.location)
+
+
+CALENDARS = {
+    "all day": _calendar(
+        ["UID:1", "DTSTART;VALUE=DATE:20240310", "SUMMARY:Bio\\, Papier"],
+        ["UID:2", "DTSTART;VALUE=DATE:20240309", "DTEND;VALUE=DATE:20240310"],
+        ["UID:3", "DTSTART:20240308", "SUMMARY:before"],
+        ["UID:4", "DTSTART:20250311", "SUMMARY:after"],
+        ["UID:5", "DTSTART;VALUE=DATE:20240301", "DURATION:P10D"],
+    ),
+    "time zones": _calendar(
+        ["UID:1", "DTSTART;TZID=Europe/Berlin:20240311T003000", "SUMMARY:local"],
+        ["UID:2", "DTSTART:20240311T233000Z", "SUMMARY:utc"],
+        ["UID:3", "DTSTART:20240310T060000", "SUMMARY:floating"],
+        header="X-WR-TIMEZONE:Europe/Berlin",
+    ),
+    "nested and folded": _calendar(
+        [
+            "UID:1",
+            "DTSTART;VALUE=DATE:20240401",
+            "SUMMARY:Rest",
+            "  müll",
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            "DESCRIPTION:alarm",
+            "TRIGGER:-PT1H",
+            "END:VALARM",
+            "LOCATION:Street\\;1",
+        ],
+        ["UID:2", "DTSTART;VALUE=DATE:20240402", "EXDATE;VALUE=DATE:20240402"],
+    ),
+    "recurring": _calendar(
+        [
+            "UID:r",
+            "DTSTART;VALUE=DATE:20240101",
+            "RRULE:FREQ=WEEKLY;COUNT=30",
+            "EXDATE;VALUE=DATE:20240318",
+            "SUMMARY:weekly",
+        ],
+        [
+            "UID:r",
+            "RECURRENCE-ID;VALUE=DATE:20240325",
+            "DTSTART;VALUE=DATE:20240326",
+            "SUMMARY:moved",
+        ],
+        ["UID:old", "DTSTART;VALUE=DATE:20200101", "RRULE:FREQ=DAILY;UNTIL=20200201"],
+        ["UID:x", "DTSTART:20240501", "SUMMARY:single"],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", CALENDARS)
+def test_same_events_as_icalevents(name):
+    content = CALENDARS[name]
+    expected = icalevents.events(
+        start=START,
+        end=END,
+        string_content=content.replace(
+            b"EXDATE;VALUE=DATE:20240318\r\n", b"EXDATE;VALUE=DATE:20240318T010000\r\n"
+        ),
+    )
+    events = read_events(content, START, END)
+    assert sorted(map(_key, events), key=str) == sorted(map(_key, expected), key=str)
+
+
+def test_byte_order_mark():
+    content = CALENDARS["all day"]
+    with_bom = read_events(b"\xef\xbb\xbf" + content, START, END)
+    assert list(map(_key, with_bom)) == list(
+        map(_key, read_events(content, START, END))
+    )
+
+    utf16 = b"\xff\xfe" + content.decode().encode("utf-16-le")
+    assert list(map(_key, read_events(utf16, START, END))) == list(map(_key, with_bom))
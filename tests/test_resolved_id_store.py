@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import Collection  # isort:skip # noqa: E402
+from waste_collection_schedule.service import (  # isort:skip # noqa: E402
+    ResolvedIdStore as resolved_id_store,
+)
+from waste_collection_schedule.source import awido_de  # isort:skip # noqa: E402
+
+DAY = datetime.date(2030, 1, 7)
+ARGS = {"city": "Musterstadt", "street": "Hauptstraße"}
+
+
+@pytest.fixture
+def store(monkeypatch) -> resolved_id_store.ResolvedIdStore:
+    store = resolved_id_store.ResolvedIdStore()
+    monkeypatch.setattr(resolved_id_store, "_resolved_id_store", store)
+    return store
+
+
+class _Provider:
+    """Provider with ids which become invalid after a change of its database."""
+
+    def __init__(self, valid_id="42", fail=False):
+        self.valid_id = valid_id
+        self.fail = fail
+        self.resolves = 0
+        self.fetched_ids = []
+
+    def resolve(self):
+        self.resolves += 1
+        return self.valid_id
+
+    def fetch(self, oid):
+        self.fetched_ids.append(oid)
+        if oid != self.valid_id:
+            if self.fail:
+                raise ValueError("unknown id")
+            return []
+        return [Collection(DAY, "Bio")]
+
+    def fetch_with_resolved_id(self):
+        return resolved_id_store.fetch_with_resolved_id(
+            "test", ARGS, self.resolve, self.fetch
+        )
+
+
+def test_cached_id_is_used(store):
+    provider = _Provider()
+    assert provider.fetch_with_resolved_id()
+    assert store.get("test", ARGS) == "42"
+
+    assert provider.fetch_with_resolved_id()
+    assert provider.resolves == 1
+    assert provider.fetched_ids == ["42", "42"]
+
+    # the arguments are part of the key
+    assert store.get("test", {**ARGS, "street": "Nebenstraße"}) is None
+    assert store.get("other", ARGS) is None
+
+
+@pytest.mark.parametrize("fail", [False, True], ids=["empty", "raises"])
+def test_stale_id_is_resolved_again(store, fail):
+    store.put("test", ARGS, "17")
+    provider = _Provider(fail=fail)
+
+    assert provider.fetch_with_resolved_id() == [Collection(DAY, "Bio")]
+    assert provider.resolves == 1
+    assert provider.fetched_ids == ["17", "42"]
+    assert store.get("test", ARGS) == "42"
+
+
+def test_nothing_is_stored_without_entries(store):
+    store.put("test", ARGS, "17")
+    provider = _Provider()
+    # e.g. a street without collections
+    provider.resolve = lambda: "43"
+
+    assert provider.fetch_with_resolved_id() == []
+    assert provider.fetched_ids == ["17", "43"]
+    # the stale id is removed, the new one didn't return anything
+    assert store.get("test", ARGS) is None
+
+
+def test_resolve_errors_are_raised(store):
+    provider = _Provider()
+
+    def resolve():
+        raise ValueError("street not found")
+
+    provider.resolve = resolve
+    with pytest.raises(ValueError, match="street not found"):
+        provider.fetch_with_resolved_id()
+    assert store.get("test", ARGS) is None
+
+
+def test_persistence(tmp_path: Path):
+    async def save():
+        hass = HomeAssistant(str(tmp_path))
+        store = resolved_id_store.ResolvedIdStore(hass)
+        await store.async_load()
+        store.put("test", ARGS, "42")
+        store.put("removed", ARGS, "17")
+        store.remove("removed", ARGS)
+        await store.async_save()
+        assert not store._dirty
+        # the delayed save is written when Home Assistant stops
+        await hass.async_stop(force=True)
+
+    async def load():
+        hass = HomeAssistant(str(tmp_path))
+        store = resolved_id_store.ResolvedIdStore(hass)
+        store.put("test", {"city": "Beispielstadt"}, "7")
+        await store.async_load()
+        try:
+            return (
+                store.get("test", ARGS),
+                store.get("removed", ARGS),
+                store.get("test", {"city": "Beispielstadt"}),
+            )
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(save())
+    # ids resolved before loading are kept
+    assert asyncio.run(load()) == ("42", None, "7")
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def test_awido_without_street(store, monkeypatch):
+    urls = []
+
+    def get(url, params=None):
+        urls.append(url)
+        if "/getPlaces/" in url:
+            return _Response([{"key": "c1", "value": "Musterstadt "}])
+        return _Response([{"key": "s1", "value": "Musterstadt"}])
+
+    monkeypatch.setattr(awido_de.requests, "get", get)
+    source = awido_de.Source("test", "Musterstadt")
+    monkeypatch.setattr(source, "_fetch_oid", lambda oid: [Collection(DAY, oid)])
+
+    assert source.fetch() == [Collection(DAY, "s1")]
+    # the city is used as street name, like before ids were cached
+    assert source._street == "musterstadt"
+    assert len(urls) == 2
+
+    # the key doesn't change with the street, the cached id is used
+    assert source.fetch() == [Collection(DAY, "s1")]
+    assert len(urls) == 2
@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant, callback
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.scheduler import (  # isort:skip # noqa: E402
+    initialize_daily_scheduler,
+)
+from custom_components.waste_collection_schedule.wcs_coordinator import (  # isort:skip # noqa: E402
+    WCSCoordinator,
+)
+
+NOON = datetime.time(12)
+
+
+def _active_timers(hass: HomeAssistant) -> int:
+    return sum(not h.cancelled() for h in hass.loop._scheduled)  # type: ignore[attr-defined]
+
+
+def _run(tmp_path: Path, test):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            await test(hass)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
+
+
+def test_timers_constant_across_reloads(tmp_path: Path, make_shell):
+    async def test(hass: HomeAssistant):
+        scheduler = initialize_daily_scheduler(hass)
+        before = _active_timers(hass)
+
+        # an entry which stays loaded and one which is reloaded (e.g. by an options change)
+        WCSCoordinator(hass, make_shell(), ", ", "01:00", 0, "10:00")
+        timers = _active_timers(hass)
+        assert scheduler.timer_count == 3  # fetch, day switch and midnight
+        assert timers == before + 3
+
+        for _ in range(100):
+            coordinator = WCSCoordinator(hass, make_shell(), ", ", "01:00", 0, "10:00")
+            assert scheduler.timer_count == 3
+            assert scheduler.subscriber_count == 6
+            coordinator.async_unload()
+            assert scheduler.subscriber_count == 3
+
+        assert scheduler.timer_count == 3
+        assert _active_timers(hass) == timers
+
+    _run(tmp_path, test)
+
+
+def test_fan_out_to_live_subscribers(tmp_path: Path):
+    async def test(hass: HomeAssistant):
+        scheduler = initialize_daily_scheduler(hass)
+        calls = []
+
+        @callback
+        def first(now):
+            calls.append(("first", now))
+
+        async def second(now):
+            calls.append(("second", now))
+
+        unsubscribe_first = scheduler.async_track_time(NOON, first)
+        unsubscribe_second = scheduler.async_track_time(
+            datetime.time(12, 0, 0, 500), second
+        )
+        assert scheduler.timer_count == 1
+
+        now = datetime.datetime(2024, 1, 1, 12)
+        scheduler._tick(NOON, now)
+        await hass.async_block_till_done()
+        assert sorted(calls) == [("first", now), ("second", now)]
+
+        calls.clear()
+        unsubscribe_first()
+        scheduler._tick(NOON, now)
+        await hass.async_block_till_done()
+        assert calls == [("second", now)]
+
+        unsubscribe_second()
+        assert scheduler.timer_count == 0
+
+        # unsubscribing twice must not remove the timer of new subscribers
+        unsubscribe_third = scheduler.async_track_time(NOON, first)
+        unsubscribe_second()
+        assert scheduler.timer_count == 1
+        unsubscribe_third()
+        assert scheduler.timer_count == 0
+
+    _run(tmp_path, test)
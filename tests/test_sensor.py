@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.sensor import (  # isort:skip # noqa: E402
+    DetailsFormat,
+    ScheduleSensor,
+)
+from custom_components.waste_collection_schedule.waste_collection_api import (  # isort:skip # noqa: E402
+    WasteCollectionApi,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+)
+from custom_components.waste_collection_schedule.wcs_coordinator import (  # isort:skip # noqa: E402
+    WCSCoordinator,
+)
+
+DAY = datetime.date(2030, 1, 7)
+ENTRIES = [Collection(DAY, "Bio")]
+
+
+class _Sensor(ScheduleSensor):
+    """Counts the updates of the sensor."""
+
+    updates = 0
+
+    def _update_sensor(self):
+        self.updates += 1
+        super()._update_sensor()
+
+
+async def _add_sensor(hass, name, api=None, coordinator=None, aggregator=None):
+    sensor = _Sensor(
+        hass=hass,
+        api=api,
+        coordinator=coordinator,
+        name=name,
+        aggregator=aggregator or coordinator.aggregator,
+        details_format=DetailsFormat.upcoming,
+        count=None,
+        leadtime=None,
+        collection_types=None,
+        value_template=None,
+        date_template=None,
+        add_days_to=False,
+        event_index=None,
+    )
+    sensor.hass = hass
+    sensor.entity_id = f"sensor.{name}"
+    await sensor.async_added_to_hass()
+    sensor.updates = 0
+    return sensor
+
+
+def test_yaml_fetch_updates_only_sensors_of_the_source(
+    tmp_path: Path, make_shell, make_source
+):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        api = WasteCollectionApi(hass, ", ", datetime.time(1), 0, datetime.time(10))
+        first = make_shell(make_source(ENTRIES), "first")
+        second = make_shell(make_source(ENTRIES), "second")
+        api._source_shells = [first, second]
+        first_sensor = await _add_sensor(
+            hass, "first", api=api, aggregator=api.get_aggregator([first])
+        )
+        second_sensor = await _add_sensor(
+            hass, "second", api=api, aggregator=api.get_aggregator([second])
+        )
+        both_sensor = await _add_sensor(
+            hass, "both", api=api, aggregator=api.get_aggregator([first, second])
+        )
+        try:
+            await api._fetch_shells([first])
+            await hass.async_block_till_done()
+            assert first_sensor.updates == 1
+            assert both_sensor.updates == 1
+            assert second_sensor.updates == 0
+        finally:
+            api._shutdown_callback(None)  # type: ignore[arg-type]
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
+
+
+def test_ui_fetch_updates_sensors_of_the_entry_once(
+    tmp_path: Path, make_shell, make_source
+):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        first_shell = make_shell(make_source(ENTRIES), "first")
+        second_shell = make_shell(make_source(ENTRIES), "second")
+        first = WCSCoordinator(hass, first_shell, ", ", "01:00", 0, "10:00")
+        second = WCSCoordinator(hass, second_shell, ", ", "01:00", 0, "10:00")
+        first_sensor = await _add_sensor(hass, "first", coordinator=first)
+        second_sensor = await _add_sensor(hass, "second", coordinator=second)
+        try:
+            await first._fetch_now()
+            await hass.async_block_till_done()
+            assert first_sensor.updates == 1
+            assert second_sensor.updates == 0
+        finally:
+            first.async_unload()
+            second.async_unload()
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    Customize,
+    SourceShell,
+)
+from waste_collection_schedule.shell_registry import (  # isort:skip # noqa: E402
+    ShellRegistry,
+)
+
+DAY = date(2024, 3, 10)
+ENTRIES = [Collection(DAY, "Bio"), Collection(DAY, "Papier")]
+
+
+class _AsyncSource:
+    def __init__(self):
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return [Collection(DAY, "Bio")]
+
+
+def _entries(shell: SourceShell) -> list[tuple[date, str]]:
+    return [(e.date, e.type) for e in shell._entries]
+
+
+def test_shared_fetch_with_own_customize(make_shell, make_source):
+    registry = ShellRegistry()
+    source = make_source(ENTRIES)
+    household = make_shell(source)
+    dashboard = make_shell(
+        make_source(ENTRIES),
+        customize={"Papier": Customize("Papier", show=False)},
+        day_offset=1,
+    )
+    registry.acquire(household)
+    registry.acquire(dashboard)
+    assert registry.refcount("test") == 2
+
+    assert household.fetch()
+    assert source.fetches == 1
+    assert _entries(household) == [(DAY, "Bio"), (DAY, "Papier")]
+    assert _entries(dashboard) == [(date(2024, 3, 11), "Bio")]
+    assert dashboard.changed
+    assert dashboard.refreshtime == household.refreshtime
+    assert dashboard.metrics.entries == 2
+
+    # shells joining later get the entries without fetching
+    late = make_shell(
+        make_source(ENTRIES), customize={"Bio": Customize("Bio", alias="Organic")}
+    )
+    registry.acquire(late)
+    assert late.refreshtime == household.refreshtime
+    assert _entries(late) == [(DAY, "Organic"), (DAY, "Papier")]
+
+    registry.release(household)
+    registry.release(household)
+    assert registry.refcount("test") == 2
+    assert household.group is None
+    registry.release(dashboard)
+    registry.release(late)
+    assert registry.refcount("test") == 0
+
+
+def test_concurrent_fetches_are_deduplicated(make_shell, make_source):
+    registry = ShellRegistry()
+    source = make_source(ENTRIES)
+    source.proceed.clear()
+    first = make_shell(source)
+    second_source = make_source(ENTRIES)
+    second = make_shell(second_source)
+    registry.acquire(first)
+    registry.acquire(second)
+
+    thread = threading.Thread(target=first.fetch)
+    thread.start()
+    assert source.started.wait(5)
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(second.fetch()))
+    waiting.start()
+    time.sleep(0.1)  # let the second fetch wait for the first one
+    source.proceed.set()
+    thread.join(5)
+    waiting.join(5)
+
+    assert results == [True]
+    assert source.fetches == 1
+    assert second_source.fetches == 0
+    assert _entries(second) == _entries(first)
+
+
+def test_failures_are_not_shared(make_shell, make_source):
+    registry = ShellRegistry()
+    source = make_source(ENTRIES)
+    source.fail = True
+    other_source = make_source(ENTRIES)
+    first = make_shell(source)
+    second = make_shell(other_source)
+    registry.acquire(first)
+    registry.acquire(second)
+
+    assert not first.fetch()
+    assert first.breaker.failures == 1
+    assert second.breaker.failures == 0
+    assert second.refreshtime is None
+
+    # the next fetch of the other shell is a real fetch
+    assert second.fetch()
+    assert other_source.fetches == 1
+    assert first.refreshtime == second.refreshtime
+
+
+def test_async_fetches_are_deduplicated(make_shell):
+    registry = ShellRegistry()
+    source = _AsyncSource()
+    other_source = _AsyncSource()
+    first = make_shell(source)
+    second = make_shell(other_source, day_offset=-1)
+    registry.acquire(first)
+    registry.acquire(second)
+
+    async def main():
+        return await asyncio.gather(first.async_fetch(), second.async_fetch())
+
+    assert asyncio.run(main()) == [True, True]
+    assert source.fetches + other_source.fetches == 1
+    assert _entries(second) == [(date(2024, 3, 9), "Bio")]
@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.SourceCatalogue import (  # isort:skip # noqa: E402
+    SourceCatalogue,
+)
+
+SOURCES = {
+    "Germany": [
+        {"title": "Abfall Harburg", "module": "aw_harburg_de", "id": "aw_harburg_de"},
+        {
+            "title": "Landkreis Kassel",
+            "module": "jumomind_de",
+            "default_params": {"service_id": "ksl"},
+            "id": "jumomind_de",
+        },
+    ],
+    "Generic": [{"title": "ICS", "module": "ics", "id": "ics"}],
+}
+
+MANIFEST = {"ics": {"title": "ICS", "params": [{"name": "url", "default": None}]}}
+
+
+def test_lookup_by_option_value():
+    catalogue = SourceCatalogue(SOURCES, MANIFEST)
+
+    assert catalogue.countries == ["Germany", "Generic"]
+    assert len(catalogue) == 3
+    options = catalogue.get_options("Germany")
+    assert options[0] == {"value": "", "label": ""}
+    assert options[2] == {
+        "value": "jumomind_de\tLandkreis Kassel\tjumomind_de",
+        "label": "Landkreis Kassel (jumomind_de)",
+    }
+    assert catalogue.get_options("Germany") is options
+
+    entry = catalogue.lookup("Germany", options[2]["value"])
+    assert entry is not None
+    assert entry.default_params == {"service_id": "ksl"}
+    assert catalogue.lookup("Generic", options[2]["value"]) is None
+    assert catalogue.has_id("ics")
+    assert not catalogue.has_id("static")
+
+
+def test_search():
+    catalogue = SourceCatalogue(SOURCES)
+
+    assert [e.id for e in catalogue.search("kass")] == ["jumomind_de"]
+    assert [e.id for e in catalogue.search("landkreis JUMO")] == ["jumomind_de"]
+    assert [e.id for e in catalogue.search("Abfall")] == ["aw_harburg_de"]
+    assert catalogue.search("ics", country="Germany") == []
+    assert catalogue.search("harburg kassel") == []
+    assert catalogue.search("") == []
+
+
+def test_description_from_manifest():
+    catalogue = SourceCatalogue(SOURCES, MANIFEST)
+
+    description = catalogue.get_description("ics")
+    assert description is not None
+    assert [p.name for p in description.parameters] == ["url"]
+    assert catalogue.get_description("ics") is description
+    assert catalogue.get_description("aw_harburg_de") is None
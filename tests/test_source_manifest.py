@@ -0,0 +1,93 @@
+import importlib
+import inspect
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Literal
+
+import pytest
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule.service.SourceManifest import (  # isort:skip # noqa: E402
+    SourceDescription,
+    UnsupportedAnnotation,
+    decode_annotation,
+    encode_annotation,
+)
+
+MANIFEST = (
+    Path(__file__).parents[1]
+    / "custom_components"
+    / "waste_collection_schedule"
+    / "sources_manifest.json"
+)
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [
+        str,
+        int | None,
+        list[str] | str | None,
+        list[date | str],
+        dict[str, list[dict]],
+        Literal["a", "b"] | None,
+    ],
+)
+def test_annotation_round_trip(annotation):
+    encoded = encode_annotation(annotation)
+    assert decode_annotation(json.loads(json.dumps(encoded))) == annotation
+
+
+def test_unsupported_annotation():
+    class Custom:
+        pass
+
+    assert decode_annotation(encode_annotation(Custom)) is UnsupportedAnnotation
+    assert decode_annotation(encode_annotation(Custom | str)) == (
+        UnsupportedAnnotation | str
+    )
+
+
+def test_not_json_serializable_default():
+    parameters = [inspect.Parameter("x", inspect.Parameter.KEYWORD_ONLY, default=())]
+    assert SourceDescription("t", parameters).to_manifest() is None
+
+
+SOURCES = sorted(
+    p.stem
+    for p in (MANIFEST.parent / "waste_collection_schedule" / "source").glob("*.py")
+    if p.stem != "__init__"
+)
+
+
+@pytest.fixture(scope="module")
+def manifest() -> dict:
+    with MANIFEST.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_manifest_matches_source(source, manifest):
+    try:
+        module = importlib.import_module(f"waste_collection_schedule.source.{source}")
+    except ImportError as e:
+        pytest.skip(f"dependency of {source} not installed: {e}")
+    expected = SourceDescription.from_module(module).to_manifest()
+    if expected is None:
+        # can't be described in the manifest, the config flow imports it
+        assert source not in manifest
+        return
+
+    # run update_docu_links.py if this fails
+    entry = manifest.get(source)
+    assert entry == expected
+    description = SourceDescription.from_manifest(entry)
+    assert description.parameters == SourceDescription.from_module(module).parameters
+    assert description.flow_types == getattr(module, "CONFIG_FLOW_TYPES", {})
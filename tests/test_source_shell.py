@@ -0,0 +1,228 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import aiohttp
+import pytest
+import requests
+
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__), "../custom_components/waste_collection_schedule"
+    )
+)
+from waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    SourceShell,
+)
+from waste_collection_schedule.circuit_breaker import (  # isort:skip # noqa: E402
+    FAILURE_THRESHOLD,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+)
+from waste_collection_schedule.service.AsyncHttpClient import (  # isort:skip # noqa: E402
+    ClientSessionMixin,
+)
+from waste_collection_schedule.service.HttpClient import (  # isort:skip # noqa: E402
+    HttpClient,
+)
+
+TODAY = date(2024, 3, 10)
+
+
+def _bio(days: int) -> list[Collection]:
+    return [Collection(TODAY + timedelta(days=d), "Bio") for d in range(0, days, 7)]
+
+
+@pytest.fixture
+def bio_shell(make_shell, make_source):
+    def bio_shell(days: int, **kwargs) -> SourceShell:
+        return make_shell(make_source(_bio(days)), **kwargs)
+
+    return bio_shell
+
+
+def test_fetch_daily_if_entries_run_out(bio_shell):
+    shell = bio_shell(21)
+    assert shell.fetch_due(7, TODAY)
+    for _ in range(5):
+        assert shell.fetch()
+    assert shell.fetch_interval(7, TODAY) == 1
+
+
+def test_back_off_while_unchanged(bio_shell):
+    shell = bio_shell(365)
+    assert shell.fetch()
+    assert shell.fetch_interval(7, TODAY) == 1
+
+    intervals = []
+    for _ in range(4):
+        assert shell.fetch()
+        intervals.append(shell.fetch_interval(7, TODAY))
+    assert intervals == [2, 4, 7, 7]
+    assert shell.fetch_interval(1, TODAY) == 1
+
+    # changed entries reset the interval
+    shell._source.entries = _bio(300)
+    assert shell.fetch()
+    assert shell.fetch_interval(7, TODAY) == 1
+
+
+def test_fetch_due(bio_shell):
+    shell = bio_shell(365)
+    assert shell.fetch()
+    assert shell.fetch()
+    shell._refreshtime = datetime.combine(TODAY, datetime.min.time())
+    assert not shell.fetch_due(7, TODAY + timedelta(days=1))
+    assert shell.fetch_due(7, TODAY + timedelta(days=2))
+    # the entries of the shortened horizon run out soon
+    assert shell.fetch_due(7, TODAY + timedelta(days=1 + 365 - 28))
+
+
+def test_hints_and_persisted_state(bio_shell):
+    shell = bio_shell(365, network=False)
+    assert shell.fetch()
+    assert shell.fetch_interval(7, TODAY) == 7
+
+    shell = bio_shell(365, min_refresh_interval=timedelta(days=5))
+    assert shell.fetch()
+    assert shell.fetch_interval(7, TODAY) == 5
+    assert shell.fetch()
+    data = shell.dump()
+
+    restored = bio_shell(365)
+    assert restored.restore(data)
+    assert restored.fetch_interval(7, TODAY) == 2
+
+
+def test_circuit_breaker(bio_shell):
+    shell = bio_shell(365)
+    shell._source.fail = True
+    now = datetime.now()
+
+    delays = []
+    for _ in range(FAILURE_THRESHOLD - 1):
+        assert not shell.fetch()
+        assert shell.breaker.get_state(now) == STATE_CLOSED
+        delays.append(shell.breaker.next_attempt - now)
+    assert timedelta(minutes=1) <= delays[0] <= timedelta(minutes=2, seconds=1)
+    assert delays[-1] > delays[0] * 2
+
+    assert not shell.fetch()
+    assert shell.breaker.state == STATE_OPEN
+    assert not shell.breaker.allow_fetch()
+    assert shell.breaker.next_attempt - now >= timedelta(hours=3)
+    probe = shell.breaker.next_attempt + timedelta(seconds=1)
+    assert shell.breaker.get_state(probe) == STATE_HALF_OPEN
+    assert shell.breaker.allow_fetch(probe)
+
+    # persisted with the collection cache
+    restored = bio_shell(365)
+    assert not restored.restore(shell.dump())
+    assert restored.breaker.state == STATE_OPEN
+    assert restored.breaker.failures == FAILURE_THRESHOLD
+
+    shell._source.fail = False
+    assert shell.fetch()
+    assert shell.breaker.state == STATE_CLOSED
+    assert shell.breaker.next_attempt is None
+    assert "breaker" not in shell.dump()
+
+
+class _HttpSource:
+    def __init__(self, url: str):
+        self.url = url
+
+    def fetch(self):
+        client = HttpClient()
+        client.get(self.url)
+        client.get_session(self.url).get(self.url, stream=True).close()
+        # counted at the transport level, not only for the shared sessions
+        requests.get(self.url, timeout=5)
+        return [Collection(TODAY, "Bio")]
+
+
+def test_fetch_metrics(server_url, make_shell, make_source):
+    shell = make_shell(_HttpSource(server_url))
+    assert shell.fetch()
+    assert shell.metrics.requests == 3
+    assert shell.metrics.bytes == 300
+    assert shell.metrics.host == "127.0.0.1"
+    assert shell.metrics.entries == 1
+    assert shell.metrics.duration is not None
+    assert shell.metrics.last_success is not None
+
+    # requests outside of a fetch are not counted
+    HttpClient().get(server_url)
+    requests.get(server_url, timeout=5)
+    assert shell.metrics.requests == 3
+
+    shell._source = make_source()
+    shell._source.fail = True
+    assert not shell.fetch()
+    assert shell.metrics.last_error == "ConnectionError"
+    assert shell.metrics.requests == 0
+
+
+class _AsyncSource(ClientSessionMixin):
+    def __init__(self, url: str | None = None, delay: float = 0):
+        self.url = url
+        self.delay = delay
+
+    async def fetch(self):
+        await asyncio.sleep(self.delay)
+        if self.url is not None:
+            async with self.client_session() as session:
+                async with session.get(self.url) as r:
+                    r.raise_for_status()
+                    await r.read()
+        return [Collection(TODAY, "Bio")]
+
+
+def test_async_fetch(server_url, make_shell, bio_shell):
+    # outside of an event loop with a temporary session
+    shell = make_shell(_AsyncSource(server_url))
+    assert shell.is_async
+    assert shell.fetch()
+    assert len(shell._entries) == 1
+
+    # with a shared session, which is not closed by the source
+    async def fetch_shared():
+        async with aiohttp.ClientSession() as session:
+            assert await shell.async_fetch(session)
+            assert shell._source._client_session is session
+            assert not session.closed
+
+    asyncio.run(fetch_shared())
+
+    with pytest.raises(TypeError):
+        asyncio.run(bio_shell(7).async_fetch())
+
+
+def test_async_fetches_overlap(make_shell):
+    shells = [make_shell(_AsyncSource(delay=0.2)) for _ in range(10)]
+
+    async def fetch_all():
+        return await asyncio.gather(*(s.async_fetch() for s in shells))
+
+    started = time.monotonic()
+    assert all(asyncio.run(fetch_all()))
+    assert time.monotonic() - started < 1
+    for shell in shells:
+        assert 0.2 <= shell.metrics.duration < 1
+        assert shell.metrics.entries == 1
+
+
+def test_async_fetch_timeout(make_shell):
+    shell = make_shell(_AsyncSource(delay=10))
+
+    async def fetch():
+        await asyncio.wait_for(shell.async_fetch(), 0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(fetch())
+    assert shell.breaker.failures == 1
+    assert shell.metrics.last_error == "TimeoutError"
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.validation_cache import (  # isort:skip # noqa: E402
+    ValidationCache,
+    get_validation_cache,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+    Customize,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule.source_shell import (  # isort:skip # noqa: E402
+    calc_unique_source_id,
+)
+from custom_components.waste_collection_schedule.wcs_coordinator import (  # isort:skip # noqa: E402
+    WCSCoordinator,
+)
+
+DAY = datetime.date(2030, 1, 7)
+ARGS = {"street": "Hauptstraße", "number": 1}
+UNIQUE_ID = calc_unique_source_id("example", ARGS)
+
+
+# as configured for the example source
+SHELL_ARGS = {
+    "title": "example",
+    "customize": {"Bio": Customize("Bio", alias="Organic")},
+    "day_offset": 1,
+}
+
+
+def test_set_and_pop():
+    cache = ValidationCache()
+    cache.set("example", dict(reversed(ARGS.items())), [Collection(DAY, "Bio")])
+    assert cache.pop(UNIQUE_ID) == [
+        {"date": DAY.isoformat(), "type": "Bio", "icon": None, "picture": None}
+    ]
+    # handed off only once
+    assert cache.pop(UNIQUE_ID) is None
+
+
+def test_expired_entries_are_dropped():
+    cache = ValidationCache(max_age=0)
+    cache.set("example", ARGS, [Collection(DAY, "Bio")])
+    assert cache.pop(UNIQUE_ID) is None
+
+
+def test_seed_applies_customize_and_day_offset(make_shell):
+    shell = make_shell(unique_id=UNIQUE_ID, **SHELL_ARGS)
+    assert shell.seed([{"date": DAY.isoformat(), "type": "Bio "}])
+    assert shell.refreshtime is not None
+    assert shell.metrics.entries == 1
+    assert [(e.date, e.type) for e in shell._entries] == [
+        (DAY + datetime.timedelta(days=1), "Organic")
+    ]
+
+
+def test_first_refresh_uses_validated_entries(tmp_path: Path, make_shell, make_source):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        source = make_source([Collection(DAY, "Bio")])
+        get_validation_cache().set("example", ARGS, [Collection(DAY, "Bio")])
+        shell = make_shell(source, UNIQUE_ID, **SHELL_ARGS)
+        coordinator = WCSCoordinator(hass, shell, ", ", "01:00", 0, "10:00")
+        try:
+            await coordinator._async_update_data()
+            await hass.async_block_till_done()
+            assert source.fetches == 0
+            assert len(coordinator.shell._entries) == 1
+        finally:
+            coordinator.async_unload()
+
+        # without validated entries (e.g. after a restart) the source is fetched
+        source = make_source([Collection(DAY, "Bio")])
+        shell = make_shell(source, UNIQUE_ID, **SHELL_ARGS)
+        coordinator = WCSCoordinator(hass, shell, ", ", "01:00", 0, "10:00")
+        try:
+            await coordinator._async_update_data()
+            await hass.async_block_till_done()
+            assert source.fetches == 1
+        finally:
+            coordinator.async_unload()
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from custom_components.waste_collection_schedule.waste_collection_api import (  # isort:skip # noqa: E402
+    WasteCollectionApi,
+)
+from custom_components.waste_collection_schedule.waste_collection_schedule import (  # isort:skip # noqa: E402
+    Collection,
+)
+
+DAY = datetime.date(2030, 1, 7)
+ENTRIES = [Collection(DAY, "Bio")]
+
+
+def test_timed_out_fetch_keeps_slot_and_updates_later(
+    tmp_path: Path, make_shell, make_source
+):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        api = WasteCollectionApi(
+            hass,
+            ", ",
+            datetime.time(1),
+            0,
+            datetime.time(10),
+            max_parallel_fetches=1,
+            fetch_timeout=0.2,  # type: ignore[arg-type]
+        )
+        slow_source = make_source(ENTRIES, delay=0.5)
+        fast_source = make_source(ENTRIES)
+        slow = make_shell(slow_source, "slow")
+        fast = make_shell(fast_source, "fast")
+        api._source_shells = [slow, fast]
+
+        updates = []
+
+        @callback
+        def updated():
+            updates.append("slow")
+
+        async_dispatcher_connect(hass, api.update_signal(slow), updated)
+        try:
+            await api._fetch_shells([slow, fast])
+            # the slow thread still held the only slot, the fast fetch didn't
+            # spend its timeout waiting for it
+            assert fast_source.started_at - slow_source.started_at >= 0.45
+            assert fast.refreshtime is not None
+            assert not fast.breaker.failures
+
+            # the slow fetch is applied when its thread finishes
+            assert slow.refreshtime is not None
+            await hass.async_block_till_done()
+            assert updates == ["slow"]
+        finally:
+            api._shutdown_callback(None)  # type: ignore[arg-type]
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
+
+
+def test_daily_fetch_per_source(tmp_path: Path, make_shell, make_source):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        api = WasteCollectionApi(hass, ", ", datetime.time(1), 1, datetime.time(10))
+        sources = [make_source(ENTRIES), make_source(ENTRIES)]
+        api._source_shells = [
+            make_shell(s, f"source{i}") for i, s in enumerate(sources)
+        ]
+        try:
+            api._fetch_callback()
+            # a pending fetch of the previous tick is replaced, not duplicated
+            api._fetch_callback()
+            assert len(api._pending_fetches) == 2
+            for cancel in api._pending_fetches.values():
+                cancel()
+            for shell in list(api._source_shells):
+                api._fetch_now_callback(shell)
+            await hass.async_block_till_done()
+            assert all(s.fetches == 1 for s in sources)
+            assert not api._pending_fetches
+        finally:
+            api._shutdown_callback(None)  # type: ignore[arg-type]
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
+
+
+def test_slot_is_released_if_the_fetch_cant_start(
+    tmp_path: Path, make_shell, make_source
+):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        api = WasteCollectionApi(
+            hass,
+            ", ",
+            datetime.time(1),
+            0,
+            datetime.time(10),
+            max_parallel_fetches=1,
+        )
+        source = make_source(ENTRIES)
+        shell = make_shell(source)
+        try:
+            api._shutdown_callback(None)  # type: ignore[arg-type]
+            with pytest.raises(RuntimeError):
+                await api._fetch_with_timeout(shell, shell.breaker.state)
+            assert not api._fetch_slots.locked()
+            assert source.fetches == 0
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
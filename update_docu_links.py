@@ -321,6 +321,7 @@ def browse_sources() -> list[SourceInfo]:
     update_app_abfallplus_de(modules)
     update_abfallnavi_de(modules)
     update_edpevent_se(modules)
+    update_sources_manifest(modules)
 
     return sources
 
@@ -551,6 +552,27 @@ def update_sources_json(countries: dict[str, list[SourceInfo]]) -> None:
         f.write(json.dumps(output, indent=2))
 
 
+def update_sources_manifest(modules: dict[str, ModuleType]) -> None:
+    """Write the arguments of all sources, used by the config flow to build its forms without importing the sources."""
+    from waste_collection_schedule.service.SourceManifest import SourceDescription
+
+    output: dict[str, dict[str, Any]] = {}
+    for name in sorted(modules):
+        entry = SourceDescription.from_module(modules[name]).to_manifest()
+        if entry is None:
+            print(
+                f"{name} can't be described in sources_manifest.json, the config flow will import it"
+            )
+            continue
+        output[name] = entry
+    with open(
+        "custom_components/waste_collection_schedule/sources_manifest.json",
+        "w",
+        encoding="utf-8",
+    ) as f:
+        f.write(json.dumps(output, indent=2))
+
+
 def get_custom_translations(
     countries: dict[str, list[SourceInfo]]
 ) -> Tuple[